@@ -0,0 +1,16 @@
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.services.metrics import REGISTRY
+
+
+async def metrics(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+# Mounted in front of the Reflex backend through rx.App(api_transformer=...).
+api = Starlette(routes=[Route("/metrics", metrics)])
@@ -2,7 +2,16 @@ import reflex as rx
 from app.components.header import header
 from app.components.queue_tables import queue_tables
 from app.components.event_stream import event_stream
+from app.components.live_chart import live_chart
+from app.components.latency_panel import latency_panel
+from app.components.service_stats_panel import service_stats_panel
+from app.components.debug_panel import debug_panel
+from app.components.dlq_inspector import dlq_inspector
 from app.states.dashboard_state import DashboardState
+from app.states.debug_state import DebugState
+from app.states.dlq_state import DLQState
+from app.services.sqs_client import sqs_lifespan
+from app.api import api
 import logging
 import sys
 
@@ -29,6 +38,9 @@ def index() -> rx.Component:
             rx.el.div(
                 header(),
                 queue_tables(),
+                live_chart(),
+                service_stats_panel(),
+                latency_panel(),
                 class_name="flex flex-col gap-6 w-full lg:w-2/3",
             ),
             event_stream(),
@@ -38,9 +50,24 @@ def index() -> rx.Component:
     )
 
 
+def debug() -> rx.Component:
+    return rx.el.main(
+        rx.el.div(debug_panel(), class_name="p-6"),
+        class_name="bg-slate-50 font-['Inter'] min-h-screen",
+    )
+
+
+def dlq_page() -> rx.Component:
+    return rx.el.main(
+        rx.el.div(dlq_inspector(), class_name="p-6"),
+        class_name="bg-slate-50 font-['Inter'] min-h-screen",
+    )
+
+
 setup()
 app = rx.App(
     theme=rx.theme(appearance="light"),
+    api_transformer=api,
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
         rx.el.link(rel="preconnect", href="https://fonts.gstatic.com", crossorigin=""),
@@ -50,6 +77,13 @@ app = rx.App(
         ),
     ],
 )
+app.register_lifespan_task(sqs_lifespan)
 app.add_page(
     index, title="Eggi.io Dashboard", on_load=DashboardState.start_streaming_on_load
-)
\ No newline at end of file
+)
+app.add_page(
+    debug, route="/debug", title="Eggi.io Dashboard - Debug", on_load=DebugState.refresh
+)
+app.add_page(
+    dlq_page, route="/dlq", title="Eggi.io Dashboard - DLQ Inspector", on_load=DLQState.load
+)
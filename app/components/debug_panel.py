@@ -0,0 +1,83 @@
+import reflex as rx
+from app.states.debug_state import DebugState
+
+
+def _poller_row(poller: rx.Var[dict[str, str]]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(poller["key"], class_name="px-4 py-2 text-sm font-mono text-slate-700"),
+        rx.el.td(poller["kind"], class_name="px-4 py-2 text-sm text-slate-600"),
+        rx.el.td(poller["env"], class_name="px-4 py-2 text-sm text-slate-600"),
+        rx.el.td(
+            poller["generation"],
+            class_name="px-4 py-2 text-sm text-center font-mono text-slate-600",
+        ),
+        rx.el.td(poller["started_at"], class_name="px-4 py-2 text-sm text-slate-500"),
+        rx.el.td(poller["state"], class_name="px-4 py-2 text-sm text-slate-500"),
+        class_name="border-b border-slate-100 last:border-b-0",
+    )
+
+
+def _hub_row(hub: rx.Var[dict[str, str]]) -> rx.Component:
+    return rx.el.p(
+        rx.el.span(hub["env"], class_name="font-medium text-slate-700"),
+        rx.el.span(" (", hub["role"], ")", class_name="text-slate-500"),
+        rx.el.span(" subscribers: ", class_name="text-slate-500"),
+        rx.el.span(hub["subscribers"], class_name="font-mono text-slate-700"),
+        rx.el.span(" viewers: ", class_name="text-slate-500"),
+        rx.el.span(hub["viewers"], class_name="font-mono text-slate-700"),
+        rx.el.span(" version: ", class_name="text-slate-500"),
+        rx.el.span(hub["version"], class_name="font-mono text-slate-700"),
+        rx.el.span(" frames/updates: ", class_name="text-slate-500"),
+        rx.el.span(
+            hub["frames"], "/", hub["updates"], class_name="font-mono text-slate-700"
+        ),
+        rx.el.span(" merged: ", class_name="text-slate-500"),
+        rx.el.span(hub["merged"], class_name="font-mono text-slate-700"),
+        rx.el.span(" dropped: ", class_name="text-slate-500"),
+        rx.el.span(hub["dropped"], class_name="font-mono text-slate-700"),
+        rx.el.span(" rows skipped: ", class_name="text-slate-500"),
+        rx.el.span(hub["rows_skipped"], class_name="font-mono text-slate-700"),
+        class_name="text-sm",
+    )
+
+
+def debug_panel() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p(
+                rx.el.span("Live Pollers", class_name="text-lg font-semibold text-slate-800"),
+                rx.el.span(
+                    DebugState.poller_count,
+                    class_name="ml-2 px-2 py-1 text-xs font-semibold text-indigo-700 bg-indigo-100 rounded-full",
+                ),
+                class_name="flex items-center",
+            ),
+            rx.el.button(
+                rx.icon("refresh-cw", size=16),
+                on_click=DebugState.refresh,
+                class_name="p-2 rounded-lg border border-slate-200 text-slate-500 hover:border-indigo-300",
+            ),
+            class_name="flex justify-between items-center",
+        ),
+        rx.el.div(rx.foreach(DebugState.hubs, _hub_row), class_name="flex flex-col gap-1"),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        *[
+                            rx.el.th(
+                                title,
+                                class_name="px-4 py-2 text-left text-xs font-semibold text-slate-500 uppercase tracking-wider",
+                            )
+                            for title in ("Task", "Kind", "Env", "Gen", "Started", "State")
+                        ],
+                        class_name="bg-slate-50",
+                    )
+                ),
+                rx.el.tbody(rx.foreach(DebugState.pollers, _poller_row), class_name="bg-white"),
+                class_name="w-full",
+            ),
+            class_name="rounded-lg border border-slate-200 overflow-hidden",
+        ),
+        class_name="p-6 bg-white rounded-2xl border border-slate-200 flex flex-col gap-4",
+    )
@@ -0,0 +1,169 @@
+import reflex as rx
+from app.states.dlq_state import DLQState
+
+_HEADER_CLASS = "px-4 py-2 text-left text-xs font-semibold text-slate-500 uppercase tracking-wider"
+_BUTTON_CLASS = "px-3 py-2 text-sm font-medium rounded-lg border disabled:opacity-50"
+
+
+def _group_row(row: rx.Var[dict[str, str]]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            rx.el.input(
+                type="checkbox",
+                checked=DLQState.selected.contains(row["key"]),
+                on_change=lambda _: DLQState.toggle_group(row["key"]),
+                class_name="size-4 accent-indigo-600",
+            ),
+            class_name="px-4 py-3",
+        ),
+        rx.el.td(row["count"], class_name="px-4 py-3 text-sm text-right font-mono text-slate-700"),
+        rx.el.td(row["event_source"], class_name="px-4 py-3 text-sm text-slate-600"),
+        rx.el.td(
+            rx.el.p(row["error"], class_name="font-mono text-slate-700 break-all"),
+            rx.el.p(row["shape"], class_name="font-mono text-xs text-slate-400 break-all"),
+            rx.el.details(
+                rx.el.summary("Example", class_name="text-xs text-indigo-600 cursor-pointer"),
+                rx.el.pre(
+                    row["example"],
+                    class_name="mt-1 p-2 text-xs bg-slate-50 rounded whitespace-pre-wrap break-all",
+                ),
+            ),
+            class_name="px-4 py-3 text-sm",
+        ),
+        rx.el.td(
+            row["first_sent"], " – ", row["last_sent"],
+            class_name="px-4 py-3 text-xs text-slate-500 whitespace-nowrap",
+        ),
+        class_name="border-b border-slate-100 last:border-b-0 align-top",
+    )
+
+
+def _redrive_status() -> rx.Component:
+    return rx.cond(
+        DLQState.redrive.contains("state"),
+        rx.el.p(
+            rx.el.span(DLQState.redrive["state"], class_name="font-medium text-slate-700"),
+            rx.el.span(" moved ", class_name="text-slate-500"),
+            rx.el.span(DLQState.redrive["moved"], class_name="font-mono text-slate-700"),
+            rx.el.span(" failed ", class_name="text-slate-500"),
+            rx.el.span(DLQState.redrive["failed"], class_name="font-mono text-slate-700"),
+            rx.el.span(" skipped ", class_name="text-slate-500"),
+            rx.el.span(DLQState.redrive["skipped"], class_name="font-mono text-slate-700"),
+            rx.el.span(" at ", class_name="text-slate-500"),
+            rx.el.span(DLQState.redrive["rate"], class_name="font-mono text-slate-700"),
+            rx.el.span(" → ", DLQState.redrive["target"], class_name="text-slate-500"),
+            rx.el.span(DLQState.redrive["error"], class_name="ml-2 text-red-600"),
+            class_name="text-sm",
+        ),
+    )
+
+
+def _confirm_redrive_all() -> rx.Component:
+    return rx.cond(
+        DLQState.confirming_all,
+        rx.el.div(
+            rx.el.div(
+                rx.el.p("Redrive all messages?", class_name="text-lg font-semibold text-slate-800"),
+                rx.el.p(
+                    "Moves ",
+                    rx.el.span(DLQState.confirm_count, class_name="font-mono font-medium"),
+                    " messages from ",
+                    rx.el.span(DLQState.dlq_name, class_name="font-mono font-medium"),
+                    " back to ",
+                    rx.el.span(DLQState.redrive_target, class_name="font-mono font-medium"),
+                    ", where they will be processed again.",
+                    class_name="text-sm text-slate-600",
+                ),
+                rx.el.div(
+                    rx.el.button(
+                        "Cancel",
+                        on_click=DLQState.cancel_redrive_all,
+                        class_name=_BUTTON_CLASS + " border-slate-200 text-slate-700",
+                    ),
+                    rx.el.button(
+                        "Redrive all",
+                        on_click=DLQState.redrive_all,
+                        class_name=_BUTTON_CLASS + " border-amber-300 text-amber-700 bg-amber-50",
+                    ),
+                    class_name="flex justify-end gap-3",
+                ),
+                role="alertdialog",
+                class_name="max-w-md p-6 bg-white rounded-2xl border border-slate-200 flex flex-col gap-4",
+            ),
+            class_name="fixed inset-0 z-50 flex items-center justify-center bg-slate-900/40",
+        ),
+    )
+
+
+def dlq_inspector() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p("DLQ Inspector", class_name="text-lg font-semibold text-slate-800"),
+            rx.el.a("Back to dashboard", href="/", class_name="text-sm text-indigo-600"),
+            class_name="flex justify-between items-center",
+        ),
+        rx.el.div(
+            rx.el.select(
+                rx.foreach(DLQState.dlq_options, lambda name: rx.el.option(name, value=name)),
+                value=DLQState.dlq_name,
+                on_change=DLQState.set_dlq_name,
+                class_name="px-3 py-2 text-sm rounded-lg border border-slate-200 bg-white",
+            ),
+            rx.el.button(
+                rx.cond(DLQState.is_sampling, "Sampling…", "Sample messages"),
+                on_click=DLQState.sample_messages,
+                disabled=DLQState.is_sampling,
+                class_name=_BUTTON_CLASS + " border-slate-200 text-slate-700 hover:border-indigo-300",
+            ),
+            rx.el.button(
+                "Redrive selected",
+                on_click=DLQState.redrive_selected,
+                disabled=DLQState.is_redriving | (DLQState.selected.length() == 0),
+                class_name=_BUTTON_CLASS + " border-indigo-300 text-indigo-700 bg-indigo-50",
+            ),
+            rx.el.button(
+                "Redrive all…",
+                on_click=DLQState.ask_redrive_all,
+                disabled=DLQState.is_redriving | (DLQState.redrive_target == ""),
+                class_name=_BUTTON_CLASS + " border-amber-300 text-amber-700 bg-amber-50",
+            ),
+            rx.cond(
+                DLQState.is_redriving,
+                rx.el.button(
+                    "Stop",
+                    on_click=DLQState.cancel_redrive,
+                    class_name=_BUTTON_CLASS + " border-red-300 text-red-700 bg-red-50",
+                ),
+            ),
+            rx.el.p(
+                "to ", rx.cond(DLQState.redrive_target != "", DLQState.redrive_target, "(no source queue)"),
+                class_name="text-sm text-slate-500",
+            ),
+            class_name="flex flex-wrap items-center gap-3",
+        ),
+        rx.cond(DLQState.error != "", rx.el.p(DLQState.error, class_name="text-sm text-red-600")),
+        _redrive_status(),
+        _confirm_redrive_all(),
+        rx.el.p(
+            DLQState.sampled, " messages sampled in ", DLQState.groups.length(), " groups",
+            class_name="text-sm text-slate-500",
+        ),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("", class_name=_HEADER_CLASS),
+                        rx.el.th("Count", class_name=_HEADER_CLASS),
+                        rx.el.th("Source", class_name=_HEADER_CLASS),
+                        rx.el.th("Error / payload shape", class_name=_HEADER_CLASS),
+                        rx.el.th("Sent", class_name=_HEADER_CLASS),
+                        class_name="bg-slate-50",
+                    )
+                ),
+                rx.el.tbody(rx.foreach(DLQState.groups, _group_row), class_name="bg-white"),
+                class_name="w-full",
+            ),
+            class_name="rounded-lg border border-slate-200 overflow-hidden",
+        ),
+        class_name="p-6 bg-white rounded-2xl border border-slate-200 flex flex-col gap-4",
+    )
@@ -1,5 +1,23 @@
 import reflex as rx
-from app.states.dashboard_state import DashboardState, Event
+from reflex.components.el.elements.typography import Div
+from reflex.vars.base import Var
+from reflex.vars.object import ObjectVar
+from app.states.dashboard_state import EVENT_ROW_HEIGHT, DashboardState, Event
+
+
+def _scroll_spec(e: ObjectVar) -> tuple[Var[float], Var[float], Var[float]]:
+    target = e.target.to(dict)
+    return (
+        target.scrollTop.to(float),
+        target.scrollHeight.to(float),
+        target.clientHeight.to(float),
+    )
+
+
+class ScrollContainer(Div):
+    """A div whose on_scroll reports (scrollTop, scrollHeight, clientHeight)."""
+
+    on_scroll: rx.EventHandler[_scroll_spec]
 
 
 def status_badge(status: rx.Var[str]) -> rx.Component:
@@ -38,12 +56,58 @@ def event_row(event: Event) -> rx.Component:
                     event["service"].split(":")[-1],
                     class_name="font-medium text-slate-700 text-sm",
                 ),
-                rx.el.p(event["message"], class_name="text-sm text-slate-500"),
-                class_name="flex flex-col gap-1 w-full",
+                rx.el.p(event["message"], class_name="text-sm text-slate-500 truncate"),
+                class_name="flex flex-col gap-1 w-full min-w-0",
             ),
             class_name="flex items-start gap-4",
         ),
-        class_name="p-4 border-b border-slate-100",
+        # Fixed height: the virtual list places rows by index * EVENT_ROW_HEIGHT.
+        class_name="p-4 border-b border-slate-100 overflow-hidden",
+        style={"height": f"{EVENT_ROW_HEIGHT}px"},
+    )
+
+
+def _filter_chip(chip: rx.Var[dict[str, str]]) -> rx.Component:
+    return rx.el.button(
+        rx.el.span(chip["field"], class_name="text-indigo-400"),
+        rx.el.span(chip["value"].split(":")[-1]),
+        rx.icon("x", size=12),
+        on_click=DashboardState.remove_search_filter(chip["token"]),
+        title=chip["token"],
+        class_name="flex items-center gap-1 px-2 py-1 text-xs font-medium text-indigo-700 bg-indigo-100 rounded-full",
+    )
+
+
+def _service_chip(service: rx.Var[str]) -> rx.Component:
+    return rx.el.button(
+        service.split(":")[-1],
+        on_click=DashboardState.add_search_filter("service:" + service),
+        title=service,
+        class_name="px-2 py-1 text-xs font-medium text-slate-600 bg-slate-100 hover:bg-slate-200 rounded-full",
+    )
+
+
+def _search_bar() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.icon("search", size=16, class_name="text-slate-400"),
+            rx.debounce_input(
+                rx.el.input(
+                    placeholder="Search, or filter with job:, li:, service:, source:",
+                    value=DashboardState.search_query,
+                    on_change=DashboardState.set_search_query,
+                    class_name="w-full text-sm text-slate-700 bg-transparent outline-none",
+                ),
+                debounce_timeout=250,
+            ),
+            class_name="flex items-center gap-2 px-3 py-2 border border-slate-200 rounded-lg",
+        ),
+        rx.el.div(
+            rx.foreach(DashboardState.search_filters, _filter_chip),
+            rx.foreach(DashboardState.top_services, _service_chip),
+            class_name="flex flex-wrap gap-2",
+        ),
+        class_name="flex flex-col gap-3 px-6 py-4 border-b border-slate-200",
     )
 
 
@@ -60,9 +124,34 @@ def event_stream() -> rx.Component:
             ),
             class_name="flex justify-between items-center p-6 border-b border-slate-200",
         ),
-        rx.el.div(
-            rx.foreach(DashboardState.events, event_row),
+        _search_bar(),
+        rx.cond(
+            DashboardState.new_events > 0,
+            rx.el.button(
+                DashboardState.new_events.to_string() + " new events",
+                rx.icon("arrow-up", size=14),
+                on_click=DashboardState.jump_to_latest_events,
+                class_name="flex items-center justify-center gap-2 py-2 text-xs font-medium text-indigo-700 bg-indigo-50 border-b border-slate-200",
+            ),
+        ),
+        ScrollContainer.create(
+            rx.el.div(id="event-stream-top"),
+            rx.cond(
+                DashboardState.is_searching,
+                rx.foreach(DashboardState.search_results, event_row),
+                rx.fragment(
+                    # Spacers stand in for the unmounted rows so the scrollbar spans
+                    # the whole retained log while the DOM holds only the window.
+                    rx.el.div(style={"height": DashboardState.events_pad_top.to_string() + "px"}),
+                    rx.foreach(DashboardState.events, event_row),
+                    rx.el.div(
+                        style={"height": DashboardState.events_pad_bottom.to_string() + "px"}
+                    ),
+                ),
+            ),
+            on_scroll=DashboardState.scroll_events.throttle(100),
             class_name="overflow-y-auto h-full",
+            style={"maxHeight": "calc(100vh - 12rem)"},
         ),
         class_name="bg-white rounded-2xl border border-slate-200 flex flex-col w-full lg:w-1/3",
     )
\ No newline at end of file
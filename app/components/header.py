@@ -37,6 +37,18 @@ def stat_card(icon: str, title: str, value: rx.Var[int], color: str) -> rx.Compo
     )
 
 
+def _window_button(value: rx.Var[str]) -> rx.Component:
+    return rx.el.button(
+        value,
+        on_click=DashboardState.set_stats_window(value),
+        class_name=rx.cond(
+            DashboardState.stats_window == value,
+            "px-2 py-1 text-xs font-semibold text-indigo-700 bg-indigo-100 rounded-md",
+            "px-2 py-1 text-xs font-medium text-slate-500 hover:text-slate-700 rounded-md",
+        ),
+    )
+
+
 def header() -> rx.Component:
     return rx.el.header(
         rx.el.div(
@@ -68,12 +80,26 @@ def header() -> rx.Component:
             class_name="flex items-center justify-between",
         ),
         rx.el.div(
-            rx.el.h1("Live Dashboard", class_name="text-3xl font-bold text-slate-800"),
-            rx.el.p(
-                "Real-time system monitoring and event tracking.",
-                class_name="text-slate-500",
+            rx.el.div(
+                rx.el.h1("Live Dashboard", class_name="text-3xl font-bold text-slate-800"),
+                rx.el.p(
+                    "Real-time system monitoring and event tracking.",
+                    class_name="text-slate-500",
+                ),
+                class_name="flex flex-col gap-2",
+            ),
+            rx.el.div(
+                rx.el.span(
+                    DashboardState.stats_rate,
+                    class_name="text-sm font-mono text-slate-500",
+                ),
+                rx.el.div(
+                    rx.foreach(DashboardState.stats_windows, _window_button),
+                    class_name="flex items-center gap-1",
+                ),
+                class_name="flex items-center gap-3",
             ),
-            class_name="flex flex-col gap-2",
+            class_name="flex justify-between items-end",
         ),
         rx.el.div(
             stat_card(
@@ -0,0 +1,47 @@
+import reflex as rx
+from app.states.dashboard_state import DashboardState
+
+_HEADER_CLASS = "px-4 py-2 text-xs font-semibold text-slate-500 uppercase tracking-wider"
+_CELL_CLASS = "px-4 py-3 text-sm text-right font-mono text-slate-600"
+
+
+def _latency_row(row: dict[str, str]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(row["stage"], class_name="px-4 py-3 text-sm font-medium text-slate-700"),
+        rx.el.td(row["count"], class_name=_CELL_CLASS),
+        rx.el.td(row["p50"], class_name=_CELL_CLASS),
+        rx.el.td(row["p95"], class_name=_CELL_CLASS),
+        rx.el.td(row["p99"], class_name=_CELL_CLASS),
+        class_name="border-b border-slate-100 last:border-b-0",
+    )
+
+
+def latency_panel() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p("Pipeline Latency", class_name="text-lg font-semibold text-slate-800"),
+            rx.el.p("last 5-10 min, per job", class_name="text-sm text-slate-500"),
+            class_name="flex justify-between items-center",
+        ),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("Stage", class_name=_HEADER_CLASS + " text-left"),
+                        rx.el.th("Jobs", class_name=_HEADER_CLASS + " text-right"),
+                        rx.el.th("p50", class_name=_HEADER_CLASS + " text-right"),
+                        rx.el.th("p95", class_name=_HEADER_CLASS + " text-right"),
+                        rx.el.th("p99", class_name=_HEADER_CLASS + " text-right"),
+                        class_name="bg-slate-50",
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(DashboardState.latency_rows, _latency_row),
+                    class_name="bg-white",
+                ),
+                class_name="w-full",
+            ),
+            class_name="rounded-lg border border-slate-200 overflow-hidden",
+        ),
+        class_name="p-6 bg-white rounded-2xl border border-slate-200 flex flex-col gap-4",
+    )
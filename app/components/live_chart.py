@@ -0,0 +1,71 @@
+import reflex as rx
+from app.states.dashboard_state import DashboardState
+
+
+def _range_button(value: rx.Var[str]) -> rx.Component:
+    return rx.el.button(
+        value,
+        on_click=DashboardState.set_chart_range(value),
+        class_name=rx.cond(
+            DashboardState.chart_range == value,
+            "px-2 py-1 text-xs font-semibold text-indigo-700 bg-indigo-100 rounded-md",
+            "px-2 py-1 text-xs font-medium text-slate-500 hover:text-slate-700 rounded-md",
+        ),
+    )
+
+
+def live_chart() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p("Queue Depth History", class_name="text-lg font-semibold text-slate-800"),
+            rx.el.div(
+                rx.el.select(
+                    rx.foreach(
+                        DashboardState.queue_names + DashboardState.dlq_queue_names,
+                        lambda name: rx.el.option(name, value=name),
+                    ),
+                    value=DashboardState.selected_chart_queue,
+                    on_change=DashboardState.set_chart_queue,
+                    class_name="px-2 py-1 text-sm text-slate-600 border border-slate-200 rounded-md",
+                ),
+                rx.el.div(
+                    rx.foreach(DashboardState.chart_ranges, _range_button),
+                    class_name="flex items-center gap-1",
+                ),
+                class_name="flex items-center gap-3",
+            ),
+            class_name="flex justify-between items-center",
+        ),
+        rx.recharts.line_chart(
+            rx.recharts.cartesian_grid(stroke_dasharray="3 3", stroke="#e2e8f0"),
+            rx.recharts.x_axis(data_key="time", tick_line=False, min_tick_gap=40),
+            rx.recharts.y_axis(allow_decimals=False, tick_line=False, width=40),
+            rx.recharts.graphing_tooltip(),
+            rx.recharts.line(
+                data_key="visible",
+                name="Visible",
+                stroke="#6366f1",
+                dot=False,
+                is_animation_active=False,
+            ),
+            rx.recharts.line(
+                data_key="in_flight",
+                name="In flight",
+                stroke="#f59e0b",
+                dot=False,
+                is_animation_active=False,
+            ),
+            rx.recharts.line(
+                data_key="delayed",
+                name="Delayed",
+                stroke="#94a3b8",
+                dot=False,
+                is_animation_active=False,
+            ),
+            rx.recharts.legend(),
+            data=DashboardState.chart_data,
+            height=260,
+            width="100%",
+        ),
+        class_name="p-6 bg-white rounded-2xl border border-slate-200 flex flex-col gap-4",
+    )
@@ -1,23 +1,12 @@
 import reflex as rx
 from app.states.dashboard_state import DashboardState
 
-QUEUE_DISPLAY_NAMES = {
-    "eggi-profiles-to-analyse-preparation": "Preparation",
-    "eggi-mapping-service-profiles-to-analyse": "Mapping Service",
-    "eggi-mapping-job-completion-handler": "Completion Handler",
-    "eggi-llm-inference-jobs": "LLM Inference Jobs",
-    "eggi-profile-analysis-preparation-dlq": "Preparation DLQ",
-    "eggi-mapping-service-profiles-dlq": "Mapping Service DLQ",
-    "eggi-mapping-job-completion-handler-dlq": "Completion Handler DLQ",
-    "eggi-llm-inference-jobs-dlq": "LLM Inference Jobs DLQ",
-}
-
 
 def _queue_row(row: dict[str, str]) -> rx.Component:
-    queue_name = row["name"]
     return rx.el.tr(
         rx.el.td(
-            QUEUE_DISPLAY_NAMES.get(queue_name.replace("eggi-dev-", "eggi-"), queue_name),
+            row["display"],
+            title=row["name"],
             class_name="px-4 py-3 text-sm font-medium text-slate-700 truncate whitespace-nowrap",
             style={"width": "200px"},
         ),
@@ -36,6 +25,18 @@ def _queue_row(row: dict[str, str]) -> rx.Component:
             class_name="px-4 py-3 text-sm text-center font-mono text-slate-600 min-w-0 overflow-hidden",
             style={"width": "1.25rem", "maxWidth": "1.25rem"},
         ),
+        rx.el.td(
+            row["arrival_rate"],
+            class_name="px-4 py-3 text-sm text-center font-mono text-slate-500 whitespace-nowrap",
+        ),
+        rx.el.td(
+            row["processing_rate"],
+            class_name="px-4 py-3 text-sm text-center font-mono text-slate-500 whitespace-nowrap",
+        ),
+        rx.el.td(
+            row["drain_eta"],
+            class_name="px-4 py-3 text-sm text-center font-mono text-slate-500 whitespace-nowrap",
+        ),
         class_name="border-b border-slate-100 last:border-b-0",
     )
 
@@ -71,14 +72,37 @@ def _table_header() -> rx.Component:
                 style={"width": "1.25rem", "maxWidth": "1.25rem"},
                 title="Approximate Number Of Messages Delayed",
             ),
+            rx.el.th(
+                rx.el.div(rx.icon("arrow-down-to-line", size=16), class_name="flex justify-center"),
+                class_name="px-4 py-2 text-center text-xs font-semibold text-slate-500 uppercase tracking-wider",
+                title="Arrival rate (smoothed)",
+            ),
+            rx.el.th(
+                rx.el.div(rx.icon("arrow-up-from-line", size=16), class_name="flex justify-center"),
+                class_name="px-4 py-2 text-center text-xs font-semibold text-slate-500 uppercase tracking-wider",
+                title="Processing rate (smoothed)",
+            ),
+            rx.el.th(
+                rx.el.div(rx.icon("hourglass", size=16), class_name="flex justify-center"),
+                class_name="px-4 py-2 text-center text-xs font-semibold text-slate-500 uppercase tracking-wider",
+                title="Time to drain at current rates",
+            ),
             class_name="bg-slate-50",
         )
     )
 
 
-def _queue_table(title: str, queue_rows: list[dict[str, str]]) -> rx.Component:
+def _queue_table(
+    title: str, queue_rows: list[dict[str, str]], inspect_href: str = ""
+) -> rx.Component:
     return rx.el.div(
-        rx.el.p(title, class_name="font-semibold text-slate-700 text-sm"),
+        rx.el.div(
+            rx.el.p(title, class_name="font-semibold text-slate-700 text-sm"),
+            rx.el.a("Inspect", href=inspect_href, class_name="text-sm text-indigo-600")
+            if inspect_href
+            else rx.fragment(),
+            class_name="flex justify-between items-center",
+        ),
         rx.el.div(
             rx.el.table(
                 rx.el.colgroup(
@@ -86,6 +110,9 @@ def _queue_table(title: str, queue_rows: list[dict[str, str]]) -> rx.Component:
                     rx.el.col(style={"width": "1.25rem"}),
                     rx.el.col(style={"width": "1.25rem"}),
                     rx.el.col(style={"width": "1.25rem"}),
+                    rx.el.col(style={"width": "4.5rem"}),
+                    rx.el.col(style={"width": "4.5rem"}),
+                    rx.el.col(style={"width": "5.5rem"}),
                 ),
                 _table_header(),
                 rx.el.tbody(rx.foreach(queue_rows, _queue_row), class_name="bg-white"),
@@ -121,7 +148,7 @@ def queue_tables() -> rx.Component:
         ),
         rx.el.div(
             _queue_table("Main Queues", DashboardState.queue_rows),
-            _queue_table("Dead-Letter Queues", DashboardState.dlq_queue_rows),
+            _queue_table("Dead-Letter Queues", DashboardState.dlq_queue_rows, "/dlq"),
             class_name="grid grid-cols-1 gap-6",
         ),
         class_name="p-6 bg-white rounded-2xl border border-slate-200 flex flex-col gap-4",
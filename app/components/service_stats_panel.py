@@ -0,0 +1,49 @@
+import reflex as rx
+from app.states.dashboard_state import DashboardState
+
+_HEADER_CLASS = "px-4 py-2 text-xs font-semibold text-slate-500 uppercase tracking-wider"
+_CELL_CLASS = "px-4 py-3 text-sm text-right font-mono text-slate-600"
+
+
+def _service_row(row: dict[str, str]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(row["service"], class_name="px-4 py-3 text-sm font-medium text-slate-700"),
+        rx.el.td(row["total"], class_name=_CELL_CLASS),
+        rx.el.td(row["rate"], class_name=_CELL_CLASS),
+        rx.el.td(row["warn"], class_name=_CELL_CLASS),
+        rx.el.td(row["error"], class_name=_CELL_CLASS),
+        class_name="border-b border-slate-100 last:border-b-0",
+    )
+
+
+def service_stats_panel() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p("Busiest Services", class_name="text-lg font-semibold text-slate-800"),
+            rx.el.p(
+                "last ", DashboardState.stats_window, class_name="text-sm text-slate-500"
+            ),
+            class_name="flex justify-between items-center",
+        ),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("Service", class_name=_HEADER_CLASS + " text-left"),
+                        rx.el.th("Events", class_name=_HEADER_CLASS + " text-right"),
+                        rx.el.th("Rate", class_name=_HEADER_CLASS + " text-right"),
+                        rx.el.th("Warn", class_name=_HEADER_CLASS + " text-right"),
+                        rx.el.th("Error", class_name=_HEADER_CLASS + " text-right"),
+                        class_name="bg-slate-50",
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(DashboardState.service_rows, _service_row),
+                    class_name="bg-white",
+                ),
+                class_name="w-full",
+            ),
+            class_name="rounded-lg border border-slate-200 overflow-hidden",
+        ),
+        class_name="p-6 bg-white rounded-2xl border border-slate-200 flex flex-col gap-4",
+    )
@@ -0,0 +1,192 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+
+from app.services.events import EventFields, EventRecord
+from app.services.models import Event
+
+logger = logging.getLogger(__name__)
+
+# Empty string disables archiving entirely.
+ARCHIVE_PATH = os.getenv("EGGI_ARCHIVE_PATH", "data/events.sqlite3")
+ARCHIVE_FLUSH_INTERVAL = float(os.getenv("EGGI_ARCHIVE_FLUSH_INTERVAL", "1.0"))
+ARCHIVE_RETENTION_DAYS = float(os.getenv("EGGI_ARCHIVE_RETENTION_DAYS", "14"))
+# Records waiting for the writer; beyond this the oldest pending ones are dropped.
+ARCHIVE_MAX_PENDING = 100_000
+PRUNE_INTERVAL = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    env TEXT NOT NULL,
+    epoch REAL NOT NULL,
+    queue TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    service TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT NOT NULL,
+    avatar TEXT NOT NULL,
+    linkedin_identifier TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    original_input TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_env_epoch ON events (env, epoch);
+CREATE INDEX IF NOT EXISTS events_env_service_epoch ON events (env, service, epoch);
+CREATE INDEX IF NOT EXISTS events_linkedin_identifier ON events (linkedin_identifier);
+CREATE INDEX IF NOT EXISTS events_job_id ON events (job_id);
+"""
+_COLUMNS = (
+    "env, epoch, queue, timestamp, service, status, message, avatar, "
+    "linkedin_identifier, job_id, original_input, source"
+)
+
+
+class EventArchive:
+    """Append-only SQLite (WAL) store of every streamed event.
+
+    The ingest path only appends to an in-memory list; a flush scheduled on the
+    event loop hands the batch to a single writer thread, so archiving never
+    blocks the SQS loops. All database access happens on that one thread.
+    """
+
+    def __init__(self, path: str, flush_interval: float = ARCHIVE_FLUSH_INTERVAL):
+        self._path = path
+        self._flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-archive")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: list[tuple[str, EventRecord]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_prune = 0.0
+        self.dropped = 0
+
+    def submit(self, env: str, records: list[EventRecord]) -> None:
+        self._pending.extend((env, record) for record in records)
+        overflow = len(self._pending) - ARCHIVE_MAX_PENDING
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_soon())
+
+    async def recent(self, env: str, limit: int) -> list[EventRecord]:
+        """The newest `limit` archived records for `env`, oldest first."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._recent, env, limit)
+
+    async def _flush_soon(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._write, batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.exception("Failed to archive %d events: %s", len(batch), e)
+
+    async def close(self) -> None:
+        """Write whatever is still pending and close the database."""
+        if self._flush_task is not None:
+            # Cancelling is safe at any point: before the batch is taken it stays
+            # pending, after that the writer thread finishes it first.
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        batch, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        try:
+            if batch:
+                await loop.run_in_executor(self._executor, self._write, batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.exception("Failed to archive %d events at shutdown: %s", len(batch), e)
+        finally:
+            await loop.run_in_executor(self._executor, self._close)
+            self._executor.shutdown()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self._path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _write(self, batch: list[tuple[str, EventRecord]]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO events ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        env,
+                        record.epoch,
+                        record.queue,
+                        record.event["timestamp"],
+                        record.event["service"],
+                        record.event["status"],
+                        record.event["message"],
+                        record.event["avatar"],
+                        *record.fields,
+                    )
+                    for env, record in batch
+                ],
+            )
+        now = time.time()
+        if now - self._last_prune >= PRUNE_INTERVAL:
+            self._last_prune = now
+            cutoff = now - ARCHIVE_RETENTION_DAYS * 86400
+            with conn:
+                conn.execute("DELETE FROM events WHERE epoch < ?", (cutoff,))
+
+    def _recent(self, env: str, limit: int) -> list[EventRecord]:
+        rows = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM events WHERE env = ? ORDER BY epoch DESC LIMIT ?",
+            (env, limit),
+        ).fetchall()
+        return [_record_from_row(row) for row in reversed(rows)]
+
+
+def _record_from_row(row: tuple) -> EventRecord:
+    (_, epoch, queue, timestamp, service, status, message, avatar, *fields) = row
+    event: Event = {
+        "timestamp": timestamp,
+        "service": service,
+        "status": status,
+        "message": message,
+        "avatar": avatar,
+    }
+    return EventRecord(epoch, queue, event, EventFields(*fields))
+
+
+_ARCHIVE: Optional[EventArchive] = None
+
+
+def get_archive() -> Optional[EventArchive]:
+    """Process-wide archive, or None when EGGI_ARCHIVE_PATH is empty."""
+    global _ARCHIVE
+    if _ARCHIVE is None and ARCHIVE_PATH:
+        _ARCHIVE = EventArchive(ARCHIVE_PATH)
+    return _ARCHIVE
+
+
+async def close_archive() -> None:
+    """Flush and close the archive at shutdown; a later get_archive() opens a new one."""
+    global _ARCHIVE
+    archive, _ARCHIVE = _ARCHIVE, None
+    if archive is not None:
+        await archive.close()
@@ -0,0 +1,294 @@
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from operator import itemgetter
+from string import Formatter
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+import logging
+import os
+import tomllib
+
+logger = logging.getLogger(__name__)
+
+STATUS_RULES_PATH = os.getenv("EGGI_STATUS_RULES", "status_rules.toml")
+STATUSES = ("OK", "WARN", "ERROR")
+# Values every rule can test and every template can use, in argument order;
+# payload fields named by the rules follow them.
+BASE_FIELDS = (
+    "event_source",
+    "queue",
+    "linkedin_identifier",
+    "job_id",
+    "original_input",
+    "source",
+)
+# (event_source, queue) pairs whose matching rules are remembered.
+RULE_CACHE_SIZE = 4096
+# Payload values that do not count as present ("N/A" is events.MISSING).
+_ABSENT = ("", "N/A")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One [[rules]] entry of status_rules.toml."""
+
+    status: str
+    message: str
+    source: str = "*"  # glob on the event_source
+    queue: str = "*"  # glob on the queue the message was received from
+    # Field -> true (present), false (absent), a value or list of values, or {min, max}.
+    when: dict[str, Any] = field(default_factory=dict)
+
+
+# Used when no rule matches, and when the rules file does not exist.
+DEFAULT_RULES: tuple[Rule, ...] = (
+    Rule("OK", "Prep requested for {linkedin_identifier} via {source}", "*preparation-requested*"),
+    Rule("OK", "Analysis complete for {linkedin_identifier} (Job: {job_id})", "*completed*"),
+    Rule("OK", "Event for {original_input} (Job: {job_id})", "*events*"),
+    Rule("OK", "Received event from {event_source}"),
+)
+
+
+class CompiledRule(NamedTuple):
+    status: str
+    # Renders the message template from (values, rule_values).
+    render: Callable[[tuple, tuple], str]
+    # (argument position, predicate) pairs that must all hold.
+    checks: tuple[tuple[int, Callable[[Any], bool]], ...]
+
+
+class Match(NamedTuple):
+    """The rules that can apply to one (event_source, queue) pair."""
+
+    rules: tuple[CompiledRule, ...]
+    # The one that applies when none of the payload rule fields is set, where
+    # that does not depend on the event's other values.
+    unset: Optional[CompiledRule]
+
+
+class _Fields:
+    """An event's values by field name, the mapping message templates render from.
+
+    Templates only name plain fields (see _template_fields), so str.format_map
+    never reaches attributes or items of the values themselves.
+    """
+
+    __slots__ = ("_positions", "_values", "_rule_values")
+
+    def __init__(self, positions: dict[str, int], values: tuple, rule_values: tuple):
+        self._positions = positions
+        self._values = values
+        self._rule_values = rule_values
+
+    def __getitem__(self, name: str) -> Any:
+        position = self._positions[name]
+        if position < len(BASE_FIELDS):
+            return self._values[position]
+        return self._rule_values[position - len(BASE_FIELDS)]
+
+
+class Classifier:
+    """Matches events against rules, first match wins.
+
+    The source and queue globs are resolved once per (event_source, queue)
+    pair and cached, together with the rule that applies when the payload
+    carries none of the fields the rules test. That is the usual case, and
+    costs two lookups and a comparison; otherwise the candidates' `when`
+    checks run in order.
+    """
+
+    def __init__(self, rules: list[Rule] | tuple[Rule, ...]):
+        names: list[str] = []
+        for number, rule in enumerate(rules, 1):
+            try:
+                names += _field_names(rule.when)
+                names += _template_fields(rule.message)
+            except ValueError as e:
+                raise ValueError(f"Status rule {number}: {e}") from None
+        # Payload fields to decode beyond BASE_FIELDS.
+        self.payload_fields = tuple(dict.fromkeys(n for n in names if n not in BASE_FIELDS))
+        self.fields = BASE_FIELDS + self.payload_fields
+        self._positions = {name: i for i, name in enumerate(self.fields)}
+        self._rules = []
+        for number, rule in enumerate(rules, 1):
+            try:
+                self._rules.append((rule, self._compile(rule)))
+            except ValueError as e:
+                raise ValueError(f"Status rule {number}: {e}") from None
+        self._fallback = self._compile(DEFAULT_RULES[-1])
+        # rule_values of a payload with none of the payload_fields.
+        self.unset_values = (None,) * len(self.payload_fields)
+        # queue -> event_source -> Match; strings cache their hash, tuples do not.
+        self._cache: dict[str, dict[str, Match]] = {}
+        self._cached = 0
+
+    def _compile(self, rule: Rule) -> CompiledRule:
+        if rule.status not in STATUSES:
+            raise ValueError(f"Unknown status {rule.status!r}; expected one of {STATUSES}")
+        checks = tuple(
+            (self._positions[name], _predicate(name, expected))
+            for name, expected in rule.when.items()
+        )
+        return CompiledRule(rule.status, self._renderer(rule.message), checks)
+
+    def _renderer(self, message: str) -> Callable[[tuple, tuple], str]:
+        # Templates were checked by _template_fields; nothing is generated from them.
+        parsed = list(Formatter().parse(message))
+        positions = self._positions
+        if any(spec for _, name, spec, _ in parsed if name is not None):
+            format_map = message.format_map
+
+            def render_formatted(values: tuple, rule_values: tuple) -> str:
+                try:
+                    return format_map(_Fields(positions, values, rule_values))
+                except (TypeError, ValueError):
+                    # A format spec the value does not support, e.g. {job_id:d} on "N/A".
+                    return message
+
+            return render_formatted
+        # Without format specs a field is just str() (or repr/ascii) of its value,
+        # which printf-style formatting produces without re-parsing the template
+        # for every event as str.format_map does: several times faster.
+        template = "".join(
+            literal.replace("%", "%%") + ("" if name is None else "%" + (conversion or "s"))
+            for literal, name, _, conversion in parsed
+        )
+        indexes = [positions[name] for _, name, _, _ in parsed if name is not None]
+        if not indexes:
+            text = template % ()
+            return lambda values, rule_values: text
+        if len(indexes) == 1:
+            index = indexes[0]
+            pick: Callable[[tuple], tuple] = lambda every: (every[index],)  # noqa: E731
+        else:
+            pick = itemgetter(*indexes)
+        return lambda values, rule_values: template % pick(values + rule_values)
+
+    def match(self, event_source: str, queue: str) -> Match:
+        """Rules whose globs match, up to the first one that always applies."""
+        by_source = self._cache.setdefault(queue, {})
+        match = by_source.get(event_source)
+        if match is None:
+            matched: list[CompiledRule] = []
+            for rule, compiled in self._rules:
+                if fnmatchcase(event_source, rule.source) and fnmatchcase(queue, rule.queue):
+                    matched.append(compiled)
+                    if not compiled.checks:
+                        break
+            else:
+                matched.append(self._fallback)
+            unset = None
+            for compiled in matched:
+                if any(position < len(BASE_FIELDS) for position, _ in compiled.checks):
+                    break
+                if all(check(None) for _, check in compiled.checks):
+                    unset = compiled
+                    break
+            if self._cached >= RULE_CACHE_SIZE:
+                self._cache.clear()
+                self._cached = 0
+                by_source = self._cache[queue] = {}
+            match = by_source[event_source] = Match(tuple(matched), unset)
+            self._cached += 1
+        return match
+
+    def classify(self, values: tuple, rule_values: tuple) -> tuple[str, str]:
+        """Status and message for an event.
+
+        `values` holds the BASE_FIELDS and `rule_values` the payload_fields, in order.
+        """
+        by_source = self._cache.get(values[1])
+        match = by_source and by_source.get(values[0]) or self.match(values[0], values[1])
+        rule = match.unset if rule_values == self.unset_values else None
+        if rule is None:
+            every = values + rule_values
+            for rule in match.rules:
+                if all(check(every[position]) for position, check in rule.checks):
+                    break
+        return rule.status, rule.render(values, rule_values)
+
+
+def _template_fields(message: str) -> list[str]:
+    """Field names a message template uses; raises ValueError on anything but plain fields."""
+    names = []
+    for _, name, spec, conversion in Formatter().parse(message):
+        if name is None:
+            continue
+        if not name:
+            raise ValueError(f"Use named fields in message {message!r}")
+        if conversion and conversion not in "rsa":
+            raise ValueError(f"Unknown conversion !{conversion} in {message!r}")
+        if spec and "{" in spec:
+            raise ValueError(f"Nested fields in format specs are not supported: {message!r}")
+        names += _field_names([name])
+    return names
+
+
+def _field_names(names: Iterable[str]) -> list[str]:
+    names = list(names)
+    for name in names:
+        # Rules out "{job_id.__class__}", "{payload[0]}" and the like.
+        if not name.isidentifier() or name == "metadata":
+            raise ValueError(f"{name!r} is not a plain payload field name")
+    return names
+
+
+def _present(value: Any) -> bool:
+    if isinstance(value, str):
+        return value not in _ABSENT
+    return bool(value)
+
+
+def _number(value: Any) -> float | None:
+    if value is None:  # the usual case: the field is not in the payload
+        return None
+    if value.__class__ is int or value.__class__ is float:
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _predicate(name: str, expected: Any) -> Callable[[Any], bool]:
+    if expected is True:
+        return _present
+    if expected is False:
+        return lambda value: not _present(value)
+    if isinstance(expected, dict):
+        low, high = expected.get("min"), expected.get("max")
+        if (low is None and high is None) or set(expected) - {"min", "max"}:
+            raise ValueError(f"Range for {name!r} takes only 'min' and/or 'max': {expected}")
+
+        def in_range(value: Any) -> bool:
+            number = _number(value)
+            return (
+                number is not None
+                and (low is None or number >= low)
+                and (high is None or number <= high)
+            )
+
+        return in_range
+    if isinstance(expected, list):
+        # Compared by equality: payload values may be unhashable.
+        allowed = tuple(expected)
+        return lambda value: value in allowed
+    return lambda value: value == expected
+
+
+def load_rules(path: str) -> tuple[Rule, ...]:
+    try:
+        with open(path, "rb") as f:
+            raw: dict[str, Any] = tomllib.load(f)
+    except FileNotFoundError:
+        logger.info("No status rules at %s; every event is OK", path)
+        return DEFAULT_RULES
+    rules = []
+    for number, spec in enumerate(raw.get("rules", []), 1):
+        try:
+            rules.append(Rule(**spec))
+        except TypeError as e:
+            raise ValueError(f"Status rule {number} in {path}: {e}") from None
+    return tuple(rules)
+
+
+CLASSIFIER = Classifier(load_rules(STATUS_RULES_PATH))
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+import asyncio
+import os
+
+# Maximum snapshot versions published per second; every session pushes at most once per version.
+PUSH_HZ = float(os.getenv("EGGI_PUSH_HZ", "5"))
+
+
+@dataclass
+class BackpressureStats:
+    updates: int = 0  # changes reported by the ingest side
+    frames: int = 0  # versions actually published to sessions
+    merged: int = 0  # changes folded into an already pending frame
+    dropped: int = 0  # events discarded before reaching any session
+    rows_skipped: int = 0  # events that arrived and scrolled out between two frames
+
+    def as_dict(self) -> dict[str, str]:
+        return {name: str(value) for name, value in vars(self).items()}
+
+
+class UpdateCoalescer:
+    """Turns a stream of change notifications into versions at a bounded rate.
+
+    Ingest code calls `mark()` as often as it likes; `run()` publishes at most
+    `max_hz` versions per second, each covering every change since the last
+    one. Waiters block in `wait()` until the version moves.
+    """
+
+    def __init__(self, max_hz: float = PUSH_HZ):
+        self.version = 0
+        self.stats = BackpressureStats()
+        self._interval = 1 / max_hz if max_hz > 0 else 0.0
+        self._pending = 0
+        self._dirty = asyncio.Event()
+        self._changed = asyncio.Event()
+
+    def mark(self) -> None:
+        self.stats.updates += 1
+        if self._pending:
+            self.stats.merged += 1
+        self._pending += 1
+        self._dirty.set()
+
+    async def wait(self, version: int, timeout: Optional[float] = None) -> int:
+        if self.version == version:
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.version
+
+    async def run(self, alive: Callable[[], bool]) -> None:
+        while alive():
+            await self._dirty.wait()
+            self._dirty.clear()
+            self._pending = 0
+            self.version += 1
+            self.stats.frames += 1
+            changed, self._changed = self._changed, asyncio.Event()
+            changed.set()
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,294 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Optional
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import socket
+import struct
+import time
+import uuid
+
+try:
+    import orjson
+
+    encode: Callable[[Any], bytes] = orjson.dumps
+    decode: Callable[[bytes], Any] = orjson.loads
+except ImportError:  # a dependency; the stdlib fallback as in services.events
+
+    def encode(message: Any) -> bytes:
+        return json.dumps(message, separators=(",", ":")).encode()
+
+    decode = json.loads
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import WatchError
+except ImportError:  # optional; only needed for EGGI_COORDINATION=redis://...
+    aioredis = None  # type: ignore[assignment]
+    WatchError = Exception  # type: ignore[assignment,misc]
+
+logger = logging.getLogger(__name__)
+
+# "local" (single worker), "file:/shared/dir" (workers on one box) or "redis://host:6379/0".
+COORDINATION_URL = os.getenv("EGGI_COORDINATION", "local")
+# A leader that has not renewed its lease for this long is replaced.
+LEADER_TTL = float(os.getenv("EGGI_LEADER_TTL", "10"))
+# Identifies this backend worker in leases and demand reports.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+# Messages buffered per local subscriber before the oldest are dropped.
+LOCAL_CHANNEL_DEPTH = 1000
+# File backend: how often subscribers check their channel log for new frames,
+# and the size at which the publisher starts a new log.
+FILE_POLL_INTERVAL = 0.05
+FILE_CHANNEL_MAX_BYTES = 16 * 1024 * 1024
+_FRAME_HEADER = struct.Struct(">I")
+
+
+class Coordinator(ABC):
+    """Leader leases and broadcast channels shared by the backend workers.
+
+    `acquire` both takes and renews a lease; it must be called again within
+    `ttl` seconds or another worker may take over. `subscribe` yields the
+    messages published after it started, in order.
+    """
+
+    # False when this process is the only worker, so nothing needs broadcasting.
+    shared = True
+
+    @abstractmethod
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool: ...
+
+    @abstractmethod
+    async def release(self, name: str, owner: str) -> None: ...
+
+    @abstractmethod
+    async def publish(self, channel: str, message: bytes) -> None: ...
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[bytes]: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalCoordinator(Coordinator):
+    """In-process stand-in: one worker, so it always wins and hears itself."""
+
+    shared = False
+
+    def __init__(self):
+        self._leases: dict[str, tuple[str, float]] = {}
+        self._channels: dict[str, set[asyncio.Queue[bytes]]] = {}
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        holder = self._leases.get(name)
+        now = time.monotonic()
+        if holder is not None and holder[0] != owner and holder[1] > now:
+            return False
+        self._leases[name] = (owner, now + ttl)
+        return True
+
+    async def release(self, name: str, owner: str) -> None:
+        if self._leases.get(name, ("", 0.0))[0] == owner:
+            del self._leases[name]
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for queue in self._channels.get(channel, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue[bytes] = asyncio.Queue(LOCAL_CHANNEL_DEPTH)
+        self._channels.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._channels[channel].discard(queue)
+
+
+class FileCoordinator(Coordinator):
+    """Workers on one host: flock leases and append-only channel logs in `directory`.
+
+    A lease is an exclusive lock on a file, so it lasts exactly as long as the
+    process holding it; the kernel hands it to the next worker when the leader
+    dies, and `ttl` is not needed. Channel logs are tailed like `tail -F`.
+    """
+
+    def __init__(self, directory: str):
+        self._dir = directory
+        os.makedirs(directory, exist_ok=True)
+        self._locks: dict[str, int] = {}
+        self._writers: dict[str, int] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._dir, name.replace(":", "_").replace("/", "_"))
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        if name in self._locks:
+            return True
+        fd = os.open(self._path(name) + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, owner.encode())
+        self._locks[name] = fd
+        return True
+
+    async def release(self, name: str, owner: str) -> None:
+        fd = self._locks.pop(name, None)
+        if fd is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        path = self._path(channel) + ".log"
+        fd = self._writers.get(channel)
+        if fd is None:
+            fd = self._writers[channel] = os.open(
+                path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+            )
+        os.write(fd, _FRAME_HEADER.pack(len(message)) + message)
+        if os.fstat(fd).st_size >= FILE_CHANNEL_MAX_BYTES:
+            # Readers notice the new inode and finish the old file first.
+            os.replace(path, path + ".1")
+            os.close(self._writers.pop(channel))
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        path = self._path(channel) + ".log"
+        f = None
+        buffer = b""
+        try:
+            while f is None:
+                try:
+                    f = open(path, "rb")
+                    f.seek(0, os.SEEK_END)
+                except FileNotFoundError:
+                    await asyncio.sleep(FILE_POLL_INTERVAL)
+            while True:
+                chunk = f.read()
+                rotated = not chunk and _rotated(path, f)
+                if rotated:
+                    # Frames written just before the rename are still in the old file.
+                    chunk = f.read()
+                buffer += chunk
+                while len(buffer) >= _FRAME_HEADER.size:
+                    (size,) = _FRAME_HEADER.unpack_from(buffer)
+                    end = _FRAME_HEADER.size + size
+                    if len(buffer) < end:
+                        break
+                    yield buffer[_FRAME_HEADER.size : end]
+                    buffer = buffer[end:]
+                if rotated:
+                    f.close()
+                    f, buffer = open(path, "rb"), b""
+                elif not chunk:
+                    await asyncio.sleep(FILE_POLL_INTERVAL)
+        finally:
+            if f is not None:
+                f.close()
+
+    async def close(self) -> None:
+        for name in list(self._locks):
+            await self.release(name, "")
+        for fd in self._writers.values():
+            os.close(fd)
+        self._writers.clear()
+
+
+def _rotated(path: str, f) -> bool:
+    try:
+        return os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+
+class RedisCoordinator(Coordinator):
+    """Leases as expiring keys and channels as Redis pub/sub.
+
+    Takes any redis.asyncio-compatible client, including fakeredis's.
+    """
+
+    def __init__(self, client):
+        self._redis = client
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        ttl_ms = int(ttl * 1000)
+        if await self._redis.set(name, owner, nx=True, px=ttl_ms):
+            return True
+        return await self._if_owner(name, owner, lambda pipe: pipe.pexpire(name, ttl_ms))
+
+    async def release(self, name: str, owner: str) -> None:
+        await self._if_owner(name, owner, lambda pipe: pipe.delete(name))
+
+    async def _if_owner(self, name: str, owner: str, action) -> bool:
+        # WATCH makes the check-and-act atomic: it fails if the lease changed hands.
+        async with self._redis.pipeline() as pipe:
+            try:
+                await pipe.watch(name)
+                holder = await pipe.get(name)
+                if holder is None or _text(holder) != owner:
+                    return False
+                pipe.multi()
+                action(pipe)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self._redis.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def _text(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def create_coordinator(url: str) -> Coordinator:
+    if url == "local":
+        return LocalCoordinator()
+    if url.startswith("file:"):
+        return FileCoordinator(url.removeprefix("file:").removeprefix("//") or ".")
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        if aioredis is None:
+            raise RuntimeError("EGGI_COORDINATION=redis://... needs the 'redis' package")
+        return RedisCoordinator(aioredis.from_url(url))
+    raise ValueError(f"Unknown EGGI_COORDINATION backend: {url!r}")
+
+
+_COORDINATOR: Optional[Coordinator] = None
+
+
+def get_coordinator() -> Coordinator:
+    """Process-wide coordinator for EGGI_COORDINATION."""
+    global _COORDINATOR
+    if _COORDINATOR is None:
+        _COORDINATOR = create_coordinator(COORDINATION_URL)
+    return _COORDINATOR
+
+
+def set_coordinator(coordinator: Coordinator) -> None:
+    """Swap the backend, e.g. for a fakeredis-backed RedisCoordinator in a harness."""
+    global _COORDINATOR
+    _COORDINATOR = coordinator
+
@@ -0,0 +1,479 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import re
+import time
+
+from app.services.coordination import LEADER_TTL, WORKER_ID, get_coordinator
+from app.services.events import parse_json
+from app.services.polling import Backoff
+
+logger = logging.getLogger(__name__)
+
+# Messages looked at per inspection; each one is only hidden for SAMPLE_VISIBILITY.
+DLQ_SAMPLE_SIZE = int(os.getenv("EGGI_DLQ_SAMPLE_SIZE", "200"))
+SAMPLE_VISIBILITY = 30
+# Redrive throughput cap (messages/s across all workers) and parallelism.
+REDRIVE_RATE = float(os.getenv("EGGI_REDRIVE_RATE", "300"))
+REDRIVE_WORKERS = int(os.getenv("EGGI_REDRIVE_WORKERS", "8"))
+# Messages a redrive leaves in the DLQ (not selected, or unsendable) are hidden
+# this long so the run does not keep receiving them, hidden again if they come
+# back while it runs, and released as soon as it ends.
+REDRIVE_HOLD_VISIBILITY = 60
+# Sends per message before it is left in the DLQ as failed.
+REDRIVE_SEND_ATTEMPTS = 3
+# A worker stops after this many consecutive receives with no new messages.
+REDRIVE_EMPTY_RECEIVES = 3
+# Tries per batch to delete redriven messages from the DLQ.
+REDRIVE_DELETE_ATTEMPTS = 3
+
+# Where producers put failure details, in the order they are looked for.
+_ERROR_ATTRIBUTES = ("ErrorMessage", "errorMessage", "error", "Error", "exception", "ErrorCode")
+_ERROR_FIELDS = ("error", "error_message", "errorMessage", "exception", "reason")
+# Numbers, hex ids and UUIDs vary per message; masking them groups "the same" error.
+_VARIABLE_PARTS = re.compile(r"[0-9a-f]{8}-[0-9a-f-]{27}|0x[0-9a-f]+|[0-9a-f]{12,}|\d+")
+NO_ERROR = "(no error recorded)"
+
+
+@dataclass(frozen=True)
+class Signature:
+    event_source: str
+    error: str
+    shape: str
+
+    @property
+    def key(self) -> str:
+        raw = f"{self.event_source}\0{self.error}\0{self.shape}".encode()
+        return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+@dataclass
+class MessageGroup:
+    signature: Signature
+    count: int = 0
+    first_sent: float = 0.0
+    last_sent: float = 0.0
+    example: str = ""
+
+    def add(self, message: dict) -> None:
+        sent = _sent_epoch(message)
+        if not self.count:
+            self.first_sent = self.last_sent = sent
+            self.example = message.get("Body", "")[:500]
+        self.count += 1
+        self.first_sent = min(self.first_sent, sent)
+        self.last_sent = max(self.last_sent, sent)
+
+    def as_row(self) -> dict[str, str]:
+        return {
+            "key": self.signature.key,
+            "event_source": self.signature.event_source,
+            "error": self.signature.error,
+            "shape": self.signature.shape,
+            "count": str(self.count),
+            "first_sent": _format_epoch(self.first_sent),
+            "last_sent": _format_epoch(self.last_sent),
+            "example": self.example,
+        }
+
+
+def signature(message: dict) -> Signature:
+    """Group identity of a dead-lettered message: source, normalised error, payload shape."""
+    body_text = message.get("Body", "")
+    try:
+        body = parse_json(body_text)
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        return Signature("unknown-service", _error_text(message, {}), "<not a JSON object>")
+    payload = body.get("payload")
+    payload_keys = ",".join(sorted(payload)) if isinstance(payload, dict) else ""
+    shape = ",".join(sorted(body)) + (f" payload{{{payload_keys}}}" if payload_keys else "")
+    return Signature(
+        str(body.get("event_source", "unknown-service")), _error_text(message, body), shape
+    )
+
+
+def _error_text(message: dict, body: dict) -> str:
+    attributes = message.get("MessageAttributes") or {}
+    text: Any = None
+    for name in _ERROR_ATTRIBUTES:
+        if name in attributes:
+            text = attributes[name].get("StringValue")
+            break
+    if text is None:
+        payload = body.get("payload") if isinstance(body.get("payload"), dict) else {}
+        for source in (body, payload):
+            text = next((source[f] for f in _ERROR_FIELDS if source.get(f)), None)
+            if text is not None:
+                break
+    if text is None:
+        return NO_ERROR
+    if isinstance(text, dict):
+        text = text.get("message") or text.get("type") or str(text)
+    first_line = str(text).strip().splitlines()[0] if str(text).strip() else ""
+    return _VARIABLE_PARTS.sub("#", first_line.lower())[:160] or NO_ERROR
+
+
+async def sample(sqs: Any, queue_url: str, size: int = DLQ_SAMPLE_SIZE) -> list[MessageGroup]:
+    """Peek at up to `size` messages and group them, largest group first.
+
+    Sampled messages stay hidden for the pass (so SQS hands out new ones
+    rather than the same ten again) and are all released at the end: nothing
+    is consumed, receive counts are the only trace.
+    """
+    groups: dict[str, MessageGroup] = {}
+    held: list[dict] = []
+    try:
+        while len(held) < size:
+            resp = await sqs.receive_message(
+                QueueUrl=queue_url,
+                MaxNumberOfMessages=min(10, size - len(held)),
+                VisibilityTimeout=SAMPLE_VISIBILITY,
+                WaitTimeSeconds=1,
+                MessageAttributeNames=["All"],
+                MessageSystemAttributeNames=["SentTimestamp"],
+            )
+            messages = resp.get("Messages", [])
+            if not messages:
+                break
+            held.extend(messages)
+            for message in messages:
+                sig = signature(message)
+                group = groups.get(sig.key)
+                if group is None:
+                    group = groups[sig.key] = MessageGroup(sig)
+                group.add(message)
+    finally:
+        for start in range(0, len(held), 10):
+            await _set_visibility(sqs, queue_url, held[start : start + 10], 0)
+    return sorted(groups.values(), key=lambda g: g.count, reverse=True)
+
+
+class RateLimiter:
+    """Token bucket shared by the redrive workers."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self._rate = rate
+        self._capacity = burst if burst is not None else max(rate, 10.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: int) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self._rate)
+
+
+@dataclass
+class RedriveJob:
+    """Moves messages whose group is in `keys` (all when empty) from a DLQ to its source."""
+
+    dlq_name: str
+    target_name: str
+    keys: frozenset[str] = frozenset()
+    limit: Optional[int] = None
+    moved: int = 0
+    failed: int = 0
+    skipped: int = 0
+    state: str = "pending"
+    error: str = ""
+    started_at: float = field(default_factory=time.time)
+    finished_at: float = 0.0
+    # Messages received but not yet counted, claimed against `limit` by the workers.
+    _reserved: int = field(default=0, repr=False)
+    # MessageIds copied to the target whose DLQ delete failed: if received
+    # again they are deleted, not sent a second time.
+    _copied: set[str] = field(default_factory=set, repr=False)
+    # Failed sends so far, by MessageId.
+    _send_failures: dict[str, int] = field(default_factory=dict, repr=False)
+    # Receipt handles of the messages left in the DLQ (skipped or failed), by
+    # MessageId: counted once, kept hidden during the run, released at the end.
+    _held: dict[str, str] = field(default_factory=dict, repr=False)
+
+    def as_dict(self) -> dict[str, str]:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "dlq": self.dlq_name,
+            "target": self.target_name,
+            "state": self.state,
+            "moved": str(self.moved),
+            "failed": str(self.failed),
+            "skipped": str(self.skipped),
+            "rate": f"{self.moved / elapsed:.0f}/s" if elapsed > 0 else "-",
+            "error": self.error,
+        }
+
+    def _reserve(self) -> int:
+        """Claim up to one receive batch against `limit`, held until the batch is done."""
+        room = 10
+        if self.limit is not None:
+            room = max(0, min(room, self.limit - self.moved - self._reserved))
+        self._reserved += room
+        return room
+
+    async def run(
+        self,
+        sqs: Any,
+        rate: float = REDRIVE_RATE,
+        workers: int = REDRIVE_WORKERS,
+    ) -> None:
+        self.state = "running"
+        dlq_url = ""
+        try:
+            dlq_url = (await sqs.get_queue_url(QueueName=self.dlq_name))["QueueUrl"]
+            target_url = (await sqs.get_queue_url(QueueName=self.target_name))["QueueUrl"]
+            limiter = RateLimiter(rate)
+            await asyncio.gather(
+                *(self._worker(sqs, dlq_url, target_url, limiter) for _ in range(workers))
+            )
+            self.state = "done"
+            problems = []
+            if self.failed:
+                problems.append(f"{self.failed} messages could not be sent to {self.target_name}")
+            if self._copied:
+                problems.append(
+                    f"{len(self._copied)} messages were copied to {self.target_name} "
+                    "but could not be deleted from the DLQ"
+                )
+            self.error = "; ".join(problems)
+        except asyncio.CancelledError:
+            self.state = "cancelled"
+            raise
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.exception("Redrive %s -> %s failed: %s", self.dlq_name, self.target_name, e)
+        finally:
+            if self._held:
+                await self._release(sqs, dlq_url)
+            self.finished_at = time.time()
+
+    async def run_exclusive(self, sqs: Any) -> None:
+        """`run` while holding the DLQ's redrive lease, so that no two backend
+        workers redrive the same DLQ at once. Another worker's run fails this one."""
+        coordinator = get_coordinator()
+        lease = f"eggi:redrive:{self.dlq_name}"
+        try:
+            won = await coordinator.acquire(lease, WORKER_ID, LEADER_TTL)
+        except Exception as e:
+            won = False
+            logger.exception("Redrive lease for %s failed: %s", self.dlq_name, e)
+        if not won:
+            self.state = "failed"
+            self.error = f"A redrive of {self.dlq_name} is already running on another worker."
+            self.finished_at = time.time()
+            return
+        renewed_at = time.monotonic()
+        run = asyncio.create_task(self.run(sqs))
+        try:
+            while not (await asyncio.wait({run}, timeout=LEADER_TTL / 3))[0]:
+                try:
+                    renewed = await coordinator.acquire(lease, WORKER_ID, LEADER_TTL)
+                except Exception as e:
+                    logger.exception(
+                        "Renewing the redrive lease for %s failed: %s", self.dlq_name, e
+                    )
+                    # Unconfirmed: carry on only while the old lease must still hold.
+                    renewed = time.monotonic() - renewed_at < LEADER_TTL
+                else:
+                    if renewed:
+                        renewed_at = time.monotonic()
+                if not renewed:
+                    run.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await run
+                    self.error = f"Stopped: lost the redrive lease for {self.dlq_name}."
+                    return
+        finally:
+            if not run.done():
+                run.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await run
+            with contextlib.suppress(Exception):
+                await coordinator.release(lease, WORKER_ID)
+
+    async def _worker(self, sqs: Any, dlq_url: str, target_url: str, limiter: RateLimiter):
+        empty = 0
+        backoff = Backoff()
+        while empty < REDRIVE_EMPTY_RECEIVES:
+            room = self._reserve()
+            if not room:
+                if not self._reserved:
+                    return  # limit reached
+                # Other workers hold the rest of the limit; wait for what they leave.
+                await asyncio.sleep(0.1)
+                continue
+            try:
+                resp = await sqs.receive_message(
+                    QueueUrl=dlq_url,
+                    MaxNumberOfMessages=room,
+                    VisibilityTimeout=60,
+                    WaitTimeSeconds=2,
+                    MessageAttributeNames=["All"],
+                )
+                messages = resp.get("Messages", [])
+                # Held messages whose hold ran out come back; hide them again.
+                again = [m for m in messages if m["MessageId"] in self._held]
+                if again:
+                    await self._hold(sqs, dlq_url, again)
+                    messages = [m for m in messages if m["MessageId"] not in self._held]
+                if not messages:
+                    empty += 1
+                    continue
+                empty = 0
+                selected = messages
+                if self.keys:
+                    selected, rest = [], []
+                    for m in messages:
+                        (selected if signature(m).key in self.keys else rest).append(m)
+                    if rest:
+                        self.skipped += len(rest)
+                        await self._hold(sqs, dlq_url, rest)
+                copied = [m for m in selected if m["MessageId"] in self._copied]
+                if copied:
+                    selected = [m for m in selected if m["MessageId"] not in self._copied]
+                    await self._delete(sqs, dlq_url, copied)
+                if selected:
+                    await limiter.acquire(len(selected))
+                    await self._move(sqs, dlq_url, target_url, selected)
+                backoff.reset()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = backoff.next_delay()
+                logger.exception("Redrive batch from %s failed: %s", self.dlq_name, e)
+                await asyncio.sleep(delay)
+            finally:
+                self._reserved -= room
+
+    async def _move(self, sqs: Any, dlq_url: str, target_url: str, messages: list[dict]):
+        by_id = {str(i): m for i, m in enumerate(messages)}
+        resp = await sqs.send_message_batch(
+            QueueUrl=target_url,
+            Entries=[
+                {
+                    "Id": entry_id,
+                    "MessageBody": m["Body"],
+                    **(
+                        {"MessageAttributes": m["MessageAttributes"]}
+                        if m.get("MessageAttributes")
+                        else {}
+                    ),
+                }
+                for entry_id, m in by_id.items()
+            ],
+        )
+        sent = [by_id[e["Id"]] for e in resp.get("Successful", [])]
+        # Delete only what the target acknowledged. The rest is retried at once
+        # until it has failed REDRIVE_SEND_ATTEMPTS times, then left in the DLQ:
+        # a target that rejects a message (e.g. a FIFO queue without a
+        # MessageGroupId) rejects it every time.
+        retry: list[dict] = []
+        given_up: list[dict] = []
+        codes: set[str] = set()
+        for entry in resp.get("Failed", []):
+            m = by_id[entry["Id"]]
+            codes.add(entry.get("Code", "?"))
+            attempts = self._send_failures.get(m["MessageId"], 0) + 1
+            self._send_failures[m["MessageId"]] = attempts
+            (given_up if attempts >= REDRIVE_SEND_ATTEMPTS else retry).append(m)
+        if retry:
+            await _set_visibility(sqs, dlq_url, retry, 0)
+        if given_up:
+            self.failed += len(given_up)
+            await self._hold(sqs, dlq_url, given_up)
+            logger.warning(
+                "Redrive %s -> %s: %d messages could not be sent (%s)",
+                self.dlq_name,
+                self.target_name,
+                len(given_up),
+                ", ".join(sorted(codes)),
+            )
+        if sent:
+            await self._delete(sqs, dlq_url, sent)
+
+    async def _delete(self, sqs: Any, dlq_url: str, messages: list[dict]) -> None:
+        """Delete messages already copied to the target; only those count as moved."""
+        backoff = Backoff()
+        undeleted: list[dict] = []
+        codes: set[str] = set()
+        for attempt in range(REDRIVE_DELETE_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(backoff.next_delay())
+            by_id = {str(i): m for i, m in enumerate(messages)}
+            resp = await sqs.delete_message_batch(
+                QueueUrl=dlq_url,
+                Entries=[
+                    {"Id": entry_id, "ReceiptHandle": m["ReceiptHandle"]}
+                    for entry_id, m in by_id.items()
+                ],
+            )
+            for entry in resp.get("Successful", []):
+                self._copied.discard(by_id[entry["Id"]]["MessageId"])
+                self.moved += 1
+            messages = []
+            for entry in resp.get("Failed", []):
+                codes.add(entry.get("Code", "?"))
+                # Sender faults (e.g. an expired receipt handle) fail again on retry.
+                (undeleted if entry.get("SenderFault") else messages).append(by_id[entry["Id"]])
+            if not messages:
+                break
+        undeleted += messages
+        if undeleted:
+            self._copied.update(m["MessageId"] for m in undeleted)
+            logger.warning(
+                "Redrive %s -> %s: %d copied messages could not be deleted (%s)",
+                self.dlq_name,
+                self.target_name,
+                len(undeleted),
+                ", ".join(sorted(codes)),
+            )
+
+    async def _hold(self, sqs: Any, dlq_url: str, messages: list[dict]) -> None:
+        self._held.update((m["MessageId"], m["ReceiptHandle"]) for m in messages)
+        await _set_visibility(sqs, dlq_url, messages, REDRIVE_HOLD_VISIBILITY)
+
+    async def _release(self, sqs: Any, dlq_url: str) -> None:
+        """Make the messages the run left in the DLQ visible again."""
+        held = [{"ReceiptHandle": handle} for handle in self._held.values()]
+        self._held.clear()
+        try:
+            for start in range(0, len(held), 10):
+                await _set_visibility(sqs, dlq_url, held[start : start + 10], 0)
+        except Exception as e:
+            # They reappear by themselves within REDRIVE_HOLD_VISIBILITY.
+            logger.warning("Redrive %s: releasing held messages failed: %s", self.dlq_name, e)
+
+
+async def _set_visibility(sqs: Any, queue_url: str, messages: list[dict], timeout: int) -> None:
+    await sqs.change_message_visibility_batch(
+        QueueUrl=queue_url,
+        Entries=[
+            {"Id": str(i), "ReceiptHandle": m["ReceiptHandle"], "VisibilityTimeout": timeout}
+            for i, m in enumerate(messages)
+        ],
+    )
+
+
+def _sent_epoch(message: dict) -> float:
+    sent = (message.get("Attributes") or {}).get("SentTimestamp")
+    return int(sent) / 1000 if sent else time.time()
+
+
+def _format_epoch(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch).strftime("%d %b %H:%M:%S") if epoch else "-"
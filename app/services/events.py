@@ -0,0 +1,231 @@
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Callable, NamedTuple, Optional
+import json
+import logging
+import time
+
+from app.services.classification import CLASSIFIER
+from app.services.models import Event
+
+try:
+    import orjson
+
+    # Plain JSON parsing, for bodies that are not decoded into events (e.g. DLQ messages).
+    parse_json: Callable[[str | bytes], Any] = orjson.loads
+except ImportError:  # a dependency; the stdlib parser gives identical results, slower
+    parse_json = json.loads
+
+try:
+    import msgspec
+except ImportError:  # a dependency; without it bodies are decoded into plain dicts
+    msgspec = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+AVATAR = "/icon_gray_simple.png"
+MISSING = "N/A"
+
+
+class EventFields(NamedTuple):
+    """Payload fields kept alongside an event for archiving and lookups."""
+
+    linkedin_identifier: str = ""
+    job_id: str = ""
+    original_input: str = ""
+    source: str = ""
+
+
+class EventRecord(NamedTuple):
+    epoch: float
+    queue: str
+    event: Event
+    fields: EventFields = EventFields()
+
+
+_new_tuple = tuple.__new__
+_NO_ATTRIBUTES: dict[str, str] = {}
+# Payload fields the status rules look at, decoded next to the usual ones.
+_RULE_FIELDS = CLASSIFIER.payload_fields
+# Characters 10, 13 and 16 of an ISO-8601 "YYYY-MM-DDTHH:MM:SS" timestamp.
+_ISO_SEPARATORS = ("T::", " ::")
+
+
+def display_time(timestamp: Optional[str]) -> str:
+    """HH:MM:SS of an ISO-8601 timestamp, as written (no timezone conversion)."""
+    if timestamp is None:
+        return time.strftime("%H:%M:%S", time.gmtime())
+    # "YYYY-MM-DDTHH:MM:SS..." already carries the wall-clock digits.
+    if len(timestamp) >= 19 and timestamp[10:17:3] in _ISO_SEPARATORS:
+        return timestamp[11:19]
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).strftime("%H:%M:%S")
+
+
+def _build(
+    event_source: str,
+    timestamp: Optional[str],
+    linkedin_id: Any,
+    job_id: Any,
+    original_input: Any,
+    source: Any,
+    queue: str,
+    rule_values: tuple,
+) -> tuple[Event, EventFields]:
+    status, message = CLASSIFIER.classify(
+        (event_source, queue, linkedin_id, job_id, original_input, source), rule_values
+    )
+    event: Event = {
+        "timestamp": display_time(timestamp),
+        "service": event_source,
+        "status": status,
+        "message": message,
+        "avatar": AVATAR,
+    }
+    # tuple.__new__ skips the NamedTuple constructor's keyword handling.
+    fields = _new_tuple(
+        EventFields,
+        (_field(linkedin_id), _field(job_id), _field(original_input), _field(source)),
+    )
+    return event, fields
+
+
+if msgspec is not None:
+
+    # gc=False: decoded JSON cannot form reference cycles, and untracked
+    # structs are cheaper to allocate and free.
+    class _Metadata(msgspec.Struct, gc=False):
+        source: Any = MISSING
+
+    _Payload = msgspec.defstruct(
+        "_Payload",
+        [
+            ("linkedin_identifier", Any, MISSING),
+            ("job_id", Any, MISSING),
+            ("original_input", Any, MISSING),
+            ("metadata", Optional[_Metadata], None),
+            *((name, Any, None) for name in _RULE_FIELDS),
+        ],
+        gc=False,
+    )
+
+    class _Body(msgspec.Struct, gc=False):
+        event_source: str = "unknown-service"
+        timestamp: Optional[str] = None
+        payload: _Payload = msgspec.field(default_factory=_Payload)
+
+    # Only the fields above are materialised; the rest of the payload is skipped.
+    _body_decoder = msgspec.json.Decoder(_Body)
+    _batch_decoder = msgspec.json.Decoder(list[_Body])
+
+    # Payload -> tuple of the rule fields' values.
+    if len(_RULE_FIELDS) > 1:
+        _rule_values: Callable[[Any], tuple] = attrgetter(*_RULE_FIELDS)
+    elif _RULE_FIELDS:
+        _get_rule_field = attrgetter(_RULE_FIELDS[0])
+        _rule_values = lambda payload: (_get_rule_field(payload),)  # noqa: E731
+    else:
+        _rule_values = lambda payload: ()  # noqa: E731
+
+    def _from_body(body: "_Body", queue: str) -> tuple[Event, EventFields]:
+        payload = body.payload
+        return _build(
+            body.event_source,
+            body.timestamp,
+            payload.linkedin_identifier,
+            payload.job_id,
+            payload.original_input,
+            payload.metadata.source if payload.metadata is not None else MISSING,
+            queue,
+            _rule_values(payload),
+        )
+
+
+def _decode_typed(
+    message_body: str | bytes, queue: str = ""
+) -> Optional[tuple[Event, EventFields]]:
+    try:
+        return _from_body(_body_decoder.decode(message_body), queue)
+    except (msgspec.DecodeError, ValueError) as e:
+        logger.exception(f"Failed to parse SQS message: {e}")
+        return None
+
+
+def _decode_dict(
+    message_body: str | bytes, queue: str = ""
+) -> Optional[tuple[Event, EventFields]]:
+    try:
+        body_json = parse_json(message_body)
+        payload = body_json.get("payload", {})
+        metadata = payload.get("metadata") or {}
+        return _build(
+            body_json.get("event_source", "unknown-service"),
+            body_json.get("timestamp"),
+            payload.get("linkedin_identifier", MISSING),
+            payload.get("job_id", MISSING),
+            payload.get("original_input", MISSING),
+            metadata.get("source", MISSING),
+            queue,
+            tuple(payload.get(name) for name in _RULE_FIELDS),
+        )
+    except (KeyError, AttributeError, TypeError, ValueError) as e:
+        logger.exception(f"Failed to parse SQS message: {e}")
+        return None
+
+
+def decode_event(
+    message_body: str | bytes, queue: str = ""
+) -> Optional[tuple[Event, EventFields]]:
+    """Decode one body; `queue` is where it was received from, for the status rules."""
+    if msgspec is not None:
+        return _decode_typed(message_body, queue)
+    return _decode_dict(message_body, queue)
+
+
+def decode_bodies(
+    bodies: list[str], queue: str = ""
+) -> list[Optional[tuple[Event, EventFields]]]:
+    """Decode many bodies at once; unparsable ones come back as None."""
+    if msgspec is None:
+        return [_decode_dict(body, queue) for body in bodies]
+    try:
+        # One decoder call for the whole batch; fall back per body if any is bad.
+        parsed = _batch_decoder.decode("[" + ",".join(bodies) + "]")
+        if len(parsed) == len(bodies):
+            return [_from_body(body, queue) for body in parsed]
+    except (msgspec.DecodeError, ValueError):
+        pass
+    return [_decode_typed(body, queue) for body in bodies]
+
+
+def decode_messages(
+    messages: list[dict], queue: str
+) -> tuple[list[EventRecord], list[dict]]:
+    """Decode a `receive_message` batch.
+
+    Returns the records in message order and the messages they came from;
+    messages without a receipt handle or with an unparsable body are skipped.
+    """
+    kept = [m for m in messages if m.get("ReceiptHandle")]
+    decoded = decode_bodies([m.get("Body", "{}") for m in kept], queue)
+    records: list[EventRecord] = []
+    handled: list[dict] = []
+    now = time.time()
+    for m, result in zip(kept, decoded):
+        if result is None:
+            continue
+        sent = m.get("Attributes", _NO_ATTRIBUTES).get("SentTimestamp")
+        epoch = int(sent) / 1000 if sent else now
+        records.append(_new_tuple(EventRecord, (epoch, queue, result[0], result[1])))
+        handled.append(m)
+    return records, handled
+
+
+def create_event_from_sqs(message_body: str) -> Optional[Event]:
+    decoded = decode_event(message_body)
+    return decoded[0] if decoded is not None else None
+
+
+def _field(value: object) -> str:
+    if value.__class__ is str:
+        return value if value != MISSING else ""  # type: ignore[return-value]
+    return "" if value is None else str(value)
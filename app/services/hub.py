@@ -0,0 +1,780 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import Any, AsyncIterator, Optional
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import time
+
+from app.services import queues
+from app.services.archive import get_archive
+from app.services.coalescer import BackpressureStats, UpdateCoalescer
+from app.services.coordination import LEADER_TTL, WORKER_ID, decode, encode, get_coordinator
+from app.services.latency import JobCorrelator
+from app.services.metrics import Gauge
+from app.services.models import QueueAttributes
+from app.services.polling import (
+    ATTRIBUTE_IDLE_MAX_INTERVAL,
+    ATTRIBUTE_IDLE_MIN_INTERVAL,
+    ATTRIBUTE_MAX_INTERVAL,
+    ATTRIBUTE_MIN_INTERVAL,
+    AdaptiveSchedule,
+    Backoff,
+)
+from app.services.ring_buffer import RingBuffer
+from app.services.queue_attributes import (
+    QueueAttributeCollector,
+    discover_queues,
+    is_queue_missing,
+)
+from app.services.rates import RateEstimator, format_eta, format_rate
+from app.services.recording import (
+    RECORD_DIR,
+    Recorder,
+    get_replay,
+    pace,
+    replay_attributes,
+    replay_messages,
+)
+from app.services.search import EventIndex
+from app.services.service_stats import ServiceStats
+from app.services.sqs_client import get_sqs_pool
+from app.services.events import EventFields, EventRecord, decode_messages
+from app.services.streaming import (
+    DEFAULT_STREAM_CONFIG,
+    STREAM_CONFIGS,
+    StreamConfig,
+    StreamEngine,
+)
+from app.services.supervisor import supervisor
+from app.services.timeseries import TimeSeriesStore
+
+logger = logging.getLogger(__name__)
+
+# Events retained per environment; sessions only ever copy the newest slice of it.
+RETAINED_EVENTS = int(os.getenv("EGGI_RETAINED_EVENTS", "50000"))
+# Archived events loaded into an empty hub when it first starts.
+ARCHIVE_BACKFILL = int(os.getenv("EGGI_ARCHIVE_BACKFILL", "1000"))
+# How often followers tell the leader whether anyone on their worker is watching.
+DEMAND_INTERVAL = 2.0
+# Broadcast messages waiting to be published; beyond this the oldest are dropped.
+OUTBOX_MAX = 1000
+
+
+class QueueHub:
+    """Single SQS poller for one environment, shared by every subscribed session.
+
+    The hub owns the attribute and long-poll loops and keeps the latest snapshot
+    (queue depths, recent events, counters). Sessions never talk to SQS; they wait
+    for the hub's version to change and copy the snapshot into their own state.
+
+    Every session subscribes to every environment's hub so switching is only a
+    change of view; hubs without viewers refresh depths at the idle rate.
+
+    With several backend workers, the hubs for one environment elect a leader
+    through the coordinator (services.coordination). Only the leader polls SQS;
+    it broadcasts depth samples and events, and followers apply them exactly as
+    if they had polled themselves. Followers report their subscribers back so
+    the leader parks or slows down only when no worker has anyone watching.
+
+    With EGGI_RECORD_DIR set the leader also records what it receives; with
+    EGGI_REPLAY it plays a recording through the same ingest path instead of
+    polling SQS (services.recording).
+    """
+
+    def __init__(self, env: str):
+        self.env = env
+        # Configured queues first, then whatever discovery finds (see queues.toml).
+        self.queue_names = queues.queue_names(env)
+        self.dlq_queue_names = queues.dlq_queue_names(env)
+        self.queue_attributes: dict[str, QueueAttributes] = {}
+        self.events: RingBuffer[EventRecord] = RingBuffer(RETAINED_EVENTS)
+        # Sliding-window event counts per service and status.
+        self.service_stats = ServiceStats()
+        # Week-long history for the configured queues only, not discovered ones.
+        configured = set(self.queue_names + self.dlq_queue_names)
+        self.timeseries = TimeSeriesStore(configured.__contains__)
+        self.index = EventIndex()
+        self.latency = JobCorrelator()
+        self.rates = RateEstimator()
+        # Cumulative streamed messages per queue, the arrival signal for `rates`
+        # where every message is seen (see _observed).
+        self.arrivals: dict[str, int] = dict.fromkeys(self.queue_names, 0)
+        # How each queue is being streamed, after any mirror fallback; queues
+        # that are not streamed are absent.
+        self._streaming: dict[str, StreamConfig] = {}
+        # StreamEngine.lost per queue as of that queue's previous depth sample.
+        self._lost_at_sample: dict[str, int] = {}
+        self._updates = UpdateCoalescer()
+        self._subscribers = 0
+        # Subscribers whose browser is currently disconnected.
+        self._paused = 0
+        # Set while at least one subscriber is connected; SQS loops park otherwise.
+        self._active = asyncio.Event()
+        # Connected sessions currently showing this environment.
+        self._viewers = 0
+        self._view_changed = asyncio.Event()
+        self._lifecycle = asyncio.Lock()
+        self._collector = QueueAttributeCollector()
+        self._engine = StreamEngine(self._record_events)
+        self._backfilled = False
+        # "leader" polls SQS, "follower" mirrors the leader, "idle" before the first election.
+        self.role = "idle"
+        # Other workers' demand while leading: worker -> (active, viewers, expires at).
+        self._remote_demand: dict[str, tuple[bool, int, float]] = {}
+        self._demand_changed = asyncio.Event()
+        self._outbox: deque[bytes] = deque(maxlen=OUTBOX_MAX)
+        self._outbox_ready = asyncio.Event()
+
+    @property
+    def subscribers(self) -> int:
+        return self._subscribers
+
+    @property
+    def viewers(self) -> int:
+        return self._viewers
+
+    @property
+    def viewed(self) -> bool:
+        """Whether anyone, on this worker or (when leading) another, shows this environment."""
+        return self._viewers + sum(viewers for _, viewers, _ in self._remote_demand.values()) > 0
+
+    @property
+    def version(self) -> int:
+        return self._updates.version
+
+    @property
+    def backpressure(self) -> BackpressureStats:
+        self._updates.stats.dropped = self._engine.dropped
+        return self._updates.stats
+
+    @property
+    def active(self) -> bool:
+        return self._active.is_set()
+
+    @property
+    def task_prefix(self) -> str:
+        return f"hub:{self.env}:"
+
+    @property
+    def poll_prefix(self) -> str:
+        # Tasks that talk to SQS; only the leader runs them.
+        return self.task_prefix + "poll:"
+
+    @property
+    def follow_prefix(self) -> str:
+        return self.task_prefix + "follow:"
+
+    @property
+    def _lease(self) -> str:
+        return f"eggi:leader:{self.env}"
+
+    @property
+    def _data_channel(self) -> str:
+        return f"eggi:{self.env}:data"
+
+    @property
+    def _demand_channel(self) -> str:
+        return f"eggi:{self.env}:demand"
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator["QueueHub"]:
+        async with self._lifecycle:
+            self._subscribers += 1
+            self._update_active()
+            if self._subscribers == 1:
+                await self._start()
+        try:
+            yield self
+        finally:
+            async with self._lifecycle:
+                self._subscribers -= 1
+                self._update_active()
+                if self._subscribers == 0:
+                    await self._stop()
+
+    def pause_subscriber(self) -> None:
+        """A subscriber's client went away; polling stops once no one is left watching."""
+        self._paused += 1
+        self._update_active()
+
+    def resume_subscriber(self) -> None:
+        self._paused = max(0, self._paused - 1)
+        self._update_active()
+
+    def watch(self) -> None:
+        """A subscriber started showing this environment: refresh at the full rate."""
+        self._viewers += 1
+        self._view_changed.set()
+        self._demand_changed.set()
+
+    def unwatch(self) -> None:
+        self._viewers = max(0, self._viewers - 1)
+        self._view_changed.set()
+        self._demand_changed.set()
+
+    def _update_active(self) -> None:
+        remote = any(active for active, _, _ in self._remote_demand.values())
+        if self._subscribers > self._paused or remote:
+            self._active.set()
+        else:
+            self._active.clear()
+        self._demand_changed.set()
+
+    async def wait_for_update(self, version: int, timeout: Optional[float] = None) -> int:
+        """Wait until the hub moves past `version` (or `timeout` expires)."""
+        return await self._updates.wait(version, timeout)
+
+    def _publish(self) -> None:
+        # Coalesced: sessions see at most PUSH_HZ versions per second however
+        # many batches and attribute refreshes land in between.
+        self._updates.mark()
+
+    async def _start(self) -> None:
+        logger.info("Starting %s queue hub", self.env)
+        if not self._backfilled:
+            self._backfilled = True
+            await self._backfill()
+        await supervisor.start(
+            self.task_prefix + "flush", self._flush_updates, env=self.env, kind="flush"
+        )
+        await supervisor.start(
+            self.task_prefix + "elect", self._elect, env=self.env, kind="elect"
+        )
+
+    async def _elect(self, generation: int) -> None:
+        """Take or renew the environment's lease and switch role when it changes hands."""
+        key = self.task_prefix + "elect"
+        coordinator = get_coordinator()
+        renewed_at = 0.0
+        try:
+            while supervisor.is_current(key, generation):
+                try:
+                    won = await coordinator.acquire(self._lease, WORKER_ID, LEADER_TTL)
+                except Exception as e:
+                    logger.exception("Leader election for %s failed: %s", self.env, e)
+                    # Unconfirmed: keep leading only while the old lease must still hold.
+                    won = self.role == "leader" and time.monotonic() - renewed_at < LEADER_TTL
+                else:
+                    if won:
+                        renewed_at = time.monotonic()
+                if won and self.role != "leader":
+                    await self._lead(coordinator.shared)
+                elif not won and self.role != "follower":
+                    await self._follow()
+                self._expire_demand()
+                await asyncio.sleep(LEADER_TTL / 3)
+        finally:
+            if self.role == "leader":
+                # Hand over now rather than after the lease times out.
+                await supervisor.cancel_prefix(self.poll_prefix)
+                await self._stop_recording()
+                with contextlib.suppress(Exception):
+                    await coordinator.release(self._lease, WORKER_ID)
+            self.role = "idle"
+
+    async def _lead(self, shared: bool) -> None:
+        logger.info("Worker %s leads %s polling", WORKER_ID, self.env)
+        await supervisor.cancel_prefix(self.follow_prefix)
+        self.role = "leader"
+        self._remote_demand.clear()
+        self._update_active()
+        prefix = self.poll_prefix
+        if shared:
+            await supervisor.start(
+                prefix + "broadcast", self._publish_outbox, env=self.env, kind="broadcast"
+            )
+            await supervisor.start(
+                prefix + "demand", self._collect_demand, env=self.env, kind="demand"
+            )
+        await supervisor.start(prefix + "merge", self._merge_streams, env=self.env, kind="merge")
+        recording = get_replay()
+        if recording is not None:
+            # Offline: the recording stands in for SQS, and only for its own environment.
+            if recording.env == self.env:
+                await supervisor.start(prefix + "replay", self._replay, env=self.env, kind="replay")
+            return
+        if RECORD_DIR:
+            self._engine.recorder = Recorder.in_directory(RECORD_DIR, self.env)
+            logger.info("Recording %s traffic to %s", self.env, self._engine.recorder.path)
+        await supervisor.start(
+            prefix + "attributes", self._update_queue_attributes, env=self.env, kind="attributes"
+        )
+        if queues.TOPOLOGY.discovery_prefixes:
+            await supervisor.start(
+                prefix + "discover", self._discover_queues, env=self.env, kind="discover"
+            )
+        # Only configured queues are streamed; discovered ones get depths only.
+        for base_name in queues.QUEUE_BASE_NAMES:
+            queue_name = queues.env_queue_name(base_name, self.env)
+            config = STREAM_CONFIGS.get(base_name, DEFAULT_STREAM_CONFIG)
+            self._streaming[queue_name] = config
+            for worker in range(config.workers):
+                await supervisor.start(
+                    f"{prefix}stream:{queue_name}:{worker}",
+                    functools.partial(self._stream_data, queue_name, config, worker),
+                    env=self.env,
+                    kind="stream",
+                )
+
+    async def _follow(self) -> None:
+        if self.role == "leader":
+            logger.info("Worker %s lost the %s lease, following", WORKER_ID, self.env)
+        await supervisor.cancel_prefix(self.poll_prefix)
+        await self._stop_recording()
+        self.role = "follower"
+        self._remote_demand.clear()
+        self._update_active()
+        self._outbox.clear()
+        await supervisor.start(
+            self.follow_prefix + "data", self._follow_leader, env=self.env, kind="follow"
+        )
+        await supervisor.start(
+            self.follow_prefix + "demand", self._announce_demand, env=self.env, kind="demand"
+        )
+
+    async def _stop_recording(self) -> None:
+        recorder, self._engine.recorder = self._engine.recorder, None
+        if recorder is not None:
+            await recorder.close()
+
+    async def _backfill(self) -> None:
+        archive = get_archive()
+        # A replay starts from an empty hub so its numbers are the recording's alone.
+        if archive is None or len(self.events) or get_replay() is not None:
+            return
+        try:
+            records = await archive.recent(self.env, min(ARCHIVE_BACKFILL, RETAINED_EVENTS))
+        except Exception as e:
+            logger.exception("Could not backfill %s events from archive: %s", self.env, e)
+            return
+        self._append_records(records)
+        self._publish()
+
+    async def _stop(self) -> None:
+        logger.info("Stopping %s queue hub", self.env)
+        # Pollers first, so a successor never overlaps with them.
+        await supervisor.cancel_prefix(self.poll_prefix)
+        await supervisor.cancel_prefix(self.task_prefix)
+
+    async def _update_queue_attributes(self, generation: int) -> None:
+        key = self.poll_prefix + "attributes"
+        schedule = AdaptiveSchedule([])
+        viewed = True
+        while supervisor.is_current(key, generation):
+            await self._active.wait()
+            self._view_changed.clear()
+            if viewed != self.viewed:
+                viewed = not viewed
+                if viewed:
+                    schedule.set_bounds(
+                        ATTRIBUTE_MIN_INTERVAL, ATTRIBUTE_MAX_INTERVAL, time.monotonic()
+                    )
+                else:
+                    schedule.set_bounds(
+                        ATTRIBUTE_IDLE_MIN_INTERVAL, ATTRIBUTE_IDLE_MAX_INTERVAL, time.monotonic()
+                    )
+            schedule.track(self.queue_names + self.dlq_queue_names)
+            due = schedule.due(time.monotonic())
+            if due:
+                try:
+                    # Inside the try: a client that cannot be created yet backs off
+                    # like any failed call.
+                    sqs = await get_sqs_pool().get()
+                    # Start from the previous values to avoid flashing placeholders.
+                    self.queue_attributes = await self._collector.collect(
+                        sqs, due, self.queue_attributes
+                    )
+                    polled = time.monotonic()
+                    sampled = {}
+                    for name in due:
+                        if name in self._collector.failed:
+                            schedule.record_error(name, polled)
+                        else:
+                            sampled[name] = self.queue_attributes[name]
+                            schedule.record(name, polled, sampled[name])
+                    self._sample_attributes(sampled)
+                    if self._engine.recorder is not None:
+                        self._engine.recorder.record_attributes(sampled)
+                except Exception as e:
+                    logger.exception("Error in queue attribute update loop: %s", e)
+                    polled = time.monotonic()
+                    for name in due:
+                        schedule.record_error(name, polled)
+            # Woken early when the environment gains or loses its viewers.
+            try:
+                await asyncio.wait_for(
+                    self._view_changed.wait(),
+                    max(schedule.next_due() - time.monotonic(), 0.05),
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _discover_queues(self, generation: int) -> None:
+        key = self.poll_prefix + "discover"
+        topology = queues.TOPOLOGY
+        prefixes = [topology.prefixes[self.env] + p for p in topology.discovery_prefixes]
+        backoff = Backoff()
+        while supervisor.is_current(key, generation):
+            await self._active.wait()
+            try:
+                sqs = await get_sqs_pool().get()
+                found: dict[str, str] = {}
+                for urls in await asyncio.gather(*(discover_queues(sqs, p) for p in prefixes)):
+                    found.update(urls)
+            except Exception as e:
+                delay = backoff.next_delay()
+                logger.exception("Queue discovery failed for %s: %s", self.env, e)
+                await asyncio.sleep(delay)
+                continue
+            backoff.reset()
+            # ListQueues matches by prefix only; "eggi-" also lists "eggi-dev-" queues.
+            found = {
+                name: url
+                for name, url in found.items()
+                if topology.environment_of(name) == self.env
+            }
+            self._collector.remember(found)
+            self._add_queues(sorted(found))
+            await asyncio.sleep(topology.discovery_interval)
+
+    def _add_queues(self, names: list[str]) -> None:
+        known = set(self.queue_names) | set(self.dlq_queue_names)
+        new = [name for name in names if name not in known]
+        if not new:
+            return
+        topology = queues.TOPOLOGY
+        self.queue_names = self.queue_names + [n for n in new if not topology.is_dlq(n)]
+        self.dlq_queue_names = self.dlq_queue_names + [n for n in new if topology.is_dlq(n)]
+        logger.info("Discovered %d new %s queues", len(new), self.env)
+        self._publish()
+
+    async def _flush_updates(self, generation: int) -> None:
+        key = self.task_prefix + "flush"
+        await self._updates.run(lambda: supervisor.is_current(key, generation))
+
+    async def _merge_streams(self, generation: int) -> None:
+        key = self.poll_prefix + "merge"
+        await self._engine.merge(lambda: supervisor.is_current(key, generation))
+
+    async def _replay(self, generation: int) -> None:
+        """Feed EGGI_REPLAY through the ingest path in place of the SQS loops."""
+        key = self.poll_prefix + "replay"
+        recording = get_replay()
+        logger.info("Replaying %s into %s (speed %g)", recording.path, self.env, recording.speed)
+        async for entry in pace(recording):
+            if not supervisor.is_current(key, generation):
+                return
+            if entry[1] == "m":
+                _, _, queue_name, batch = entry
+                records, _ = decode_messages(replay_messages(batch), queue_name)
+                # Like a long-poll worker, wait for the merge rather than drop records.
+                while self._engine.room(queue_name) < len(records):
+                    await asyncio.sleep(0.01)
+                self._engine.push(queue_name, records)
+            else:
+                sampled = replay_attributes(entry[2])
+                self._add_queues(sorted(sampled))
+                self._sample_attributes(sampled)
+        logger.info("Replay of %s finished", recording.path)
+
+    async def _stream_data(
+        self, queue_name: str, config: StreamConfig, worker: int, generation: int
+    ) -> None:
+        key = f"{self.poll_prefix}stream:{queue_name}:{worker}"
+        source_queue = config.source_queue(queue_name)
+
+        def alive() -> bool:
+            return supervisor.is_current(key, generation)
+
+        try:
+            backoff = Backoff()
+            while True:
+                try:
+                    sqs = await get_sqs_pool().get()
+                    queue_url = await self._collector.queue_url(sqs, source_queue)
+                    break
+                except Exception as e:
+                    if config.mode == "mirror" and is_queue_missing(e):
+                        fallback = self._without_tap(queue_name, config, worker)
+                        if fallback is None:
+                            return
+                        config, source_queue = fallback, fallback.source_queue(queue_name)
+                        continue
+                    delay = backoff.next_delay()
+                    logger.exception(
+                        "Could not open the SQS client or resolve %s: %s", source_queue, e
+                    )
+                    await asyncio.sleep(delay)
+                    if not alive():
+                        return
+            logger.info("Started SQS long-poll loop (%s, %s mode)", source_queue, config.mode)
+            await self._engine.worker(sqs, queue_name, queue_url, config, alive, self._active)
+        finally:
+            logger.info("SQS loop terminated (%s)", source_queue)
+
+    def _without_tap(
+        self, queue_name: str, config: StreamConfig, worker: int
+    ) -> Optional[StreamConfig]:
+        """How to stream `queue_name` now that its tap queue turned out not to
+        exist: in `mirror_fallback` mode, or not at all (None)."""
+        fallback = replace(config, mode=config.mirror_fallback) if config.mirror_fallback else None
+        # Every worker of the queue gets here; the first one speaks for all.
+        if worker == 0:
+            tap = config.source_queue(queue_name)
+            if fallback is None:
+                self._streaming.pop(queue_name, None)
+                logger.warning(
+                    "Tap queue %s does not exist; %s is not streamed (depths only). "
+                    "Create the tap queue or set streaming.mirror_fallback in queues.toml.",
+                    tap,
+                    queue_name,
+                )
+            else:
+                self._streaming[queue_name] = fallback
+                logger.warning(
+                    "Tap queue %s does not exist; streaming %s in %s mode instead",
+                    tap,
+                    queue_name,
+                    fallback.mode,
+                )
+        return fallback
+
+    def queue_rates(self) -> dict[str, dict[str, str]]:
+        """Arrival/processing rate and drain ETA per queue, formatted for the tables."""
+        rates: dict[str, dict[str, str]] = {}
+        for queue_name in self.queue_names + self.dlq_queue_names:
+            estimate = self.rates.estimate(queue_name)
+            if estimate is not None:
+                rates[queue_name] = {
+                    "arrival_rate": format_rate(estimate.arrival),
+                    "processing_rate": format_rate(estimate.processing),
+                    "drain_eta": format_eta(estimate.drain_seconds),
+                }
+        return rates
+
+    def search(self, terms: list[str], filters: dict[str, str], limit: int) -> list[EventRecord]:
+        """Retained records matching the query, newest first."""
+        seqs = self.index.search(terms, filters, limit)
+        return [record for record in map(self.events.get, seqs) if record is not None]
+
+    def _append_records(self, records: list[EventRecord]) -> None:
+        for record in records:
+            # Unindex the record the ring buffer is about to overwrite.
+            evicted_seq = self.events.next_seq - self.events.capacity
+            evicted = self.events.get(evicted_seq)
+            if evicted is not None:
+                self.index.evict(evicted_seq, evicted)
+            self.index.add(self.events.append(record), record)
+        self.latency.observe(records)
+
+    def _record_events(self, records: list[EventRecord]) -> None:
+        """Ingest callback of the leader's SQS streams."""
+        self._ingest(records)
+        archive = get_archive()
+        if archive is not None and get_replay() is None:
+            archive.submit(self.env, records)
+        self._broadcast(
+            {
+                "type": "events",
+                "records": [[r.epoch, r.queue, r.event, list(r.fields)] for r in records],
+            }
+        )
+
+    def _ingest(self, records: list[EventRecord]) -> None:
+        self._append_records(records)
+        self.service_stats.add(records, time.time())
+        arrivals = self.arrivals
+        for record in records:
+            arrivals[record.queue] = arrivals.get(record.queue, 0) + 1
+        self._publish()
+
+    def _sample_attributes(self, sampled: dict[str, QueueAttributes]) -> None:
+        """Leader side: apply fresh depths and pass them on to the followers."""
+        now = time.time()
+        observed = self._observed(sampled)
+        self._apply_sample(now, sampled, observed)
+        self._broadcast(
+            {
+                "type": "attributes",
+                "ts": now,
+                "sampled": sampled,
+                "observed": observed,
+                "queue_names": self.queue_names,
+                "dlq_queue_names": self.dlq_queue_names,
+            }
+        )
+
+    def _observed(self, sampled: dict[str, QueueAttributes]) -> dict[str, int]:
+        """Arrival counts of the sampled queues whose every message reached the
+        hub since their previous sample; the rates of all others come from depth
+        alone.
+
+        Peek mode only samples a queue, and a dropped or unparsable record is
+        a message never counted, so either would understate arrivals. A replay
+        may come from any mode and is never trusted. Queues are sampled on
+        their own schedules, so each one's loss baseline moves only with its
+        own samples.
+        """
+        lost = self._engine.lost
+        observed: dict[str, int] = {}
+        for base_name in queues.QUEUE_BASE_NAMES:
+            queue_name = queues.env_queue_name(base_name, self.env)
+            if queue_name not in sampled:
+                continue
+            lost_now = lost.get(queue_name, 0)
+            config = self._streaming.get(queue_name)
+            if (
+                get_replay() is None
+                and config is not None
+                and config.observes_all
+                and lost_now == self._lost_at_sample.get(queue_name, 0)
+            ):
+                observed[queue_name] = self.arrivals.get(queue_name, 0)
+            self._lost_at_sample[queue_name] = lost_now
+        return observed
+
+    def _apply_sample(
+        self, now: float, sampled: dict[str, QueueAttributes], observed: dict[str, int]
+    ) -> None:
+        self.queue_attributes = {**self.queue_attributes, **sampled}
+        self.timeseries.add_snapshot(now, sampled)
+        self.rates.add_sample(now, sampled, observed)
+        self._publish()
+
+    def _broadcast(self, message: dict[str, Any]) -> None:
+        # Serialised here, published by the broadcast task; a no-op for a lone worker.
+        if self.role == "leader" and get_coordinator().shared:
+            self._outbox.append(encode(message))
+            self._outbox_ready.set()
+
+    async def _publish_outbox(self, generation: int) -> None:
+        key = self.poll_prefix + "broadcast"
+        coordinator = get_coordinator()
+        backoff = Backoff()
+        while supervisor.is_current(key, generation):
+            await self._outbox_ready.wait()
+            self._outbox_ready.clear()
+            try:
+                while self._outbox:
+                    await coordinator.publish(self._data_channel, self._outbox[0])
+                    self._outbox.popleft()
+                backoff.reset()
+            except Exception as e:
+                delay = backoff.next_delay()
+                logger.exception("Broadcasting %s updates failed: %s", self.env, e)
+                self._outbox_ready.set()
+                await asyncio.sleep(delay)
+
+    async def _follow_leader(self, generation: int) -> None:
+        key = self.follow_prefix + "data"
+        backoff = Backoff()
+        while supervisor.is_current(key, generation):
+            try:
+                async for data in get_coordinator().subscribe(self._data_channel):
+                    self._apply_broadcast(decode(data))
+                    backoff.reset()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = backoff.next_delay()
+                logger.exception("Following the %s leader failed: %s", self.env, e)
+                await asyncio.sleep(delay)
+
+    def _apply_broadcast(self, message: dict[str, Any]) -> None:
+        if message["type"] == "events":
+            self._ingest(
+                [
+                    EventRecord(epoch, queue, event, EventFields(*fields))
+                    for epoch, queue, event, fields in message["records"]
+                ]
+            )
+        elif message["type"] == "attributes":
+            self.queue_names = message["queue_names"]
+            self.dlq_queue_names = message["dlq_queue_names"]
+            self._apply_sample(message["ts"], message["sampled"], message.get("observed", {}))
+
+    async def _announce_demand(self, generation: int) -> None:
+        key = self.follow_prefix + "demand"
+        coordinator = get_coordinator()
+        while supervisor.is_current(key, generation):
+            self._demand_changed.clear()
+            try:
+                await coordinator.publish(
+                    self._demand_channel,
+                    encode(
+                        {
+                            "worker": WORKER_ID,
+                            "active": self._subscribers > self._paused,
+                            "viewers": self._viewers,
+                        }
+                    ),
+                )
+            except Exception as e:
+                logger.exception("Reporting %s demand failed: %s", self.env, e)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._demand_changed.wait(), DEMAND_INTERVAL)
+
+    async def _collect_demand(self, generation: int) -> None:
+        key = self.poll_prefix + "demand"
+        backoff = Backoff()
+        while supervisor.is_current(key, generation):
+            try:
+                async for data in get_coordinator().subscribe(self._demand_channel):
+                    demand = decode(data)
+                    expires = time.monotonic() + 3 * DEMAND_INTERVAL
+                    self._remote_demand[demand["worker"]] = (
+                        demand["active"],
+                        demand["viewers"],
+                        expires,
+                    )
+                    self._expire_demand()
+                    self._view_changed.set()
+                    backoff.reset()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = backoff.next_delay()
+                logger.exception("Collecting %s demand failed: %s", self.env, e)
+                await asyncio.sleep(delay)
+
+    def _expire_demand(self) -> None:
+        now = time.monotonic()
+        for worker, (_, _, expires) in list(self._remote_demand.items()):
+            if expires <= now:
+                del self._remote_demand[worker]
+                self._view_changed.set()
+        self._update_active()
+
+
+_HUBS: dict[str, QueueHub] = {}
+
+HUB_SUBSCRIBERS = Gauge(
+    "eggi_hub_subscribers",
+    "Sessions following each environment's hub.",
+    ("env",),
+    collect=lambda: {(env,): hub.subscribers for env, hub in _HUBS.items()},
+)
+HUB_LEADER = Gauge(
+    "eggi_hub_leader",
+    "1 where this worker polls SQS for the environment, 0 where it follows.",
+    ("env",),
+    collect=lambda: {(env,): int(hub.role == "leader") for env, hub in _HUBS.items()},
+)
+HUB_RETAINED_EVENTS = Gauge(
+    "eggi_hub_retained_events",
+    "Events held in each hub's ring buffer.",
+    ("env",),
+    collect=lambda: {(env,): len(hub.events) for env, hub in _HUBS.items()},
+)
+
+
+def get_hub(env: str) -> QueueHub:
+    """Return the process-wide hub for `env`, creating it on first use."""
+    hub = _HUBS.get(env)
+    if hub is None:
+        hub = _HUBS[env] = QueueHub(env)
+    return hub
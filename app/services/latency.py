@@ -0,0 +1,246 @@
+from array import array
+from collections import OrderedDict
+from typing import Optional
+import os
+import time
+
+from app.services.events import EventRecord
+
+# Pipeline stages in display order, and the event_source substring that marks each.
+STAGES: tuple[str, ...] = ("preparation", "mapping", "completion", "inference")
+STAGE_LABELS = {
+    "preparation": "Preparation",
+    "mapping": "Mapping",
+    "completion": "Completion",
+    "inference": "LLM Inference",
+}
+# First matching substring wins, in this order.
+_STAGE_RULES: tuple[tuple[str, str], ...] = (
+    ("preparation-requested", "preparation"),
+    ("completed", "completion"),
+    ("mapping", "mapping"),
+    ("llm-inference", "inference"),
+    ("events", "inference"),
+)
+# End-to-end latency runs from a job's first event to its first event in this
+# stage, the last one of the pipeline (so it includes LLM inference).
+TERMINAL_STAGE = STAGES[-1]
+# Jobs not seen for this long are forgotten; also the largest latency recorded.
+JOB_TTL = float(os.getenv("EGGI_JOB_TTL", "3600"))
+MAX_TRACKED_JOBS = 100_000
+# Percentiles cover the current window plus the previous one (5-10 minutes).
+LATENCY_WINDOW = 300.0
+# Sub-buckets per power of two: 128 keeps the relative error under 1/64.
+_SUB_BUCKET_BITS = 7
+
+
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of millisecond latencies.
+
+    Values below 128 ms get exact buckets; above that every power-of-two range
+    is split into 64 buckets, so memory is fixed and percentiles are within
+    ~1.6% of the true value.
+    """
+
+    def __init__(self, max_ms: int):
+        self.max_ms = max(1, max_ms)
+        self.counts = array("q", [0]) * (self._index(self.max_ms) + 1)
+        self.count = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        shift = value.bit_length() - _SUB_BUCKET_BITS
+        if shift <= 0:
+            return value
+        half = 1 << (_SUB_BUCKET_BITS - 1)
+        return (shift + 1) * half + (value >> shift) - half
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """Upper edge of bucket `index`."""
+        full = 1 << _SUB_BUCKET_BITS
+        if index < full:
+            return index
+        half = full >> 1
+        shift = (index - full) // half + 1
+        return ((index - full) % half + half + 1 << shift) - 1
+
+    def record(self, ms: float) -> None:
+        self.counts[self._index(min(max(int(ms), 0), self.max_ms))] += 1
+        self.count += 1
+
+    def clear(self) -> None:
+        self.counts = array("q", [0]) * len(self.counts)
+        self.count = 0
+
+
+class WindowedLatency:
+    """Two alternating histograms so percentiles follow recent traffic."""
+
+    def __init__(self, max_ms: int, window: float = LATENCY_WINDOW):
+        self._window = window
+        self._current = LatencyHistogram(max_ms)
+        self._previous = LatencyHistogram(max_ms)
+        self._rotated_at = time.monotonic()
+
+    @property
+    def count(self) -> int:
+        return self._current.count + self._previous.count
+
+    def record(self, ms: float) -> None:
+        now = time.monotonic()
+        if now - self._rotated_at >= self._window:
+            self._rotated_at = now
+            self._previous, self._current = self._current, self._previous
+            self._current.clear()
+        self._current.record(ms)
+
+    def percentiles(self, quantiles: tuple[float, ...]) -> list[Optional[int]]:
+        total = self.count
+        if not total:
+            return [None] * len(quantiles)
+        targets = [max(1, int(q * total + 0.999999)) for q in quantiles]
+        result: list[Optional[int]] = [None] * len(quantiles)
+        seen = 0
+        pending = 0
+        for index, (a, b) in enumerate(zip(self._current.counts, self._previous.counts)):
+            if not (a or b):
+                continue
+            seen += a + b
+            while pending < len(targets) and seen >= targets[pending]:
+                result[pending] = LatencyHistogram._value(index)
+                pending += 1
+            if pending == len(targets):
+                break
+        return result
+
+
+class _Job:
+    __slots__ = ("first", "last", "stages")
+
+    def __init__(self, epoch: float):
+        self.first = epoch
+        self.last = epoch
+        self.stages = 0  # bitmask of STAGES already seen
+
+
+class JobCorrelator:
+    """Joins events of the same job across stages and times each hop.
+
+    Jobs are keyed by job_id and linkedin_identifier (early stages may only
+    carry the latter); both keys point at the same entry. Entries live in an
+    insertion-ordered table and expire after JOB_TTL without activity, so
+    memory is bounded whatever the traffic.
+    """
+
+    def __init__(self, ttl: float = JOB_TTL, max_jobs: int = MAX_TRACKED_JOBS):
+        self._ttl = ttl
+        self._max_jobs = max_jobs
+        self._jobs: OrderedDict[str, _Job] = OrderedDict()
+        self._stages: dict[str, Optional[int]] = {}
+        max_ms = int(ttl * 1000)
+        self.stage_latency = {stage: WindowedLatency(max_ms) for stage in STAGES}
+        self.end_to_end = WindowedLatency(max_ms)
+        self._newest = 0.0
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def observe(self, records: list[EventRecord]) -> None:
+        for record in records:
+            stage = self._stage(record.event["service"])
+            if stage is None:
+                continue
+            fields = record.fields
+            keys = [
+                key
+                for key in (
+                    "job:" + fields.job_id if fields.job_id else "",
+                    "li:" + fields.linkedin_identifier if fields.linkedin_identifier else "",
+                )
+                if key
+            ]
+            if keys:
+                self._observe(keys, stage, record.epoch)
+        self._expire()
+
+    def _observe(self, keys: list[str], stage: int, epoch: float) -> None:
+        jobs = self._jobs
+        job = None
+        for key in keys:
+            job = jobs.get(key)
+            if job is not None:
+                break
+        if job is None:
+            job = _Job(epoch)
+        for key in keys:
+            jobs[key] = job
+            jobs.move_to_end(key)
+        if epoch > self._newest:
+            self._newest = epoch
+        bit = 1 << stage
+        if job.stages & bit:
+            # Redelivery or a second event for a stage already timed.
+            job.last = max(job.last, epoch)
+            return
+        if job.stages and epoch >= job.last:
+            self.stage_latency[STAGES[stage]].record((epoch - job.last) * 1000)
+        if STAGES[stage] == TERMINAL_STAGE and job.stages and epoch >= job.first:
+            self.end_to_end.record((epoch - job.first) * 1000)
+        job.stages |= bit
+        job.first = min(job.first, epoch)
+        job.last = max(job.last, epoch)
+
+    def _expire(self) -> None:
+        jobs = self._jobs
+        cutoff = self._newest - self._ttl
+        while jobs:
+            key, job = next(iter(jobs.items()))
+            if job.last >= cutoff and len(jobs) <= self._max_jobs:
+                break
+            jobs.popitem(last=False)
+
+    def _stage(self, event_source: str) -> Optional[int]:
+        try:
+            return self._stages[event_source]
+        except KeyError:
+            pass
+        stage = None
+        for needle, name in _STAGE_RULES:
+            if needle in event_source:
+                stage = STAGES.index(name)
+                break
+        if len(self._stages) >= 4096:
+            self._stages.clear()
+        self._stages[event_source] = stage
+        return stage
+
+    def summary(self) -> list[dict[str, str]]:
+        """One row per hop plus end-to-end, with p50/p95/p99 formatted for display."""
+        # The entry stage has no previous hop to time.
+        rows = [
+            _summary_row(STAGE_LABELS[stage], self.stage_latency[stage]) for stage in STAGES[1:]
+        ]
+        rows.append(_summary_row("End-to-end", self.end_to_end))
+        return rows
+
+
+def _summary_row(label: str, latency: WindowedLatency) -> dict[str, str]:
+    p50, p95, p99 = latency.percentiles((0.5, 0.95, 0.99))
+    return {
+        "stage": label,
+        "count": str(latency.count),
+        "p50": format_ms(p50),
+        "p95": format_ms(p95),
+        "p99": format_ms(p99),
+    }
+
+
+def format_ms(ms: Optional[int]) -> str:
+    if ms is None:
+        return "-"
+    if ms < 1000:
+        return f"{ms} ms"
+    if ms < 60_000:
+        return f"{ms / 1000:.1f} s"
+    return f"{ms / 60_000:.1f} min"
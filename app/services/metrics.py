@@ -0,0 +1,196 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+import math
+
+from app.services.supervisor import supervisor
+
+# Labels are positional tuples everywhere: one dict lookup per update, no
+# child objects, no locks (everything runs on the event loop thread).
+LabelValues = tuple[str, ...]
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        REGISTRY.register(self)
+
+    @abstractmethod
+    def samples(self) -> Iterable[tuple[str, LabelValues, float]]: ...
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, values, value in self.samples():
+            lines.append(f"{name}{_format_labels(self.labels, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def samples(self) -> Iterable[tuple[str, LabelValues, float]]:
+        for values, value in sorted(self._values.items()):
+            yield self.name, values, value
+
+
+class Gauge(_Metric):
+    """A settable gauge, or one computed at scrape time when `collect` is given."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        collect: Optional[Callable[[], dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, help, labels)
+        self._values: dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, *label_values: str) -> None:
+        self._values[label_values] = value
+
+    def samples(self) -> Iterable[tuple[str, LabelValues, float]]:
+        values = self._collect() if self._collect is not None else self._values
+        for label_values, value in sorted(values.items()):
+            yield self.name, label_values, value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = (),
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf count, sum].
+        self._series: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterable[tuple[str, LabelValues, float]]:
+        for label_values, series in sorted(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                yield f"{self.name}_bucket", (*label_values, _format_value(bound)), cumulative
+            yield f"{self.name}_count", label_values, cumulative
+            yield f"{self.name}_sum", label_values, series[-1]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, values, value in self.samples():
+            labels = self.labels + ("le",) if name.endswith("_bucket") else self.labels
+            lines.append(f"{name}{_format_labels(labels, values)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _supervised_tasks() -> dict[LabelValues, float]:
+    counts: dict[LabelValues, float] = {}
+    for task in supervisor.snapshot():
+        key = (task.get("env", ""), task.get("kind", ""))
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+REGISTRY = Registry()
+
+SQS_REQUEST_SECONDS = Histogram(
+    "eggi_sqs_request_seconds",
+    "Latency of SQS API calls.",
+    ("operation", "queue"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30),
+)
+SQS_REQUEST_ERRORS = Counter(
+    "eggi_sqs_request_errors_total", "SQS API calls that raised.", ("operation", "queue")
+)
+MESSAGES_RECEIVED = Counter(
+    "eggi_messages_received_total", "Messages returned by receive_message.", ("queue",)
+)
+MESSAGES_DELETED = Counter(
+    "eggi_messages_deleted_total", "Messages deleted after ingest.", ("queue",)
+)
+PARSE_FAILURES = Counter(
+    "eggi_parse_failures_total", "Message bodies that could not be decoded.", ("queue",)
+)
+EVENTS_DROPPED = Counter(
+    "eggi_events_dropped_total",
+    "Decoded records dropped because their queue outran the stream merge.",
+    ("queue",),
+)
+RECEIVE_BATCH_SIZE = Histogram(
+    "eggi_receive_batch_size",
+    "Messages per non-empty receive_message response.",
+    ("queue",),
+    buckets=(1, 2, 3, 5, 8, 10),
+)
+STATE_PUSHES = Counter(
+    "eggi_state_pushes_total", "Hub snapshots copied into a session.", ("env",)
+)
+STATE_PUSH_BYTES = Histogram(
+    "eggi_state_push_bytes",
+    "Serialized size of the state a push sends to the browser (sampled).",
+    ("env",),
+    buckets=(1_000, 4_000, 16_000, 64_000, 256_000, 1_000_000, 4_000_000),
+)
+ACTIVE_TASKS = Gauge(
+    "eggi_background_tasks",
+    "Supervised background loops, by environment and kind.",
+    ("env", "kind"),
+    collect=_supervised_tasks,
+)
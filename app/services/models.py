@@ -0,0 +1,23 @@
+from typing import Literal, TypedDict
+
+
+class Event(TypedDict):
+    timestamp: str
+    service: str
+    status: Literal["OK", "WARN", "ERROR"]
+    message: str
+    avatar: str
+
+
+class QueueAttributes(TypedDict):
+    ApproximateNumberOfMessages: str
+    ApproximateNumberOfMessagesNotVisible: str
+    ApproximateNumberOfMessagesDelayed: str
+
+
+def empty_attributes() -> QueueAttributes:
+    return {
+        "ApproximateNumberOfMessages": "0",
+        "ApproximateNumberOfMessagesNotVisible": "0",
+        "ApproximateNumberOfMessagesDelayed": "0",
+    }
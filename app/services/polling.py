@@ -0,0 +1,110 @@
+from typing import Optional
+import os
+import random
+
+from app.services.models import QueueAttributes
+
+# Attribute refresh interval per queue: MIN while the depth moves, growing by
+# IDLE_GROWTH per unchanged sample up to MAX once it has been flat for a while.
+ATTRIBUTE_MIN_INTERVAL = float(os.getenv("EGGI_ATTRIBUTE_MIN_INTERVAL", "1"))
+ATTRIBUTE_MAX_INTERVAL = float(os.getenv("EGGI_ATTRIBUTE_MAX_INTERVAL", "30"))
+# Bounds for an environment nobody is looking at, kept warm for instant switching.
+ATTRIBUTE_IDLE_MIN_INTERVAL = float(os.getenv("EGGI_ATTRIBUTE_IDLE_MIN_INTERVAL", "15"))
+ATTRIBUTE_IDLE_MAX_INTERVAL = float(os.getenv("EGGI_ATTRIBUTE_IDLE_MAX_INTERVAL", "120"))
+IDLE_GROWTH = 1.5
+# Retry delays after SQS errors (throttling included): exponential, jittered.
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+class Backoff:
+    """Exponential backoff with "equal jitter": half fixed, half random.
+
+    The fixed half keeps a failing loop from spinning; the random half spreads
+    out workers that failed together (e.g. on the same throttling burst).
+    """
+
+    def __init__(self, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX):
+        self._base = base
+        self._cap = cap
+        self.failures = 0
+
+    def next_delay(self) -> float:
+        delay = min(self._cap, self._base * 2**self.failures)
+        self.failures += 1
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self) -> None:
+        self.failures = 0
+
+
+class _QueueSchedule:
+    __slots__ = ("interval", "due", "last", "backoff")
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.due = 0.0
+        self.last: Optional[QueueAttributes] = None
+        self.backoff = Backoff()
+
+
+class AdaptiveSchedule:
+    """Per-queue refresh times that follow how fast each queue changes.
+
+    Busy queues are sampled every ATTRIBUTE_MIN_INTERVAL; a queue whose depth
+    has not moved backs off geometrically to ATTRIBUTE_MAX_INTERVAL, and snaps
+    back to the minimum as soon as a sample differs. Failed fetches are
+    retried on the backoff schedule instead.
+    """
+
+    def __init__(
+        self,
+        queue_names: list[str],
+        min_interval: float = ATTRIBUTE_MIN_INTERVAL,
+        max_interval: float = ATTRIBUTE_MAX_INTERVAL,
+    ):
+        self._min = min_interval
+        self._max = max(max_interval, min_interval)
+        self._queues = {name: _QueueSchedule(min_interval) for name in queue_names}
+
+    def set_bounds(self, min_interval: float, max_interval: float, now: float) -> None:
+        """Change the interval range; queues are re-sampled now if it got shorter."""
+        tighter = min_interval < self._min
+        self._min = min_interval
+        self._max = max(max_interval, min_interval)
+        for queue in self._queues.values():
+            if tighter:
+                queue.interval = self._min
+                queue.due = min(queue.due, now)
+            else:
+                queue.interval = min(max(queue.interval, self._min), self._max)
+
+    def track(self, queue_names: list[str]) -> None:
+        """Start scheduling any queue not seen before (due immediately)."""
+        for name in queue_names:
+            if name not in self._queues:
+                self._queues[name] = _QueueSchedule(self._min)
+
+    def due(self, now: float) -> list[str]:
+        return [name for name, queue in self._queues.items() if queue.due <= now]
+
+    def next_due(self) -> float:
+        return min((queue.due for queue in self._queues.values()), default=0.0)
+
+    def record(self, queue_name: str, now: float, attrs: QueueAttributes) -> None:
+        queue = self._queues[queue_name]
+        queue.backoff.reset()
+        if attrs == queue.last:
+            queue.interval = min(queue.interval * IDLE_GROWTH, self._max)
+        else:
+            queue.interval = self._min
+        queue.last = attrs
+        # A little jitter keeps queues that went idle together from lining up.
+        queue.due = now + queue.interval * random.uniform(0.9, 1.1)
+
+    def record_error(self, queue_name: str, now: float) -> None:
+        queue = self._queues[queue_name]
+        queue.due = now + max(queue.backoff.next_delay(), self._min)
+
+    def interval(self, queue_name: str) -> float:
+        return self._queues[queue_name].interval
@@ -0,0 +1,117 @@
+from botocore.exceptions import ClientError
+from typing import Any
+import asyncio
+import logging
+import os
+
+from app.services.models import QueueAttributes, empty_attributes
+
+logger = logging.getLogger(__name__)
+
+# Only the attributes the queue tables render; "All" makes SQS compute and ship ~20 more.
+ATTRIBUTE_NAMES: list[str] = list(QueueAttributes.__annotations__)
+DEFAULT_CONCURRENCY = int(os.getenv("SQS_ATTRIBUTE_CONCURRENCY", "16"))
+QUEUE_DOES_NOT_EXIST_CODES = frozenset(
+    {"AWS.SimpleQueueService.NonExistentQueue", "QueueDoesNotExist"}
+)
+
+
+def is_queue_missing(error: Exception) -> bool:
+    return (
+        isinstance(error, ClientError)
+        and error.response.get("Error", {}).get("Code") in QUEUE_DOES_NOT_EXIST_CODES
+    )
+
+
+class QueueAttributeCollector:
+    """Fetch queue depths for many queues in one concurrent round.
+
+    QueueUrls are resolved once and cached; an entry is only dropped when SQS
+    reports the queue as missing, so a refresh normally costs a single
+    `get_queue_attributes` call per queue, all in flight at the same time.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY):
+        self._urls: dict[str, str] = {}
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        # Queues whose fetch failed in the latest `collect` round.
+        self.failed: set[str] = set()
+
+    def invalidate(self, queue_name: str) -> None:
+        self._urls.pop(queue_name, None)
+
+    def remember(self, urls: dict[str, str]) -> None:
+        """Seed the QueueUrl cache, e.g. from a ListQueues sweep."""
+        self._urls.update(urls)
+
+    async def queue_url(self, sqs: Any, queue_name: str) -> str:
+        url = self._urls.get(queue_name)
+        if url is None:
+            resp = await sqs.get_queue_url(QueueName=queue_name)
+            url = self._urls[queue_name] = resp["QueueUrl"]
+        return url
+
+    async def collect(
+        self,
+        sqs: Any,
+        queue_names: list[str],
+        previous: dict[str, QueueAttributes],
+    ) -> dict[str, QueueAttributes]:
+        """Return fresh attributes for `queue_names`, keeping `previous` values on error."""
+        self.failed = set()
+        results = await asyncio.gather(
+            *(self._fetch(sqs, name, previous.get(name)) for name in queue_names)
+        )
+        updated = dict(previous)
+        updated.update(zip(queue_names, results))
+        return updated
+
+    async def _fetch(
+        self, sqs: Any, queue_name: str, previous: QueueAttributes | None
+    ) -> QueueAttributes:
+        previous = previous or empty_attributes()
+        async with self._semaphore:
+            try:
+                q_url = await self.queue_url(sqs, queue_name)
+                resp = await sqs.get_queue_attributes(
+                    QueueUrl=q_url, AttributeNames=ATTRIBUTE_NAMES
+                )
+            except Exception as e:
+                if is_queue_missing(e):
+                    self.invalidate(queue_name)
+                self.failed.add(queue_name)
+                # Preserve previous values on error to avoid UI flicker.
+                logger.exception(f"Could not fetch attributes for {queue_name}: {e}")
+                return previous
+        attrs = resp.get("Attributes", {})
+        return {
+            "ApproximateNumberOfMessages": attrs.get(
+                "ApproximateNumberOfMessages", previous["ApproximateNumberOfMessages"]
+            ),
+            "ApproximateNumberOfMessagesNotVisible": attrs.get(
+                "ApproximateNumberOfMessagesNotVisible",
+                previous["ApproximateNumberOfMessagesNotVisible"],
+            ),
+            "ApproximateNumberOfMessagesDelayed": attrs.get(
+                "ApproximateNumberOfMessagesDelayed",
+                previous["ApproximateNumberOfMessagesDelayed"],
+            ),
+        }
+
+
+async def discover_queues(sqs: Any, prefix: str) -> dict[str, str]:
+    """Every queue whose name starts with `prefix`, as name -> QueueUrl.
+
+    ListQueues returns up to 1000 URLs per page, so a few hundred queues cost a
+    single call rather than one GetQueueUrl each.
+    """
+    urls: dict[str, str] = {}
+    kwargs: dict[str, Any] = {"QueueNamePrefix": prefix, "MaxResults": 1000}
+    while True:
+        resp = await sqs.list_queues(**kwargs)
+        for url in resp.get("QueueUrls", []):
+            urls[url.rsplit("/", 1)[-1]] = url
+        token = resp.get("NextToken")
+        if not token:
+            return urls
+        kwargs["NextToken"] = token
@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+import os
+import tomllib
+
+QUEUE_CONFIG_PATH = os.getenv("EGGI_QUEUE_CONFIG", "queues.toml")
+# Point at a local SQS stand-in (ElasticMQ, moto server) instead of AWS when set.
+ENDPOINT_URL = os.getenv("SQS_ENDPOINT_URL") or None
+
+
+@dataclass(frozen=True)
+class QueueSpec:
+    name: str  # without the environment prefix
+    display_name: str
+    dlq: Optional[str] = None
+    dlq_display_name: Optional[str] = None
+    # Overrides of the [streaming] settings for this queue (see services.streaming).
+    streaming: dict[str, Any] = field(default_factory=dict, compare=False)
+
+
+@dataclass(frozen=True)
+class Topology:
+    """Which queues exist per environment, how they are named and paired."""
+
+    region: str
+    prefixes: dict[str, str]  # environment -> queue name prefix
+    queues: tuple[QueueSpec, ...]
+    dlq_suffix: str = "-dlq"
+    discovery_prefixes: tuple[str, ...] = ()
+    discovery_interval: float = 300.0
+    # The [streaming] settings, see services.streaming.StreamConfig.
+    streaming: dict[str, Any] = field(default_factory=dict, compare=False)
+    _display: dict[str, str] = field(default_factory=dict, compare=False)
+
+    def __post_init__(self):
+        for spec in self.queues:
+            self._display[spec.name] = spec.display_name
+            if spec.dlq:
+                self._display[spec.dlq] = spec.dlq_display_name or spec.dlq
+
+    @property
+    def environments(self) -> tuple[str, ...]:
+        return tuple(self.prefixes)
+
+    def queue_name(self, base_name: str, env: str) -> str:
+        return self.prefixes[env] + base_name
+
+    def environment_of(self, queue_name: str) -> Optional[str]:
+        # Longest prefix wins: "eggi-dev-x" is dev even though it starts with "eggi-".
+        matches = [env for env, prefix in self.prefixes.items() if queue_name.startswith(prefix)]
+        return max(matches, key=lambda env: len(self.prefixes[env]), default=None)
+
+    def base_name(self, queue_name: str) -> str:
+        env = self.environment_of(queue_name)
+        return queue_name[len(self.prefixes[env]) :] if env is not None else queue_name
+
+    def display_name(self, queue_name: str) -> str:
+        return self._display.get(self.base_name(queue_name), queue_name)
+
+    def is_dlq(self, queue_name: str) -> bool:
+        return queue_name.endswith(self.dlq_suffix)
+
+    def dlq_source(self, dlq_name: str) -> Optional[str]:
+        """The main queue a DLQ belongs to, in the same environment."""
+        env = self.environment_of(dlq_name)
+        if env is None:
+            return None
+        base = self.base_name(dlq_name)
+        for spec in self.queues:
+            if spec.dlq == base:
+                return self.queue_name(spec.name, env)
+        if base.endswith(self.dlq_suffix):
+            return self.queue_name(base[: -len(self.dlq_suffix)], env)
+        return None
+
+
+def load_topology(path: str) -> Topology:
+    with open(path, "rb") as f:
+        raw: dict[str, Any] = tomllib.load(f)
+    discovery = raw.get("discovery", {})
+    return Topology(
+        region=os.getenv("AWS_REGION") or raw["region"],
+        prefixes={env: spec["prefix"] for env, spec in raw["environments"].items()},
+        queues=tuple(QueueSpec(**spec) for spec in raw.get("queues", [])),
+        dlq_suffix=raw.get("dlq_suffix", "-dlq"),
+        discovery_prefixes=tuple(discovery.get("prefixes", ())),
+        discovery_interval=float(discovery.get("interval", 300)),
+        streaming=raw.get("streaming", {}),
+    )
+
+
+TOPOLOGY = load_topology(QUEUE_CONFIG_PATH)
+REGION = TOPOLOGY.region
+ENVIRONMENTS = TOPOLOGY.environments
+
+# Unprefixed names, in pipeline order.
+QUEUE_BASE_NAMES: list[str] = [spec.name for spec in TOPOLOGY.queues]
+DLQ_BASE_NAMES: list[str] = [spec.dlq for spec in TOPOLOGY.queues if spec.dlq]
+
+
+def env_queue_name(base_name: str, env: str) -> str:
+    return TOPOLOGY.queue_name(base_name, env)
+
+
+def queue_names(env: str) -> list[str]:
+    return [env_queue_name(name, env) for name in QUEUE_BASE_NAMES]
+
+
+def dlq_queue_names(env: str) -> list[str]:
+    return [env_queue_name(name, env) for name in DLQ_BASE_NAMES]
+
+
+def display_name(queue_name: str) -> str:
+    return TOPOLOGY.display_name(queue_name)
+
@@ -0,0 +1,131 @@
+from typing import NamedTuple, Optional
+import math
+
+from app.services.models import QueueAttributes
+from app.services.timeseries import METRICS
+
+# EWMA time constant in seconds; ApproximateNumberOf* jitters between calls,
+# so anything much shorter mostly tracks noise.
+RATE_TAU = 60.0
+# Samples closer together than this are merged into the next one.
+MIN_SAMPLE_INTERVAL = 0.5
+
+
+class RateEstimate(NamedTuple):
+    arrival: float  # messages/s entering the queue
+    processing: float  # messages/s leaving it
+    drain_seconds: Optional[float]  # None while the queue is not draining
+
+
+class _QueueRate:
+    __slots__ = ("ts", "depth", "observed", "arrival", "processing", "primed")
+
+    def __init__(self, ts: float, depth: float, observed: Optional[int]):
+        self.ts = ts
+        self.depth = depth
+        self.observed = observed
+        self.arrival = 0.0
+        self.processing = 0.0
+        self.primed = False
+
+
+class RateEstimator:
+    """Arrival/processing rates and time-to-drain per queue from depth samples.
+
+    SQS only reports depth, so the rates are inferred from how the total
+    (visible + in flight + delayed) moves between samples. Where the hub saw
+    every message that arrived in the interval (`observed`), that count is
+    the arrival rate and processing is whatever arrival does not explain of
+    the depth change. Otherwise (peek mode, drops, DLQs) only the depth is
+    trusted: growth counts as arrivals and shrinkage as processing, which
+    is a lower bound on both while messages flow through at a steady depth.
+    Each sample is O(1) per queue.
+    """
+
+    def __init__(self, tau: float = RATE_TAU):
+        self._tau = tau
+        self._queues: dict[str, _QueueRate] = {}
+
+    def add_sample(
+        self,
+        ts: float,
+        attributes: dict[str, QueueAttributes],
+        observed: dict[str, int],
+    ) -> None:
+        """`observed` holds cumulative streamed message counts of fully observed queues."""
+        for queue_name, attrs in attributes.items():
+            depth = _depth(attrs)
+            if depth is None:
+                continue
+            seen = observed.get(queue_name)
+            state = self._queues.get(queue_name)
+            if state is None:
+                self._queues[queue_name] = _QueueRate(ts, depth, seen)
+                continue
+            dt = ts - state.ts
+            if dt < MIN_SAMPLE_INTERVAL:
+                continue
+            net = (depth - state.depth) / dt
+            if seen is not None and state.observed is not None:
+                arrival = max(seen - state.observed, 0) / dt
+                processing = max(arrival - net, 0.0)
+            else:
+                arrival = max(net, 0.0)
+                processing = max(-net, 0.0)
+            if state.primed:
+                # Time-aware smoothing so irregular sample spacing weighs correctly.
+                alpha = 1.0 - math.exp(-dt / self._tau)
+                state.arrival += alpha * (arrival - state.arrival)
+                state.processing += alpha * (processing - state.processing)
+            else:
+                state.arrival, state.processing, state.primed = arrival, processing, True
+            state.ts, state.depth, state.observed = ts, depth, seen
+
+    def estimate(self, queue_name: str) -> Optional[RateEstimate]:
+        state = self._queues.get(queue_name)
+        if state is None or not state.primed:
+            return None
+        drain = state.processing - state.arrival
+        if state.depth <= 0:
+            drain_seconds: Optional[float] = 0.0
+        elif drain > 1e-6:
+            drain_seconds = state.depth / drain
+        else:
+            drain_seconds = None
+        return RateEstimate(state.arrival, state.processing, drain_seconds)
+
+
+def _depth(attrs: QueueAttributes) -> Optional[float]:
+    total = 0.0
+    for metric in METRICS:
+        value = attrs.get(metric)
+        if value is None or not value.isdigit():
+            return None
+        total += int(value)
+    return total
+
+
+def format_rate(per_second: Optional[float]) -> str:
+    if per_second is None:
+        return "-"
+    if per_second >= 10:
+        return f"{per_second:.0f}/s"
+    if per_second >= 0.1:
+        return f"{per_second:.1f}/s"
+    if per_second * 60 >= 0.1:
+        return f"{per_second * 60:.1f}/m"
+    return "0"
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "∞"
+    if seconds <= 0:
+        return "-"
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds // 60:.0f}m {seconds % 60:02.0f}s"
+    if seconds < 86400:
+        return f"{seconds // 3600:.0f}h {seconds % 3600 // 60:02.0f}m"
+    return f"{seconds / 86400:.1f}d"
@@ -0,0 +1,224 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterator, Optional, TextIO
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+
+from app.services.models import QueueAttributes
+
+logger = logging.getLogger(__name__)
+
+# Directory for recordings of raw SQS traffic; empty disables recording.
+RECORD_DIR = os.getenv("EGGI_RECORD_DIR", "")
+# A recording to play instead of polling SQS (offline; no AWS calls are made).
+REPLAY_PATH = os.getenv("EGGI_REPLAY", "")
+# "1", "10", ... times real time, or "max" for no pauses at all.
+REPLAY_SPEED = os.getenv("EGGI_REPLAY_SPEED", "1")
+# Seconds between batched writes (each ends with a gzip flush), bounding what a crash can lose.
+RECORD_FLUSH_INTERVAL = 5.0
+# Entries queued for the writer thread before the oldest are dropped (a stalled disk).
+RECORD_MAX_PENDING = 50_000
+FORMAT = "eggi-recording"
+VERSION = 1
+
+# One JSON array per line, gzip-compressed:
+#   header:     {"format": FORMAT, "version": 1, "env": "prod", "started": <epoch>}
+#   messages:   [t, "m", queue, [[sent_ms, body], ...]]     one receive batch
+#   attributes: [t, "a", {queue: [visible, in_flight, delayed], ...}]
+# `t` is seconds since the recording started.
+
+
+class Recorder:
+    """Appends received bodies and attribute samples, with their timing, to a recording.
+
+    Entries are queued on the event loop and written by a single writer thread
+    every RECORD_FLUSH_INTERVAL, so a slow disk never stalls the SQS workers.
+    """
+
+    def __init__(self, path: str, env: str, flush_interval: float = RECORD_FLUSH_INTERVAL):
+        self.path = path
+        self._flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recorder")
+        self._file: Optional[TextIO] = None
+        self._started = time.monotonic()
+        self._pending: list[Any] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self._header = {"format": FORMAT, "version": VERSION, "env": env, "started": time.time()}
+
+    @classmethod
+    def in_directory(cls, directory: str, env: str) -> "Recorder":
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return cls(os.path.join(directory, f"{env}-{stamp}.jsonl.gz"), env)
+
+    def record_messages(self, queue_name: str, messages: list[dict]) -> None:
+        batch = [
+            [int(m.get("Attributes", {}).get("SentTimestamp", 0)), m.get("Body", "")]
+            for m in messages
+        ]
+        self._submit([self._elapsed(), "m", queue_name, batch])
+
+    def record_attributes(self, sampled: dict[str, QueueAttributes]) -> None:
+        depths = {
+            name: [
+                attrs["ApproximateNumberOfMessages"],
+                attrs["ApproximateNumberOfMessagesNotVisible"],
+                attrs["ApproximateNumberOfMessagesDelayed"],
+            ]
+            for name, attrs in sampled.items()
+        }
+        self._submit([self._elapsed(), "a", depths])
+
+    async def close(self) -> None:
+        """Write whatever is still pending and close the file (created even if empty)."""
+        if self._flush_task is not None:
+            # As in EventArchive.close: a batch already taken is finished by the writer.
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        batch, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._write, batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.exception("Failed to record %d entries at shutdown: %s", len(batch), e)
+        finally:
+            await loop.run_in_executor(self._executor, self._close)
+            self._executor.shutdown()
+
+    def _elapsed(self) -> float:
+        return round(time.monotonic() - self._started, 3)
+
+    def _submit(self, entry: Any) -> None:
+        self._pending.append(entry)
+        overflow = len(self._pending) - RECORD_MAX_PENDING
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_soon())
+
+    async def _flush_soon(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._write, batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.exception("Failed to record %d entries: %s", len(batch), e)
+
+    def _open(self) -> TextIO:
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = gzip.open(self.path, "wt", encoding="utf-8")
+            self._file.write(json.dumps(self._header, separators=(",", ":")) + "\n")
+        return self._file
+
+    def _write(self, batch: list[Any]) -> None:
+        f = self._open()
+        f.writelines(json.dumps(entry, separators=(",", ":")) + "\n" for entry in batch)
+        f.flush()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def parse_speed(text: str) -> float:
+    """Replay speed multiplier; 0 means as fast as possible."""
+    if text.strip().lower() in ("max", "0", ""):
+        return 0.0
+    speed = float(text.rstrip("xX"))
+    if speed <= 0:
+        raise ValueError(f"Replay speed must be positive or 'max': {text!r}")
+    return speed
+
+
+class Recording:
+    """A recording on disk; entries are streamed, never loaded all at once.
+
+    `speed` is the pace it is replayed at (see parse_speed).
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+        if header.get("format") != FORMAT:
+            raise ValueError(f"{path} is not an {FORMAT} file")
+        self.env: str = header["env"]
+        self.started: float = header["started"]
+
+    def entries(self) -> Iterator[list]:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            f.readline()
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def replay_messages(batch: list[list]) -> list[dict]:
+    """Rebuild a receive_message batch from a recorded one."""
+    return [
+        {
+            "MessageId": f"replay-{i}",
+            "ReceiptHandle": "replay",
+            "Body": body,
+            "Attributes": {"SentTimestamp": str(sent_ms)} if sent_ms else {},
+        }
+        for i, (sent_ms, body) in enumerate(batch)
+    ]
+
+
+def replay_attributes(depths: dict[str, list[str]]) -> dict[str, QueueAttributes]:
+    return {
+        name: {
+            "ApproximateNumberOfMessages": visible,
+            "ApproximateNumberOfMessagesNotVisible": in_flight,
+            "ApproximateNumberOfMessagesDelayed": delayed,
+        }
+        for name, (visible, in_flight, delayed) in depths.items()
+    }
+
+
+async def pace(recording: Recording) -> AsyncIterator[list]:
+    """Yield the recording's entries at `recording.speed` times their recorded pace."""
+    speed = recording.speed
+    started = time.monotonic()
+    for entry in recording.entries():
+        if speed > 0:
+            delay = entry[0] / speed - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            # Still let the merge and the sessions run between entries.
+            await asyncio.sleep(0)
+        yield entry
+
+
+_REPLAY: Optional[Recording] = None
+
+
+def get_replay() -> Optional[Recording]:
+    """The recording named by EGGI_REPLAY, or None when not replaying."""
+    global _REPLAY
+    if _REPLAY is None and REPLAY_PATH:
+        _REPLAY = Recording(REPLAY_PATH, parse_speed(REPLAY_SPEED))
+    return _REPLAY
+
+
+def set_replay(recording: Optional[Recording]) -> None:
+    """Replay `recording` instead of EGGI_REPLAY, e.g. from a benchmark."""
+    global _REPLAY
+    _REPLAY = recording
@@ -0,0 +1,67 @@
+from typing import Generic, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class RingBuffer(Generic[T]):
+    """Fixed-capacity log addressed by a monotonically increasing sequence number.
+
+    Appends are O(1) and never copy the retained items. Readers remember the
+    last sequence they saw and ask for everything after it with `since`, which
+    costs O(new items) no matter how large the capacity is.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._items: list[Optional[T]] = [None] * capacity
+        self._capacity = capacity
+        self._next_seq = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def next_seq(self) -> int:
+        """Sequence number the next appended item will get."""
+        return self._next_seq
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest retained item."""
+        return max(0, self._next_seq - self._capacity)
+
+    def __len__(self) -> int:
+        return self._next_seq - self.first_seq
+
+    def append(self, item: T) -> int:
+        seq = self._next_seq
+        self._items[seq % self._capacity] = item
+        self._next_seq = seq + 1
+        return seq
+
+    def extend(self, items: list[T]) -> None:
+        for item in items:
+            self.append(item)
+
+    def get(self, seq: int) -> Optional[T]:
+        if self.first_seq <= seq < self._next_seq:
+            return self._items[seq % self._capacity]
+        return None
+
+    def since(self, seq: int, limit: Optional[int] = None) -> list[T]:
+        """Items with sequence >= `seq` (oldest first), at most the newest `limit`."""
+        start = max(seq, self.first_seq)
+        if limit is not None:
+            start = max(start, self._next_seq - limit)
+        return [self._items[s % self._capacity] for s in range(start, self._next_seq)]  # type: ignore[misc]
+
+    def newest(self, count: int, before: Optional[int] = None) -> list[T]:
+        """Up to `count` items ending just before sequence `before`, newest first."""
+        end = self._next_seq if before is None else min(before, self._next_seq)
+        start = max(self.first_seq, end - count)
+        return [self._items[s % self._capacity] for s in range(end - 1, start - 1, -1)]  # type: ignore[misc]
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.since(self.first_seq))
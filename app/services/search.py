@@ -0,0 +1,166 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Iterator
+import re
+
+from app.services.events import EventRecord
+
+# Filter-chip fields and the query prefixes that select them.
+FILTER_FIELDS: dict[str, str] = {
+    "service": "service",
+    "source": "source",
+    "job": "job_id",
+    "job_id": "job_id",
+    "li": "linkedin_identifier",
+    "linkedin": "linkedin_identifier",
+    "linkedin_identifier": "linkedin_identifier",
+    "input": "original_input",
+    "original_input": "original_input",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_FREE_TEXT = "*"
+# Sequences of the rarest posting intersected at a time, doubling per round.
+SEARCH_CHUNK = 1024
+
+
+def record_values(record: EventRecord) -> Iterator[tuple[str, str]]:
+    yield "service", record.event["service"]
+    yield "linkedin_identifier", record.fields.linkedin_identifier
+    yield "job_id", record.fields.job_id
+    yield "original_input", record.fields.original_input
+    yield "source", record.fields.source
+
+
+def parse_query(query: str) -> tuple[list[str], dict[str, str]]:
+    """Split `job:123 acme` into free-text terms and field filters."""
+    terms: list[str] = []
+    filters: dict[str, str] = {}
+    for part in query.split():
+        field, sep, value = part.partition(":")
+        if sep and value and field.lower() in FILTER_FIELDS:
+            filters[FILTER_FIELDS[field.lower()]] = value
+        else:
+            terms.append(part)
+    return terms, filters
+
+
+class _Posting:
+    """Ascending sequence numbers; evictions advance `start` instead of shifting."""
+
+    __slots__ = ("seqs", "start")
+
+    def __init__(self):
+        self.seqs: list[int] = []
+        self.start = 0
+
+    def __len__(self) -> int:
+        return len(self.seqs) - self.start
+
+    def append(self, seq: int) -> None:
+        if not self.seqs or self.seqs[-1] != seq:
+            self.seqs.append(seq)
+
+    def evict(self, seq: int) -> None:
+        if self.start < len(self.seqs) and self.seqs[self.start] == seq:
+            self.start += 1
+            if self.start > 64 and self.start * 2 > len(self.seqs):
+                del self.seqs[: self.start]
+                self.start = 0
+
+    def between(self, low: int, high: int) -> list[int]:
+        """The sequences in [low, high], ascending."""
+        begin = bisect_left(self.seqs, low, self.start)
+        return self.seqs[begin : bisect_right(self.seqs, high, begin)]
+
+
+class EventIndex:
+    """Inverted index from field values and free-text tokens to ring-buffer sequences.
+
+    Records are indexed as they are appended and evicted in the same order the
+    ring buffer drops them, so every posting list stays sorted and pruning is
+    O(fields) per evicted record.
+    """
+
+    def __init__(self):
+        self._postings: dict[tuple[str, str], _Posting] = {}
+        self._values: dict[str, set[str]] = {}
+
+    def add(self, seq: int, record: EventRecord) -> None:
+        for key in self._keys(record):
+            posting = self._postings.get(key)
+            if posting is None:
+                posting = self._postings[key] = _Posting()
+                self._values.setdefault(key[0], set()).add(key[1])
+            posting.append(seq)
+
+    def evict(self, seq: int, record: EventRecord) -> None:
+        for key in self._keys(record):
+            posting = self._postings.get(key)
+            if posting is None:
+                continue
+            posting.evict(seq)
+            if not posting:
+                del self._postings[key]
+                self._values[key[0]].discard(key[1])
+
+    def top_values(self, field: str, limit: int) -> list[tuple[str, int]]:
+        counts = [
+            (value, len(self._postings[(field, value)]))
+            for value in self._values.get(field, ())
+        ]
+        counts.sort(key=lambda item: item[1], reverse=True)
+        return counts[:limit]
+
+    def search(self, terms: list[str], filters: dict[str, str], limit: int) -> list[int]:
+        """Sequences matching every filter and free-text term, newest first."""
+        keys = [(field, value) for field, value in filters.items()]
+        for term in terms:
+            keys.extend((_FREE_TEXT, token) for token in _TOKEN_RE.findall(term.lower()))
+        if not keys:
+            return []
+        postings = []
+        for key in keys:
+            posting = self._postings.get(key)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        rarest, rest = postings[0], postings[1:]
+        # Walk the rarest posting newest first in growing chunks; each chunk is
+        # intersected with the other postings' sequences in the same range, as
+        # sets, so the work per sequence happens in C. Ranges another posting
+        # has nothing in are skipped after two bisects.
+        result: list[int] = []
+        end = len(rarest.seqs)
+        chunk = max(limit, SEARCH_CHUNK)
+        while end > rarest.start and len(result) < limit:
+            begin = max(end - chunk, rarest.start)
+            candidates = rarest.seqs[begin:end]
+            for posting in rest:
+                others = posting.between(candidates[0], candidates[-1])
+                if len(others) < len(candidates):
+                    candidates, others = others, candidates
+                candidates = sorted(set(candidates).intersection(others))
+                if not candidates:
+                    break
+            result.extend(reversed(candidates))
+            end = begin
+            chunk *= 2
+        return result[:limit]
+
+    @staticmethod
+    def _keys(record: EventRecord) -> set[tuple[str, str]]:
+        keys: set[tuple[str, str]] = set()
+        for field, value in record_values(record):
+            if not value:
+                continue
+            keys.add((field, value))
+            keys.update(_tokens(value))
+        return keys
+
+
+@lru_cache(maxsize=65536)
+def _tokens(value: str) -> frozenset[tuple[str, str]]:
+    # Services, sources and IDs repeat a lot; tokenising each distinct value once
+    # keeps indexing cost flat under bursts.
+    return frozenset((_FREE_TEXT, token) for token in _TOKEN_RE.findall(value.lower()))
@@ -0,0 +1,170 @@
+from array import array
+from collections import Counter
+from typing import NamedTuple, Optional
+import heapq
+
+from app.services.events import EventRecord
+
+# Column of each status in the per-service counts; anything else counts as an error.
+_STATUS_COLUMN = {"OK": 0, "WARN": 1, "ERROR": 2}
+# Sliding windows offered on the dashboard, in seconds.
+WINDOWS: dict[str, int] = {"1m": 60, "5m": 300, "1h": 3600}
+# (bucket seconds, buckets kept): 1 s buckets serve 1m and 5m, 10 s buckets the hour.
+TIERS: tuple[tuple[int, int], ...] = ((1, 300), (10, 360))
+# Distinct services tracked; any beyond this are counted under OTHER.
+MAX_SERVICES = 200
+OTHER = "(other)"
+
+
+class ServiceCount(NamedTuple):
+    service: str
+    ok: int
+    warn: int
+    error: int
+
+    @property
+    def total(self) -> int:
+        return self.ok + self.warn + self.error
+
+
+class _Tier:
+    """Ring of count buckets per (service, status) key, with running window totals.
+
+    `counts[key][slot]` holds the key's events in bucket `stamps[slot]`, and
+    `totals[w][key]` the sum over the newest `spans[w]` buckets. Totals are
+    corrected as buckets roll out of each window, so neither adding an event
+    nor reading a window scans the ring.
+    """
+
+    def __init__(self, resolution: int, capacity: int, spans: list[int]):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.spans = spans
+        self.stamps = array("q", [-1]) * capacity
+        self.counts: list[array] = []
+        self.totals: list[array] = [array("q") for _ in spans]
+        self.current = -1
+
+    def add_key(self) -> None:
+        self.counts.append(array("q", [0]) * self.capacity)
+        for totals in self.totals:
+            totals.append(0)
+
+    def advance(self, ts: float) -> None:
+        bucket = int(ts // self.resolution)
+        if bucket <= self.current:
+            return
+        if self.current < 0 or bucket - self.current >= self.capacity:
+            # Idle for longer than the ring holds: every window is empty.
+            self.stamps = array("q", [-1]) * self.capacity
+            self.counts = [array("q", [0]) * self.capacity for _ in self.counts]
+            self.totals = [array("q", [0]) * len(totals) for totals in self.totals]
+            self.current = bucket
+            self.stamps[bucket % self.capacity] = bucket
+            return
+        for step in range(self.current + 1, bucket + 1):
+            for span, totals in zip(self.spans, self.totals):
+                leaving = step - span
+                slot = leaving % self.capacity
+                if self.stamps[slot] == leaving:
+                    for key, counts in enumerate(self.counts):
+                        totals[key] -= counts[slot]
+            slot = step % self.capacity
+            for counts in self.counts:
+                counts[slot] = 0
+            self.stamps[slot] = step
+        self.current = bucket
+
+    def add(self, key: int, count: int) -> None:
+        self.counts[key][self.current % self.capacity] += count
+        for totals in self.totals:
+            totals[key] += count
+
+
+class ServiceStats:
+    """Sliding-window event counts per service and status (see WINDOWS).
+
+    Memory is fixed by TIERS and MAX_SERVICES, however long the hub runs.
+    Adding a batch costs O(1) per event; reading a window is O(services).
+    `total` counts every event since start, for throughput measurements.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._keys: dict[tuple[str, str], int] = {}
+        self._key_names: list[tuple[str, str]] = []
+        self._services: set[str] = set()
+        self._started: Optional[float] = None
+        self._tiers = [_Tier(resolution, capacity, []) for resolution, capacity in TIERS]
+        # Window name -> (tier, index of the window in that tier's totals).
+        self._windows: dict[str, tuple[_Tier, int]] = {}
+        for name, seconds in WINDOWS.items():
+            # Finest tier whose ring still covers the window.
+            tier = next(
+                (t for t in self._tiers if seconds <= t.resolution * t.capacity),
+                self._tiers[-1],
+            )
+            self._windows[name] = (tier, len(tier.spans))
+            tier.spans.append(min(seconds // tier.resolution, tier.capacity))
+            tier.totals.append(array("q"))
+
+    def add(self, records: list[EventRecord], now: float) -> None:
+        """Count a batch as arriving at `now`."""
+        if self._started is None:
+            self._started = now
+        for tier in self._tiers:
+            tier.advance(now)
+        counted = Counter((r.event["service"], r.event["status"]) for r in records)
+        for key, count in counted.items():
+            index = self._keys.get(key)
+            if index is None:
+                index = self._add_key(*key)
+            for tier in self._tiers:
+                tier.add(index, count)
+        self.total += len(records)
+
+    def _add_key(self, service: str, status: str) -> int:
+        if service not in self._services and len(self._services) >= MAX_SERVICES:
+            other = self._keys.get((OTHER, status))
+            return other if other is not None else self._new_key(OTHER, status)
+        return self._new_key(service, status)
+
+    def _new_key(self, service: str, status: str) -> int:
+        self._services.add(service)
+        index = len(self._key_names)
+        self._key_names.append((service, status))
+        self._keys[(service, status)] = index
+        for tier in self._tiers:
+            tier.add_key()
+        return index
+
+    def services(self, window: str, now: float) -> list[ServiceCount]:
+        """Per-service counts over `window`, in first-seen order."""
+        tier, w = self._windows[window]
+        tier.advance(now)
+        totals = tier.totals[w]
+        by_service: dict[str, list[int]] = {}
+        for (service, status), count in zip(self._key_names, totals):
+            if count:
+                counts = by_service.setdefault(service, [0, 0, 0])
+                counts[_STATUS_COLUMN.get(status, 2)] += count
+        return [ServiceCount(service, *counts) for service, counts in by_service.items()]
+
+    def top(self, window: str, now: float, n: int) -> list[ServiceCount]:
+        """The `n` busiest services over `window`."""
+        return heapq.nlargest(n, self.services(window, now), key=lambda s: s.total)
+
+    def counts(self, window: str, now: float) -> dict[str, int]:
+        """Events per status over `window`, keyed like the stat cards."""
+        ok = warn = error = 0
+        for service in self.services(window, now):
+            ok += service.ok
+            warn += service.warn
+            error += service.error
+        return {"total": ok + warn + error, "ok": ok, "warn": warn, "error": error}
+
+    def seconds(self, window: str, now: float) -> float:
+        """The window's length, or the time since the first event if that is shorter."""
+        if self._started is None:
+            return float(WINDOWS[window])
+        return max(min(float(WINDOWS[window]), now - self._started), 1.0)
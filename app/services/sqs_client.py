@@ -0,0 +1,144 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional
+from aiobotocore.config import AioConfig
+import aioboto3
+import asyncio
+import functools
+import logging
+import os
+import time
+
+from app.services import queues
+from app.services.archive import close_archive
+from app.services.coordination import get_coordinator
+from app.services.metrics import SQS_REQUEST_ERRORS, SQS_REQUEST_SECONDS
+from app.services.supervisor import supervisor
+
+logger = logging.getLogger(__name__)
+
+# Every long-poll worker holds a connection for up to WaitTimeSeconds, and the
+# attribute refresh fans out on top of that; keep well above both.
+MAX_POOL_CONNECTIONS = int(os.getenv("SQS_MAX_POOL_CONNECTIONS", "64"))
+SQS_CLIENT_CONFIG = AioConfig(
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    connector_args={"keepalive_timeout": 75},
+    connect_timeout=5,
+    # Must exceed the 20 s long-poll wait or receive_message times out client-side.
+    read_timeout=30,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+)
+
+
+def default_session() -> aioboto3.Session:
+    return aioboto3.Session(
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=queues.REGION,
+    )
+
+
+class SQSClientPool:
+    """One long-lived SQS client shared by every poller in the process.
+
+    aiobotocore clients are safe to use concurrently and keep their own
+    connection pool, so credentials are resolved, the client is built and TLS
+    connections are established once; restarting a stream or switching
+    environments borrows the same client instead of paying for a new one.
+    """
+
+    def __init__(self, session_factory: Callable[[], Any] = default_session):
+        self.session_factory = session_factory
+        self._client: Any = None
+        self._stack: Optional[AsyncExitStack] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> Any:
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    stack = AsyncExitStack()
+                    client = await stack.enter_async_context(
+                        self.session_factory().client(
+                            "sqs", endpoint_url=queues.ENDPOINT_URL, config=SQS_CLIENT_CONFIG
+                        )
+                    )
+                    self._client = InstrumentedClient(client)
+                    self._stack = stack
+        return self._client
+
+    async def close(self) -> None:
+        async with self._lock:
+            stack, self._stack, self._client = self._stack, None, None
+        if stack is not None:
+            await stack.aclose()
+
+
+class InstrumentedClient:
+    """Times every SQS call into SQS_REQUEST_SECONDS, labelled by operation and queue."""
+
+    def __init__(self, client: Any):
+        self._client = client
+        self._wrapped: dict[str, Any] = {}
+        meta = getattr(client, "meta", None)
+        self._operations = frozenset(getattr(meta, "method_to_api_mapping", ()))
+
+    def __getattr__(self, name: str) -> Any:
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            attr = getattr(self._client, name)
+            if name not in self._operations and not asyncio.iscoroutinefunction(attr):
+                return attr
+            wrapped = self._wrapped[name] = _timed(name, attr)
+        return wrapped
+
+
+def _timed(operation: str, call: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(call)
+    async def timed(*args: Any, **kwargs: Any) -> Any:
+        queue = _queue_label(kwargs)
+        started = time.perf_counter()
+        try:
+            return await call(*args, **kwargs)
+        except Exception:
+            SQS_REQUEST_ERRORS.inc(operation, queue)
+            raise
+        finally:
+            SQS_REQUEST_SECONDS.observe(time.perf_counter() - started, operation, queue)
+
+    return timed
+
+
+def _queue_label(kwargs: dict[str, Any]) -> str:
+    url = kwargs.get("QueueUrl")
+    if url:
+        return url.rsplit("/", 1)[-1]
+    return kwargs.get("QueueName", "")
+
+
+_POOL = SQSClientPool()
+
+
+def get_sqs_pool() -> SQSClientPool:
+    return _POOL
+
+
+@asynccontextmanager
+async def sqs_lifespan() -> AsyncIterator[None]:
+    """App lifespan task: open the shared client at startup; at shutdown close it
+    and flush the event archive."""
+    try:
+        await _POOL.get()
+    except Exception as e:
+        # Pollers retry through get(); a bad startup must not keep the app down.
+        logger.exception("Could not create the SQS client at startup: %s", e)
+    try:
+        yield
+    finally:
+        # Stop every poller before the client they borrow goes away.
+        await supervisor.cancel_prefix("hub:")
+        await supervisor.cancel_prefix("dlq:")
+        # Nothing submits to the archive any more; write out what is pending.
+        await close_archive()
+        await _POOL.close()
+        await get_coordinator().close()
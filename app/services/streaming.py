@@ -0,0 +1,292 @@
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Literal, Optional
+import asyncio
+import logging
+import os
+import time
+
+from app.services import queues
+from app.services.events import EventRecord, decode_messages
+from app.services.metrics import (
+    EVENTS_DROPPED,
+    MESSAGES_DELETED,
+    MESSAGES_RECEIVED,
+    PARSE_FAILURES,
+    RECEIVE_BATCH_SIZE,
+)
+from app.services.polling import Backoff
+from app.services.recording import Recorder
+
+logger = logging.getLogger(__name__)
+
+# Max records held per queue between merges; a burst beyond this drops that queue's oldest.
+PENDING_PER_QUEUE = 1000
+# How often the merger folds the per-queue buffers into the shared feed.
+MERGE_INTERVAL = 0.25
+# Drops are logged at most this often per queue (every one is counted in metrics).
+DROP_LOG_INTERVAL = 10.0
+# MessageIds remembered per queue to drop repeats in peek mode.
+SEEN_IDS_PER_QUEUE = 10_000
+
+# How the dashboard reads a queue:
+#   "mirror"  - read and delete from a dashboard-owned tap queue (`<queue><suffix>`),
+#               fed by SNS/EventBridge fan-out; zero load on the pipeline queue.
+#   "peek"    - receive from the pipeline queue, then immediately release the messages.
+#               Every receive bumps ApproximateReceiveCount (towards the DLQ's
+#               maxReceiveCount) and hides the messages from the real consumers until
+#               released, so it is opt-in and rate-limited by `peek_interval`.
+#   "consume" - receive and delete (competes with the real consumers; legacy behaviour).
+StreamMode = Literal["consume", "peek", "mirror"]
+STREAM_MODES: tuple[StreamMode, ...] = ("mirror", "peek", "consume")
+
+
+@dataclass(frozen=True)
+class StreamConfig:
+    """How one queue is streamed: the [streaming] settings of queues.toml."""
+
+    workers: int = 1
+    batch_size: int = 10
+    wait_time: int = 20
+    mode: StreamMode = "mirror"
+    mirror_suffix: str = "-dashboard-tap"
+    # Mode used when the tap queue does not exist; "" stops streaming the queue.
+    mirror_fallback: str = ""
+    # Peek mode: how long a message is hidden if the release call never lands,
+    # and the minimum time between two receives of one worker.
+    visibility_timeout: int = 30
+    peek_interval: float = 5.0
+
+    @property
+    def observes_all(self) -> bool:
+        """Whether every message that reaches the queue is received (peek only samples)."""
+        return self.mode != "peek"
+
+    def source_queue(self, queue_name: str) -> str:
+        if self.mode == "mirror":
+            return queue_name + self.mirror_suffix
+        return queue_name
+
+
+def _stream_config(settings: dict[str, Any], where: str) -> StreamConfig:
+    known = {f.name for f in fields(StreamConfig)}
+    if unknown := set(settings) - known:
+        raise ValueError(f"Unknown streaming settings {sorted(unknown)} in {where}")
+    # EGGI_STREAM_MODE wins over queues.toml, e.g. for soak runs in peek mode.
+    mode = os.getenv("EGGI_STREAM_MODE") or settings.get("mode", "mirror")
+    config = StreamConfig(**{**settings, "mode": mode})
+    if config.mode not in STREAM_MODES:
+        raise ValueError(
+            f"Unknown streaming mode {config.mode!r} in {where}; expected one of {STREAM_MODES}"
+        )
+    if config.mirror_fallback not in ("", "peek", "consume"):
+        raise ValueError(f"mirror_fallback in {where} must be \"\", \"peek\" or \"consume\"")
+    return config
+
+
+DEFAULT_STREAM_CONFIG = _stream_config(queues.TOPOLOGY.streaming, "[streaming]")
+DEFAULT_STREAM_MODE = DEFAULT_STREAM_CONFIG.mode
+# Keyed by base (prod) queue name; other queues use DEFAULT_STREAM_CONFIG.
+STREAM_CONFIGS: dict[str, StreamConfig] = {
+    spec.name: _stream_config({**queues.TOPOLOGY.streaming, **spec.streaming}, spec.name)
+    for spec in queues.TOPOLOGY.queues
+}
+
+
+class StreamEngine:
+    """Long-poll workers for several queues merged into one time-ordered feed.
+
+    Each worker appends parsed records to its queue's bounded buffer. The merger
+    drains every buffer, orders the result by SQS `SentTimestamp` and hands it
+    to `on_batch`, so a queue only drops records when it outruns
+    `pending_per_queue` within one `merge_interval`.
+    """
+
+    def __init__(
+        self,
+        on_batch: Callable[[list[EventRecord]], None],
+        pending_per_queue: int = PENDING_PER_QUEUE,
+        merge_interval: float = MERGE_INTERVAL,
+    ):
+        self._on_batch = on_batch
+        self._pending_per_queue = pending_per_queue
+        self._merge_interval = merge_interval
+        self._pending: dict[str, deque[EventRecord]] = {}
+        # queue -> (monotonic time of the last drop warning, drops since then).
+        self._drops: dict[str, tuple[float, int]] = {}
+        self._seen: dict[str, _SeenIds] = {}
+        self._wakeup = asyncio.Event()
+        self.dropped = 0
+        # Received messages per queue that never reached `on_batch`: dropped or unparsable.
+        self.lost: dict[str, int] = {}
+        # When set, every batch is written to it as received (see services.recording).
+        self.recorder: Optional[Recorder] = None
+
+    def _buffer(self, queue_name: str) -> deque[EventRecord]:
+        buffer = self._pending.get(queue_name)
+        if buffer is None:
+            buffer = self._pending[queue_name] = deque(maxlen=self._pending_per_queue)
+        return buffer
+
+    def room(self, queue_name: str) -> int:
+        """Records `queue_name`'s buffer takes before push starts dropping."""
+        return self._pending_per_queue - len(self._buffer(queue_name))
+
+    def push(self, queue_name: str, records: list[EventRecord]) -> None:
+        buffer = self._buffer(queue_name)
+        overflow = len(buffer) + len(records) - self._pending_per_queue
+        if overflow > 0:
+            self._drop(queue_name, overflow)
+        buffer.extend(records)
+        self._wakeup.set()
+
+    async def worker(
+        self,
+        sqs: Any,
+        queue_name: str,
+        queue_url: str,
+        config: StreamConfig,
+        alive: Callable[[], bool],
+        active: Optional[asyncio.Event] = None,
+    ) -> None:
+        """Long-poll `queue_url` for `queue_name` until `alive()` turns false.
+
+        While `active` is cleared the worker parks instead of polling.
+        """
+        seen = self._seen.setdefault(queue_name, _SeenIds(SEEN_IDS_PER_QUEUE))
+        receive_kwargs: dict[str, Any] = {}
+        if config.mode == "peek":
+            receive_kwargs["VisibilityTimeout"] = config.visibility_timeout
+        backoff = Backoff()
+        loop = asyncio.get_running_loop()
+        next_peek = 0.0
+        while alive():
+            if active is not None and not active.is_set():
+                await active.wait()
+                continue
+            try:
+                if config.mode == "peek":
+                    # Each peek costs the pipeline a receive count, whatever it returns.
+                    if (wait := next_peek - loop.time()) > 0:
+                        await asyncio.sleep(wait)
+                        continue
+                    next_peek = loop.time() + config.peek_interval
+                resp = await sqs.receive_message(
+                    QueueUrl=queue_url,
+                    MaxNumberOfMessages=config.batch_size,
+                    WaitTimeSeconds=config.wait_time,
+                    MessageAttributeNames=["All"],
+                    MessageSystemAttributeNames=["SentTimestamp"],
+                    **receive_kwargs,
+                )
+                backoff.reset()
+                messages = [m for m in resp.get("Messages", []) if m.get("ReceiptHandle")]
+                if not messages:
+                    continue
+                MESSAGES_RECEIVED.inc(queue_name, amount=len(messages))
+                RECEIVE_BATCH_SIZE.observe(len(messages), queue_name)
+                fresh = messages
+                if config.mode == "peek":
+                    fresh = [m for m in messages if seen.add(m["MessageId"])]
+                if self.recorder is not None and fresh:
+                    self.recorder.record_messages(queue_name, fresh)
+                records, handled = decode_messages(fresh, queue_name)
+                if len(handled) < len(fresh):
+                    PARSE_FAILURES.inc(queue_name, amount=len(fresh) - len(handled))
+                    self.lost[queue_name] = (
+                        self.lost.get(queue_name, 0) + len(fresh) - len(handled)
+                    )
+                if records:
+                    self.push(queue_name, records)
+                if config.mode == "peek":
+                    await _release(sqs, queue_url, messages)
+                else:
+                    # Unparsable messages too: they would only come back and be
+                    # counted as failures again (each one is logged once above).
+                    await _delete(sqs, queue_url, messages)
+                    MESSAGES_DELETED.inc(queue_name, amount=len(messages))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = backoff.next_delay()
+                logger.exception(
+                    "SQS loop error on %s (retrying in %.1fs): %s", queue_name, delay, e
+                )
+                await asyncio.sleep(delay)
+
+    async def merge(self, alive: Callable[[], bool]) -> None:
+        while alive():
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            batch = self._drain()
+            if batch:
+                batch.sort(key=lambda record: record.epoch)
+                self._on_batch(batch)
+            await asyncio.sleep(self._merge_interval)
+
+    def _drain(self) -> list[EventRecord]:
+        batch: list[EventRecord] = []
+        for buffer in self._pending.values():
+            batch.extend(buffer)
+            buffer.clear()
+        return batch
+
+    def _drop(self, queue_name: str, count: int) -> None:
+        self.dropped += count
+        self.lost[queue_name] = self.lost.get(queue_name, 0) + count
+        EVENTS_DROPPED.inc(queue_name, amount=count)
+        now = time.monotonic()
+        logged_at, unlogged = self._drops.get(queue_name, (0.0, 0))
+        unlogged += count
+        if now - logged_at >= DROP_LOG_INTERVAL:
+            logger.warning(
+                "Dropped %d records from %s: it outran the merge (%d pending per queue)",
+                unlogged,
+                queue_name,
+                self._pending_per_queue,
+            )
+            logged_at, unlogged = now, 0
+        self._drops[queue_name] = (logged_at, unlogged)
+
+
+async def _delete(sqs: Any, queue_url: str, messages: list[dict]) -> None:
+    await sqs.delete_message_batch(
+        QueueUrl=queue_url,
+        Entries=[
+            {"Id": m["MessageId"], "ReceiptHandle": m["ReceiptHandle"]} for m in messages
+        ],
+    )
+
+
+async def _release(sqs: Any, queue_url: str, messages: list[dict]) -> None:
+    # Visibility 0 hands the messages straight back to the real consumers.
+    await sqs.change_message_visibility_batch(
+        QueueUrl=queue_url,
+        Entries=[
+            {
+                "Id": m["MessageId"],
+                "ReceiptHandle": m["ReceiptHandle"],
+                "VisibilityTimeout": 0,
+            }
+            for m in messages
+        ],
+    )
+
+
+class _SeenIds:
+    """Bounded set of recently seen MessageIds (oldest forgotten first)."""
+
+    def __init__(self, capacity: int):
+        self._order: deque[str] = deque()
+        self._ids: set[str] = set()
+        self._capacity = capacity
+
+    def add(self, message_id: str) -> bool:
+        """Remember `message_id`; return False if it was already known."""
+        if message_id in self._ids:
+            return False
+        self._ids.add(message_id)
+        self._order.append(message_id)
+        if len(self._order) > self._capacity:
+            self._ids.discard(self._order.popleft())
+        return True
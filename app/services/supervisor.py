@@ -0,0 +1,96 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable
+import asyncio
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SupervisedTask:
+    key: str
+    generation: int
+    task: asyncio.Task
+    started_at: datetime = field(default_factory=datetime.now)
+    labels: dict[str, str] = field(default_factory=dict)
+
+
+class TaskSupervisor:
+    """Registry of long-running loops keyed by role.
+
+    Starting (or adopting) a task under a key cancels the task currently holding
+    that key and waits for it to exit, so a key never has two live loops. Every
+    start hands out a new generation number; loops compare it with
+    `is_current` on each iteration and exit as soon as they are superseded.
+    """
+
+    def __init__(self):
+        self._tasks: dict[str, SupervisedTask] = {}
+        self._generations = itertools.count(1)
+
+    def is_current(self, key: str, generation: int) -> bool:
+        entry = self._tasks.get(key)
+        return entry is not None and entry.generation == generation
+
+    def running(self, key: str) -> bool:
+        entry = self._tasks.get(key)
+        return entry is not None and not entry.task.done()
+
+    async def start(
+        self, key: str, factory: Callable[[int], Awaitable[None]], **labels: str
+    ) -> int:
+        """Run `factory(generation)` as the only task for `key`."""
+        await self.cancel(key)
+        generation = next(self._generations)
+        task = asyncio.create_task(factory(generation), name=key)
+        self._register(key, generation, task, labels)
+        return generation
+
+    async def adopt(self, key: str, **labels: str) -> int:
+        """Register the calling task (e.g. a Reflex background event) under `key`."""
+        task = asyncio.current_task()
+        assert task is not None, "adopt() must be called from inside a task"
+        await self.cancel(key)
+        generation = next(self._generations)
+        self._register(key, generation, task, labels)
+        return generation
+
+    def release(self, key: str, generation: int) -> None:
+        if self.is_current(key, generation):
+            del self._tasks[key]
+
+    async def cancel(self, key: str) -> None:
+        entry = self._tasks.pop(key, None)
+        if entry is None or entry.task is asyncio.current_task():
+            return
+        entry.task.cancel()
+        await asyncio.gather(entry.task, return_exceptions=True)
+        logger.info("Cancelled superseded task %s (generation %d)", key, entry.generation)
+
+    async def cancel_prefix(self, prefix: str) -> None:
+        await asyncio.gather(
+            *(self.cancel(key) for key in list(self._tasks) if key.startswith(prefix))
+        )
+
+    def snapshot(self) -> list[dict[str, str]]:
+        return [
+            {
+                "key": entry.key,
+                "generation": str(entry.generation),
+                "started_at": entry.started_at.strftime("%H:%M:%S"),
+                "state": "running" if not entry.task.done() else "finished",
+                **entry.labels,
+            }
+            for entry in sorted(self._tasks.values(), key=lambda e: e.key)
+        ]
+
+    def _register(
+        self, key: str, generation: int, task: asyncio.Task, labels: dict[str, str]
+    ) -> None:
+        self._tasks[key] = SupervisedTask(key, generation, task, labels=labels)
+        task.add_done_callback(lambda _: self.release(key, generation))
+
+
+supervisor = TaskSupervisor()
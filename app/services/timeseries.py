@@ -0,0 +1,170 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Optional
+import math
+
+from app.services.models import QueueAttributes
+
+METRICS = (
+    "ApproximateNumberOfMessages",
+    "ApproximateNumberOfMessagesNotVisible",
+    "ApproximateNumberOfMessagesDelayed",
+)
+# (bucket seconds, buckets kept): 1 s for an hour, 10 s for a day, 1 min for a week.
+TIERS: tuple[tuple[int, int], ...] = ((1, 3600), (10, 8640), (60, 10080))
+# Points sent to the browser per series, whatever the zoom range.
+MAX_CHART_POINTS = 300
+CHART_RANGES: dict[str, int] = {"15m": 900, "1h": 3600, "24h": 86400, "7d": 604800}
+
+
+class _Tier:
+    """Fixed-width buckets holding the mean of each metric, for the last
+    `capacity` bucket widths.
+
+    Buckets are stored in time order and only once they hold a sample, so a
+    queue that is sampled rarely, or was only seen recently, costs memory in
+    proportion to its samples rather than the full retention.
+    """
+
+    def __init__(self, resolution: int, capacity: int):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.buckets = array("q")
+        self.values = [array("d") for _ in METRICS]
+        # Index of the oldest retained bucket; expired ones are trimmed in bulk.
+        self._start = 0
+        self._sums = [0.0] * len(METRICS)
+        self._count = 0
+
+    def add(self, ts: float, values: list[float]) -> None:
+        bucket = int(ts // self.resolution)
+        last = self.buckets[-1] if len(self.buckets) > self._start else None
+        if last is not None and bucket < last:
+            return  # older than what is stored, e.g. a clock step back
+        if bucket != last:
+            self.buckets.append(bucket)
+            for series in self.values:
+                series.append(0.0)
+            self._sums = [0.0] * len(METRICS)
+            self._count = 0
+            self._expire(bucket)
+        self._count += 1
+        for i, value in enumerate(values):
+            self._sums[i] += value
+            self.values[i][-1] = self._sums[i] / self._count
+
+    def _expire(self, newest: int) -> None:
+        oldest = newest - self.capacity + 1
+        start = bisect_left(self.buckets, oldest, self._start)
+        if start > 64 and start * 2 > len(self.buckets):
+            del self.buckets[:start]
+            for series in self.values:
+                del series[:start]
+            start = 0
+        self._start = start
+
+    def span(self) -> int:
+        return self.resolution * self.capacity
+
+    def points(self, start: float, end: float) -> list[tuple[float, list[float]]]:
+        newest = int(end // self.resolution)
+        oldest = max(int(start // self.resolution), newest - self.capacity + 1)
+        first = bisect_left(self.buckets, oldest, self._start)
+        last = bisect_right(self.buckets, newest, first)
+        return [
+            (self.buckets[i] * self.resolution, [series[i] for series in self.values])
+            for i in range(first, last)
+        ]
+
+
+class QueueSeries:
+    def __init__(self, long_term: bool = True):
+        # Without `long_term` only the finest tier is kept.
+        tiers = TIERS if long_term else TIERS[:1]
+        self.tiers = [_Tier(resolution, capacity) for resolution, capacity in tiers]
+
+    def add(self, ts: float, values: list[float]) -> None:
+        for tier in self.tiers:
+            tier.add(ts, values)
+
+    def points(self, start: float, end: float) -> list[tuple[float, list[float]]]:
+        # Finest tier whose retention still covers the requested range.
+        for tier in self.tiers:
+            if end - start <= tier.span():
+                return tier.points(start, end)
+        return self.tiers[-1].points(start, end)
+
+
+class TimeSeriesStore:
+    """Bounded multi-resolution history of queue depths, one series per queue.
+
+    Only the queues `long_term` accepts keep the 10 s and 1 min tiers; the
+    rest (e.g. hundreds of discovered per-tenant queues) keep the last hour.
+    """
+
+    def __init__(self, long_term: Callable[[str], bool] = lambda queue_name: True):
+        self._series: dict[str, QueueSeries] = {}
+        self._long_term = long_term
+
+    def add_snapshot(self, ts: float, attributes: dict[str, QueueAttributes]) -> None:
+        for queue_name, attrs in attributes.items():
+            series = self._series.get(queue_name)
+            if series is None:
+                series = self._series[queue_name] = QueueSeries(self._long_term(queue_name))
+            series.add(ts, [_to_float(attrs.get(metric)) for metric in METRICS])
+
+    def query(
+        self,
+        queue_name: str,
+        start: float,
+        end: float,
+        max_points: int = MAX_CHART_POINTS,
+    ) -> list[tuple[float, list[float]]]:
+        series = self._series.get(queue_name)
+        if series is None:
+            return []
+        return lttb(series.points(start, end), max_points)
+
+
+def lttb(
+    points: list[tuple[float, list[float]]], threshold: int
+) -> list[tuple[float, list[float]]]:
+    """Largest-Triangle-Three-Buckets downsampling on the summed depth.
+
+    Picks which timestamps to keep by the total of all metrics, then returns
+    every metric at those timestamps so the lines stay aligned.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return points
+    totals = [sum(values) for _, values in points]
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(points[j][0] for j in range(avg_start, avg_end)) / (avg_end - avg_start)
+        avg_y = sum(totals[avg_start:avg_end]) / (avg_end - avg_start)
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax, ay = points[a][0], totals[a]
+        max_area = -1.0
+        chosen = range_start
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (totals[j] - ay) - (ax - points[j][0]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                chosen = j
+        sampled.append(points[chosen])
+        a = chosen
+    sampled.append(points[-1])
+    return sampled
+
+
+def _to_float(value: Optional[str]) -> float:
+    try:
+        result = float(value) if value is not None else 0.0
+    except ValueError:
+        return 0.0
+    return result if math.isfinite(result) else 0.0
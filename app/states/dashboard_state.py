@@ -1,112 +1,212 @@
 import reflex as rx
-from typing import TypedDict, Literal, cast, Optional
+from contextlib import AsyncExitStack
+from typing import Optional
 from datetime import datetime
-import aioboto3
+from reflex.utils import prerequisites
+import asyncio
 import json
-import os
 import logging
-import asyncio
-
-logger = logging.getLogger(__name__)
+import time
 
+from app.services import queues
+from app.services.hub import QueueHub, get_hub
+from app.services.metrics import STATE_PUSH_BYTES, STATE_PUSHES
+from app.services.models import Event, QueueAttributes, empty_attributes
+from app.services.rates import format_rate
+from app.services.search import parse_query
+from app.services.service_stats import WINDOWS
+from app.services.supervisor import supervisor
+from app.services.timeseries import CHART_RANGES
 
-class Event(TypedDict):
-    timestamp: str
-    service: str
-    status: Literal["OK", "WARN", "ERROR"]
-    message: str
-    avatar: str
-
+logger = logging.getLogger(__name__)
 
-class QueueAttributes(TypedDict):
-    ApproximateNumberOfMessages: str
-    ApproximateNumberOfMessagesNotVisible: str
-    ApproximateNumberOfMessagesDelayed: str
+# Upper bound on how long a session waits for the hub before re-checking its own state.
+HUB_WAIT_TIMEOUT = 5.0
+# Minimum seconds between chart re-queries; depth samples only arrive once a second.
+CHART_REFRESH_INTERVAL = 1.0
+# How long a disconnected session keeps its hub subscription before giving up.
+SESSION_GRACE = 600.0
+# Measure the serialized push size on one push in this many; sizing costs as much as sending.
+PUSH_SIZE_SAMPLE_EVERY = 20
+# Quick-filter chips offered above the event stream.
+TOP_SERVICES = 6
+# Busiest services listed in the service breakdown.
+SERVICE_ROWS = 8
+# Fixed pixel height of an event row; the virtual list positions rows by index.
+EVENT_ROW_HEIGHT = 104
+# Rows mounted above and below the visible ones.
+EVENT_OVERSCAN = 10
+# Rows mounted before the browser has reported its viewport size.
+DEFAULT_EVENT_WINDOW = 40
+_NO_RATES = {"arrival_rate": "-", "processing_rate": "-", "drain_eta": "-"}
+# Per client token: set when the session switches environment, to wake its follower.
+_VIEW_SWITCHES: dict[str, asyncio.Event] = {}
 
 
 class DashboardState(rx.State):
+    # The mounted slice of the event log: rows [events_offset, events_offset + len).
     events: list[Event] = []
+    events_offset: int = 0
+    # Rows the scrollbar spans; older rows are paged in from the hub on scroll.
+    events_total: int = 0
+    # Events that arrived while the list is scrolled away from the top (frozen).
+    new_events: int = 0
     is_streaming: bool = False
+    # Events per status over `stats_window`, see services.service_stats.
     stats: dict[str, int] = {"total": 0, "ok": 0, "warn": 0, "error": 0}
+    stats_window: str = "5m"
+    stats_rate: str = "-"
+    service_rows: list[dict[str, str]] = []
+    # Cap on search results; the live list is virtualized over the hub's retained log.
     MAX_EVENT_LOGS: int = 100
     # Environment toggle: False -> prod, True -> dev
     use_dev_queues: bool = False
-
-    # Base (prod) queue names; dev variant will replace "eggi-" with "eggi-dev-"
-    # Order: preparation -> mapping -> completion -> llm
-    QUEUE_BASE_NAMES: list[str] = [
-        "eggi-profiles-to-analyse-preparation",
-        "eggi-mapping-service-profiles-to-analyse",
-        "eggi-mapping-job-completion-handler",
-        "eggi-llm-inference-jobs",
-    ]
-    DLQ_BASE_NAMES: list[str] = [
-        "eggi-profile-analysis-preparation-dlq",
-        "eggi-mapping-service-profiles-dlq",
-        "eggi-mapping-job-completion-handler-dlq",
-        "eggi-llm-inference-jobs-dlq",
-    ]
+    # Configured queues of the selected environment plus any the hub discovered.
+    queue_names: list[str] = queues.queue_names("prod")
+    dlq_queue_names: list[str] = queues.dlq_queue_names("prod")
     queue_attributes: dict[str, QueueAttributes] = {}
+    # Formatted arrival/processing rate and drain ETA per queue, see services.rates.
+    queue_rates: dict[str, dict[str, str]] = {}
+    chart_queue: str = ""
+    chart_range: str = "15m"
+    chart_data: list[dict[str, float | str]] = []
+    # Free text plus `field:value` filters, e.g. "job:1234 acme".
+    search_query: str = ""
+    search_results: list[Event] = []
+    top_services: list[str] = []
+    # Hub sequence the live list has caught up to, and the one a frozen list is
+    # pinned to (-1 while following the newest events).
+    _events_seq: int = -1
+    _events_anchor: int = -1
+    _window_rows: int = DEFAULT_EVENT_WINDOW
+    # p50/p95/p99 per pipeline hop and end-to-end, see services.latency.
+    latency_rows: list[dict[str, str]] = []
 
     @rx.var
-    def queue_names(self) -> list[str]:
-        if self.use_dev_queues:
-            return [name.replace("eggi-", "eggi-dev-") for name in self.QUEUE_BASE_NAMES]
-        return list(self.QUEUE_BASE_NAMES)
+    def environment(self) -> str:
+        return "dev" if self.use_dev_queues else "prod"
+
+    @rx.var
+    def chart_ranges(self) -> list[str]:
+        return list(CHART_RANGES)
+
+    @rx.var
+    def stats_windows(self) -> list[str]:
+        return list(WINDOWS)
+
+    @rx.event
+    def set_stats_window(self, value: str):
+        if value in WINDOWS:
+            self.stats_window = value
+            self._apply_stats(get_hub(self.environment))
+
+    def _apply_stats(self, hub: QueueHub):
+        now = time.time()
+        window = self.stats_window
+        self.stats = hub.service_stats.counts(window, now)
+        seconds = hub.service_stats.seconds(window, now)
+        self.stats_rate = format_rate(self.stats["total"] / seconds)
+        self.service_rows = [
+            {
+                "service": service.service,
+                "total": str(service.total),
+                "warn": str(service.warn),
+                "error": str(service.error),
+                "rate": format_rate(service.total / seconds),
+            }
+            for service in hub.service_stats.top(window, now, SERVICE_ROWS)
+        ]
 
     @rx.var
-    def dlq_queue_names(self) -> list[str]:
-        if self.use_dev_queues:
-            return [name.replace("eggi-", "eggi-dev-") for name in self.DLQ_BASE_NAMES]
-        return list(self.DLQ_BASE_NAMES)
+    def selected_chart_queue(self) -> str:
+        if self.chart_queue in self.queue_names + self.dlq_queue_names:
+            return self.chart_queue
+        return self.queue_names[0] if self.queue_names else ""
+
+    @rx.event
+    def set_chart_queue(self, value: str):
+        self.chart_queue = value
+        self._refresh_chart(get_hub(self.environment))
+
+    @rx.event
+    def set_chart_range(self, value: str):
+        if value in CHART_RANGES:
+            self.chart_range = value
+            self._refresh_chart(get_hub(self.environment))
+
+    def _refresh_chart(self, hub: QueueHub):
+        span = CHART_RANGES[self.chart_range]
+        now = time.time()
+        points = hub.timeseries.query(self.selected_chart_queue, now - span, now)
+        time_format = "%H:%M:%S" if span <= 3600 else "%d %b %H:%M"
+        self.chart_data = [
+            {
+                "time": datetime.fromtimestamp(ts).strftime(time_format),
+                "visible": visible,
+                "in_flight": in_flight,
+                "delayed": delayed,
+            }
+            for ts, (visible, in_flight, delayed) in points
+        ]
+
+    @rx.var
+    def is_searching(self) -> bool:
+        return bool(self.search_query.strip())
+
+    @rx.var
+    def search_filters(self) -> list[dict[str, str]]:
+        _, filters = parse_query(self.search_query)
+        return [
+            {"field": field, "value": value, "token": f"{field}:{value}"}
+            for field, value in filters.items()
+        ]
+
+    @rx.event
+    def set_search_query(self, value: str):
+        self.search_query = value
+        self._refresh_search(get_hub(self.environment))
+
+    @rx.event
+    def add_search_filter(self, token: str):
+        if token not in self.search_query.split():
+            self.search_query = f"{self.search_query} {token}".strip()
+            self._refresh_search(get_hub(self.environment))
+
+    @rx.event
+    def remove_search_filter(self, token: str):
+        self.search_query = " ".join(p for p in self.search_query.split() if p != token)
+        self._refresh_search(get_hub(self.environment))
+
+    def _refresh_search(self, hub: QueueHub):
+        if not self.is_searching:
+            self.search_results = []
+            return
+        terms, filters = parse_query(self.search_query)
+        records = hub.search(terms, filters, self.MAX_EVENT_LOGS)
+        self.search_results = [record.event for record in records]
 
     @rx.event
     def set_use_dev_queues(self, value: bool):
+        """Show the other environment; its hub is already warm, so this is a view switch."""
         self.use_dev_queues = bool(value)
-        if self.is_streaming:
-            # Stop current background tasks and restart with the new queue set
-            self.is_streaming = False
-            return [DashboardState.start_streaming_on_load]
+        self._events_seq = -1
+        self._events_anchor = -1
+        self.new_events = 0
+        self._apply_hub(get_hub(self.environment), full=True)
+        switch = _VIEW_SWITCHES.get(self.router.session.client_token)
+        if switch is not None:
+            switch.set()
+        return rx.scroll_to("event-stream-top")
 
     @rx.var
     def queues_with_attrs(self) -> list[tuple[str, QueueAttributes]]:
-        result: list[tuple[str, QueueAttributes]] = []
         existing = self.queue_attributes or {}
-        for name in self.queue_names:
-            attrs = existing.get(name)
-            if attrs is None:
-                counterpart = (
-                    name.replace("eggi-dev-", "eggi-")
-                    if name.startswith("eggi-dev-")
-                    else name.replace("eggi-", "eggi-dev-")
-                )
-                attrs = existing.get(counterpart) or {
-                    "ApproximateNumberOfMessages": "0",
-                    "ApproximateNumberOfMessagesNotVisible": "0",
-                    "ApproximateNumberOfMessagesDelayed": "0",
-                }
-            result.append((name, attrs))
-        return result
+        return [(name, existing.get(name) or empty_attributes()) for name in self.queue_names]
 
     @rx.var
     def dlq_queues_with_attrs(self) -> list[tuple[str, QueueAttributes]]:
-        result: list[tuple[str, QueueAttributes]] = []
         existing = self.queue_attributes or {}
-        for name in self.dlq_queue_names:
-            attrs = existing.get(name)
-            if attrs is None:
-                counterpart = (
-                    name.replace("eggi-dev-", "eggi-")
-                    if name.startswith("eggi-dev-")
-                    else name.replace("eggi-", "eggi-dev-")
-                )
-                attrs = existing.get(counterpart) or {
-                    "ApproximateNumberOfMessages": "0",
-                    "ApproximateNumberOfMessagesNotVisible": "0",
-                    "ApproximateNumberOfMessagesDelayed": "0",
-                }
-            result.append((name, attrs))
-        return result
+        return [(name, existing.get(name) or empty_attributes()) for name in self.dlq_queue_names]
 
     @rx.var
     def queue_rows(self) -> list[dict[str, str]]:
@@ -115,6 +215,7 @@ class DashboardState(rx.State):
             rows.append(
                 {
                     "name": name,
+                    "display": queues.display_name(name),
                     "ApproximateNumberOfMessages": attrs["ApproximateNumberOfMessages"],
                     "ApproximateNumberOfMessagesNotVisible": attrs[
                         "ApproximateNumberOfMessagesNotVisible"
@@ -122,6 +223,7 @@ class DashboardState(rx.State):
                     "ApproximateNumberOfMessagesDelayed": attrs[
                         "ApproximateNumberOfMessagesDelayed"
                     ],
+                    **self.queue_rates.get(name, _NO_RATES),
                 }
             )
         return rows
@@ -133,6 +235,7 @@ class DashboardState(rx.State):
             rows.append(
                 {
                     "name": name,
+                    "display": queues.display_name(name),
                     "ApproximateNumberOfMessages": attrs["ApproximateNumberOfMessages"],
                     "ApproximateNumberOfMessagesNotVisible": attrs[
                         "ApproximateNumberOfMessagesNotVisible"
@@ -140,211 +243,226 @@ class DashboardState(rx.State):
                     "ApproximateNumberOfMessagesDelayed": attrs[
                         "ApproximateNumberOfMessagesDelayed"
                     ],
+                    **self.queue_rates.get(name, _NO_RATES),
                 }
             )
         return rows
 
-    def _create_event_from_sqs(self, message_body: str) -> Optional[Event]:
-        try:
-            body_json = json.loads(message_body)
-            event_source = body_json.get("event_source", "unknown-service")
-            payload = body_json.get("payload", {})
-            linkedin_id = payload.get("linkedin_identifier", "N/A")
-            message = ""
-            if "preparation-requested" in event_source:
-                source = payload.get("metadata", {}).get("source", "N/A")
-                message = f"Prep requested for {linkedin_id} via {source}"
-            elif "completed" in event_source:
-                job_id = payload.get("job_id", "N/A")
-                message = f"Analysis complete for {linkedin_id} (Job: {job_id})"
-            elif "events" in event_source:
-                job_id = payload.get("job_id", "N/A")
-                original_input = payload.get("original_input", "N/A")
-                message = f"Event for {original_input} (Job: {job_id})"
-            else:
-                message = f"Received event from {event_source}"
-            timestamp_str = body_json.get(
-                "timestamp", datetime.utcnow().isoformat() + "Z"
-            )
-            dt_object = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-            return {
-                "timestamp": dt_object.strftime("%H:%M:%S"),
-                "service": event_source,
-                "status": "OK",
-                "message": message,
-                "avatar": "/icon_gray_simple.png",
-            }
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.exception(f"Failed to parse SQS message: {e}")
-            return None
+    @rx.var
+    def events_pad_top(self) -> int:
+        return self.events_offset * EVENT_ROW_HEIGHT
+
+    @rx.var
+    def events_pad_bottom(self) -> int:
+        rest = self.events_total - self.events_offset - len(self.events)
+        return max(rest, 0) * EVENT_ROW_HEIGHT
+
+    @rx.event
+    def scroll_events(self, scroll_top: float, scroll_height: float, client_height: float):
+        """Mount only the rows around the viewport, paging them in from the hub."""
+        if self.is_searching:
+            return
+        hub = get_hub(self.environment)
+        first = max(int(scroll_top // EVENT_ROW_HEIGHT), 0)
+        self._window_rows = int(client_height // EVENT_ROW_HEIGHT) + 1 + 2 * EVENT_OVERSCAN
+        if first == 0:
+            if self._events_anchor >= 0:
+                # Back at the top: follow the newest events again.
+                self._events_anchor = -1
+                self.new_events = 0
+                self._events_seq = -1
+                self._apply_events(hub)
+            return
+        if self._events_anchor < 0:
+            # Scrolled into history: pin the list so rows stop shifting under the reader.
+            self._events_anchor = max(self._events_seq, hub.events.first_seq)
+        offset = max(first - EVENT_OVERSCAN, 0)
+        # Re-page only once the viewport nears either end of the mounted slice.
+        if (
+            self.events_offset <= max(first - EVENT_OVERSCAN // 2, 0)
+            and first + self._window_rows - 2 * EVENT_OVERSCAN
+            <= self.events_offset + len(self.events) - EVENT_OVERSCAN // 2
+        ):
+            return
+        self._load_window(hub, offset)
+
+    @rx.event
+    def jump_to_latest_events(self):
+        self._events_anchor = -1
+        self._events_seq = -1
+        self.new_events = 0
+        self._apply_events(get_hub(self.environment))
+        return rx.scroll_to("event-stream-top")
+
+    def _load_window(self, hub: QueueHub, offset: int):
+        anchor = self._events_anchor
+        self.events_total = max(anchor - hub.events.first_seq, 0)
+        offset = min(offset, max(self.events_total - self._window_rows, 0))
+        records = hub.events.newest(self._window_rows, before=anchor - offset)
+        self.events_offset = offset
+        self.events = [record.event for record in records]
+
+    def _apply_events(self, hub: QueueHub):
+        # Only the records appended since the last push are touched, so the cost is
+        # bounded by the mounted window no matter how much the hub retains.
+        events_seq, self._events_seq = self._events_seq, hub.events.next_seq
+        if self._events_anchor >= 0:
+            self.new_events = hub.events.next_seq - self._events_anchor
+            self.events_total = max(self._events_anchor - hub.events.first_seq, 0)
+            return
+        window = self._window_rows
+        self.events_offset = 0
+        self.events_total = len(hub.events)
+        arrived = hub.events.next_seq - max(events_seq, hub.events.first_seq)
+        if events_seq < 0 or len(self.events) + arrived < min(window, len(hub.events)):
+            # Fresh start, or the viewport grew beyond what is mounted.
+            records = hub.events.newest(window)
+            self.events = [record.event for record in records]
+            return
+        if arrived > window:
+            hub.backpressure.rows_skipped += arrived - window
+        new_records = hub.events.since(events_seq, limit=window)
+        if new_records or len(self.events) > window:
+            new_events = [record.event for record in reversed(new_records)]
+            self.events = (new_events + self.events)[:window]
+
+    def _push_size(self) -> int:
+        # Approximates the delta: Reflex resends every var touched by a push whole.
+        pushed = {
+            "events": self.events,
+            "queue_attributes": self.queue_attributes,
+            "queue_rates": self.queue_rates,
+            "stats": self.stats,
+            "service_rows": self.service_rows,
+            "search_results": self.search_results,
+        }
+        return len(json.dumps(pushed, separators=(",", ":")))
 
     @rx.event
     def start_streaming_on_load(self):
         self.is_streaming = True
-        self.events = []
-        self.stats = {"total": 0, "ok": 0, "warn": 0, "error": 0}
-        # Preserve existing attributes and seed missing queues from their base/dev counterpart
-        # to avoid UI resets when toggling environments.
-        existing = self.queue_attributes or {}
-        target_names = self.queue_names + self.dlq_queue_names
-        new_attrs: dict[str, QueueAttributes] = dict(existing)
-        for name in target_names:
-            if name in new_attrs:
-                continue
-            # Try to seed from the opposite env name if present
-            if name.startswith("eggi-dev-"):
-                counterpart = name.replace("eggi-dev-", "eggi-")
-            else:
-                counterpart = name.replace("eggi-", "eggi-dev-")
-            seed = existing.get(counterpart)
-            if seed is None:
-                seed = {
-                    "ApproximateNumberOfMessages": existing.get(name, {}).get(
-                        "ApproximateNumberOfMessages", "0"
-                    ),
-                    "ApproximateNumberOfMessagesNotVisible": existing.get(name, {}).get(
-                        "ApproximateNumberOfMessagesNotVisible", "0"
-                    ),
-                    "ApproximateNumberOfMessagesDelayed": existing.get(name, {}).get(
-                        "ApproximateNumberOfMessagesDelayed", "0"
-                    ),
-                }
-            new_attrs[name] = seed  # type: ignore[assignment]
-        self.queue_attributes = new_attrs
-        return [DashboardState.stream_data, DashboardState.update_queue_attributes]
+        return DashboardState.follow_hub
 
-    @rx.event(background=True)
-    async def update_queue_attributes(self):
-        session = aioboto3.Session(
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name="eu-west-3",
-        )
-        all_queues = self.queue_names + self.dlq_queue_names
-        async with session.client("sqs") as sqs:
-            while True:
-                async with self:
-                    if not self.is_streaming:
-                        break
-                try:
-                    # Start from the previous values to avoid flashing placeholders.
-                    prev_attributes: dict[str, QueueAttributes] = self.queue_attributes or {}
-                    updated_attributes: dict[str, QueueAttributes] = dict(prev_attributes)
-                    for queue_name in all_queues:
-                        try:
-                            q_url_resp = await sqs.get_queue_url(QueueName=queue_name)
-                            q_url = q_url_resp["QueueUrl"]
-                            attrs_resp = await sqs.get_queue_attributes(
-                                QueueUrl=q_url, AttributeNames=["All"]
-                            )
-                            attrs = attrs_resp.get("Attributes", {})
-                            updated_attributes[queue_name] = {
-                                "ApproximateNumberOfMessages": attrs.get(
-                                    "ApproximateNumberOfMessages",
-                                    prev_attributes.get(queue_name, {}).get(
-                                        "ApproximateNumberOfMessages", "0"
-                                    ),
-                                ),
-                                "ApproximateNumberOfMessagesNotVisible": attrs.get(
-                                    "ApproximateNumberOfMessagesNotVisible",
-                                    prev_attributes.get(queue_name, {}).get(
-                                        "ApproximateNumberOfMessagesNotVisible", "0"
-                                    ),
-                                ),
-                                "ApproximateNumberOfMessagesDelayed": attrs.get(
-                                    "ApproximateNumberOfMessagesDelayed",
-                                    prev_attributes.get(queue_name, {}).get(
-                                        "ApproximateNumberOfMessagesDelayed", "0"
-                                    ),
-                                ),
-                            }
-                        except Exception as e:
-                            # Preserve previous values on error to avoid UI flicker.
-                            logger.exception(
-                                f"Could not fetch attributes for {queue_name}: {e}"
-                            )
-                            if queue_name not in updated_attributes:
-                                updated_attributes[queue_name] = prev_attributes.get(
-                                    queue_name,
-                                    {
-                                        "ApproximateNumberOfMessages": "0",
-                                        "ApproximateNumberOfMessagesNotVisible": "0",
-                                        "ApproximateNumberOfMessagesDelayed": "0",
-                                    },
-                                )
-                    async with self:
-                        self.queue_attributes = updated_attributes
-                except Exception as e:
-                    logger.exception("Error in queue attribute update loop: %s", e)
-                await asyncio.sleep(1)
+    def _apply_hub(self, hub: QueueHub, full: bool):
+        """Copy `hub`'s snapshot; `full` also refreshes the slower chart/latency views."""
+        self.queue_attributes = dict(hub.queue_attributes)
+        self.queue_rates = hub.queue_rates()
+        if self.queue_names != hub.queue_names:
+            self.queue_names = list(hub.queue_names)
+        if self.dlq_queue_names != hub.dlq_queue_names:
+            self.dlq_queue_names = list(hub.dlq_queue_names)
+        self._apply_events(hub)
+        self._apply_stats(hub)
+        if self.is_searching:
+            self._refresh_search(hub)
+        if full:
+            self._refresh_chart(hub)
+            self.top_services = [
+                service for service, _ in hub.index.top_values("service", TOP_SERVICES)
+            ]
+            self.latency_rows = hub.latency.summary()
 
     @rx.event(background=True)
-    async def stream_data(self):
-        base_queue = "eggi-llm-inference-jobs"
-        selected_queue = (
-            base_queue.replace("eggi-", "eggi-dev-") if self.use_dev_queues else base_queue
-        )
-        queue_url = f"https://sqs.eu-west-3.amazonaws.com/183295452065/{selected_queue}"
-        session = aioboto3.Session(
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name="eu-west-3",
-        )
-        try:
-            async with session.client("sqs") as sqs:
-                logger.info("Started SQS long-poll loop")
-                while True:
+    async def follow_hub(self):
+        """Mirror the shared hub for the selected environment into this session.
+
+        Polling happens once per environment in the hub; every connected tab only
+        waits for its snapshot version to change, so SQS load does not grow with
+        the number of viewers. The session keeps every environment's hub running
+        and only marks the one it shows as watched.
+        """
+        async with self:
+            client_token = self.router.session.client_token
+            key = f"session:{client_token}:follow_hub"
+            self._events_seq = -1
+            self._events_anchor = -1
+            self.new_events = 0
+        generation = await supervisor.adopt(key, env="all", kind="session")
+        hubs = [get_hub(env) for env in queues.ENVIRONMENTS]
+        switch = _VIEW_SWITCHES[client_token] = asyncio.Event()
+        async with AsyncExitStack() as stack:
+            for hub in hubs:
+                await stack.enter_async_context(hub.subscribe())
+            watched: Optional[QueueHub] = None
+            version = -1
+            chart_refreshed_at = 0.0
+            pushes = 0
+            # Monotonic time the browser was last seen gone, or None while connected.
+            disconnected_at: Optional[float] = None
+            try:
+                while supervisor.is_current(key, generation):
+                    if not _client_connected(client_token):
+                        # Closed tab or dropped socket: stop pushing, and let the hubs
+                        # park their SQS loops if nobody else is watching.
+                        if disconnected_at is None:
+                            disconnected_at = time.monotonic()
+                            for hub in hubs:
+                                hub.pause_subscriber()
+                            if watched is not None:
+                                watched.unwatch()
+                                watched = None
+                        elif time.monotonic() - disconnected_at > SESSION_GRACE:
+                            break
+                        await asyncio.sleep(HUB_WAIT_TIMEOUT)
+                        continue
+                    if disconnected_at is not None:
+                        disconnected_at = None
+                        for hub in hubs:
+                            hub.resume_subscriber()
+                    switch.clear()
                     async with self:
                         if not self.is_streaming:
                             break
-                    try:
-                        resp = await sqs.receive_message(
-                            QueueUrl=queue_url,
-                            MaxNumberOfMessages=10,
-                            WaitTimeSeconds=20,
-                            MessageAttributeNames=["All"],
-                        )
-                        messages = resp.get("Messages", [])
-                        if not messages:
-                            continue
-                        delete_entries = []
-                        new_events_batch = []
-                        for m in messages:
-                            receipt_handle = m.get("ReceiptHandle")
-                            if not receipt_handle:
-                                continue
-                            new_event = self._create_event_from_sqs(m.get("Body", "{}"))
-                            if new_event is None:
-                                continue
-                            new_events_batch.append(new_event)
-                            delete_entries.append(
-                                {"Id": m["MessageId"], "ReceiptHandle": receipt_handle}
-                            )
-                        if new_events_batch:
-                            async with self:
-                                self.events = new_events_batch + self.events
-                                if len(self.events) > self.MAX_EVENT_LOGS:
-                                    self.events = self.events[: self.MAX_EVENT_LOGS]
-                                self.stats["total"] += len(new_events_batch)
-                                for event in new_events_batch:
-                                    st = event["status"]
-                                    if st == "OK":
-                                        self.stats["ok"] += 1
-                                    elif st == "WARN":
-                                        self.stats["warn"] += 1
-                                    else:
-                                        self.stats["error"] += 1
-                        if delete_entries:
-                            await sqs.delete_message_batch(
-                                QueueUrl=queue_url, Entries=delete_entries
-                            )
-                    except asyncio.CancelledError as e:
-                        logger.exception("stream_data cancelled; exiting: %s", e)
-                        break
-                    except Exception as e:
-                        logger.exception("SQS loop error: %s", e)
-                        await asyncio.sleep(5.0)
-        finally:
-            logger.info("SQS loop terminated")
-            async with self:
-                self.is_streaming = False
\ No newline at end of file
+                        env = self.environment
+                        hub = get_hub(env)
+                        if hub is not watched:
+                            # Toggled (or reconnected): the switch handler already
+                            # copied this hub; from here on keep it fresh.
+                            if watched is not None:
+                                watched.unwatch()
+                            hub.watch()
+                            watched = hub
+                            version = -1
+                        if hub.version != version:
+                            version = hub.version
+                            full = time.monotonic() - chart_refreshed_at >= CHART_REFRESH_INTERVAL
+                            if full:
+                                chart_refreshed_at = time.monotonic()
+                            self._apply_hub(hub, full)
+                            STATE_PUSHES.inc(env)
+                            pushes += 1
+                            if pushes % PUSH_SIZE_SAMPLE_EVERY == 1:
+                                STATE_PUSH_BYTES.observe(self._push_size(), env)
+                    await _wait_for_update_or_switch(hub, version, switch)
+            finally:
+                if watched is not None:
+                    watched.unwatch()
+                if disconnected_at is not None:
+                    for hub in hubs:
+                        hub.resume_subscriber()
+                if _VIEW_SWITCHES.get(client_token) is switch:
+                    del _VIEW_SWITCHES[client_token]
+
+
+async def _wait_for_update_or_switch(hub: QueueHub, version: int, switch: asyncio.Event):
+    update = asyncio.ensure_future(hub.wait_for_update(version, timeout=HUB_WAIT_TIMEOUT))
+    switched = asyncio.ensure_future(switch.wait())
+    try:
+        await asyncio.wait((update, switched), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in (update, switched):
+            waiter.cancel()
+
+
+_APP: Optional[rx.App] = None
+
+
+def _client_connected(client_token: str) -> bool:
+    """Whether the browser behind `client_token` currently has a live websocket."""
+    global _APP
+    if _APP is None:
+        # Resolved once: every get_and_validate_app() call prepends the cwd to
+        # sys.path again, and this runs on each push of every session.
+        _APP = prerequisites.get_and_validate_app().app
+    namespace = _APP.event_namespace
+    return namespace is None or client_token in namespace.token_to_sid
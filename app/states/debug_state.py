@@ -0,0 +1,29 @@
+import reflex as rx
+
+from app.services.hub import get_hub
+from app.services.queues import ENVIRONMENTS
+from app.services.supervisor import supervisor
+
+
+class DebugState(rx.State):
+    pollers: list[dict[str, str]] = []
+    hubs: list[dict[str, str]] = []
+
+    @rx.var
+    def poller_count(self) -> int:
+        return sum(1 for p in self.pollers if p.get("kind") != "session")
+
+    @rx.event
+    def refresh(self):
+        self.pollers = supervisor.snapshot()
+        self.hubs = [
+            {
+                "env": env,
+                "subscribers": str(get_hub(env).subscribers),
+                "viewers": str(get_hub(env).viewers),
+                "role": get_hub(env).role,
+                "version": str(get_hub(env).version),
+                **get_hub(env).backpressure.as_dict(),
+            }
+            for env in ENVIRONMENTS
+        ]
@@ -0,0 +1,172 @@
+import reflex as rx
+import asyncio
+import logging
+
+from app.services import dlq, queues
+from app.services.sqs_client import get_sqs_pool
+from app.services.supervisor import supervisor
+
+logger = logging.getLogger(__name__)
+
+# How often a running redrive's counters are pushed to the page.
+REDRIVE_PROGRESS_INTERVAL = 0.5
+
+
+class DLQState(rx.State):
+    dlq_name: str = ""
+    # One row per error signature in the last sample, see services.dlq.
+    groups: list[dict[str, str]] = []
+    sampled: int = 0
+    is_sampling: bool = False
+    # Group keys ticked for redrive.
+    selected: list[str] = []
+    redrive: dict[str, str] = {}
+    # "Redrive all" waits for a confirmation showing the DLQ's approximate depth.
+    confirming_all: bool = False
+    confirm_count: str = ""
+    error: str = ""
+
+    @rx.var
+    def dlq_options(self) -> list[str]:
+        return [name for env in queues.ENVIRONMENTS for name in queues.dlq_queue_names(env)]
+
+    @rx.var
+    def redrive_target(self) -> str:
+        return queues.TOPOLOGY.dlq_source(self.dlq_name) or "" if self.dlq_name else ""
+
+    @rx.var
+    def is_redriving(self) -> bool:
+        return self.redrive.get("state") == "running"
+
+    @rx.event
+    def load(self):
+        if not self.dlq_name and self.dlq_options:
+            self.dlq_name = self.dlq_options[0]
+
+    @rx.event
+    def set_dlq_name(self, value: str):
+        self.dlq_name = value
+        self.groups = []
+        self.selected = []
+        self.sampled = 0
+        self.confirming_all = False
+        self.error = ""
+
+    @rx.event
+    def toggle_group(self, key: str):
+        if key in self.selected:
+            self.selected = [k for k in self.selected if k != key]
+        else:
+            self.selected = self.selected + [key]
+
+    @rx.event(background=True)
+    async def sample_messages(self):
+        async with self:
+            if self.is_sampling or not self.dlq_name:
+                return
+            self.is_sampling = True
+            self.error = ""
+            dlq_name = self.dlq_name
+        try:
+            sqs = await get_sqs_pool().get()
+            url = (await sqs.get_queue_url(QueueName=dlq_name))["QueueUrl"]
+            groups = await dlq.sample(sqs, url)
+        except Exception as e:
+            logger.exception("Sampling %s failed: %s", dlq_name, e)
+            async with self:
+                self.error = f"Sampling failed: {e}"
+                self.is_sampling = False
+            return
+        async with self:
+            if self.dlq_name == dlq_name:
+                self.groups = [group.as_row() for group in groups]
+                self.sampled = sum(group.count for group in groups)
+                # Keep ticks only for groups that are still present.
+                keys = {group.signature.key for group in groups}
+                self.selected = [key for key in self.selected if key in keys]
+            self.is_sampling = False
+
+    @rx.event(background=True)
+    async def redrive_selected(self):
+        async with self:
+            keys = frozenset(self.selected)
+        if keys:
+            await self._redrive(keys)
+
+    @rx.event(background=True)
+    async def ask_redrive_all(self):
+        async with self:
+            if self.is_redriving or not self.redrive_target:
+                return
+            self.confirming_all = True
+            self.confirm_count = "…"
+            dlq_name = self.dlq_name
+        try:
+            sqs = await get_sqs_pool().get()
+            url = (await sqs.get_queue_url(QueueName=dlq_name))["QueueUrl"]
+            resp = await sqs.get_queue_attributes(
+                QueueUrl=url, AttributeNames=["ApproximateNumberOfMessages"]
+            )
+            count = resp["Attributes"]["ApproximateNumberOfMessages"]
+        except Exception as e:
+            logger.exception("Reading the depth of %s failed: %s", dlq_name, e)
+            count = "an unknown number of"
+        async with self:
+            if self.confirming_all and self.dlq_name == dlq_name:
+                self.confirm_count = count
+
+    @rx.event
+    def cancel_redrive_all(self):
+        self.confirming_all = False
+
+    @rx.event(background=True)
+    async def redrive_all(self):
+        async with self:
+            confirmed, self.confirming_all = self.confirming_all, False
+        if confirmed:
+            await self._redrive(frozenset())
+
+    async def _redrive(self, keys: frozenset[str]):
+        async with self:
+            if self.is_redriving or not self.redrive_target:
+                return
+            # Runs on other backend workers are kept out by the job's lease
+            # (RedriveJob.run_exclusive).
+            if supervisor.running(_redrive_key(self.dlq_name)):
+                # Started from another session; a second run would supersede it.
+                self.error = f"A redrive of {self.dlq_name} is already running."
+                return
+            self.error = ""
+            job = dlq.RedriveJob(self.dlq_name, self.redrive_target, keys=keys)
+            self.redrive = job.as_dict()
+        key = _redrive_key(job.dlq_name)
+        env = queues.TOPOLOGY.environment_of(job.dlq_name) or ""
+        generation = 0
+        try:
+            sqs = await get_sqs_pool().get()
+            generation = await supervisor.start(
+                key, lambda generation: job.run_exclusive(sqs), env=env, kind="redrive"
+            )
+        except Exception as e:
+            job.state, job.error = "failed", str(e)
+        while True:
+            if job.state == "pending" and not supervisor.is_current(key, generation):
+                # Cancelled before the task got to run.
+                job.state = "cancelled"
+            async with self:
+                self.redrive = job.as_dict()
+            if job.state not in ("pending", "running"):
+                break
+            await asyncio.sleep(REDRIVE_PROGRESS_INTERVAL)
+        logger.info("Redrive finished: %s", job.as_dict())
+
+    @rx.event(background=True)
+    async def cancel_redrive(self):
+        async with self:
+            dlq_name = self.redrive.get("dlq", "")
+        if dlq_name:
+            await supervisor.cancel(_redrive_key(dlq_name))
+
+
+def _redrive_key(dlq_name: str) -> str:
+    return f"dlq:redrive:{dlq_name}"
@@ -0,0 +1,150 @@
+"""Micro-benchmark: batch decoder vs. the original per-message parser.
+
+    python -m benchmarks.bench_decoding [--batches N] [--min-speedup X]
+
+The original 5x target is not met. JSON parsing is not where the time
+goes: the msgspec batch parse is ~1.5-1.8 us of ~9-10 us per message in
+decode_messages here (parse_us_per_msg vs batch_us_per_msg). The rest is
+Python work per event: classifying it, rendering its message, and
+building the event dict, EventFields and EventRecord. 5x would need all
+of it in under ~4.5 us. Measured 2.0-2.5x on a single-CPU VM;
+MIN_SPEEDUP guards against regressions, not the target.
+"""
+
+from datetime import datetime, timezone
+from typing import Callable, Optional
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+
+from app.services.events import decode_messages, msgspec
+
+if msgspec is not None:
+    from app.services.events import _batch_decoder
+
+# What the batch decoder is held to; see the module docstring for why not 5x.
+MIN_SPEEDUP = 1.8
+
+EVENT_SOURCES = [
+    "eggi:profile-analysis:preparation-requested",
+    "eggi:mapping-service:profiles-to-analyse",
+    "eggi:mapping-job:completed",
+    "eggi:llm-inference:events",
+]
+
+
+def legacy_create_event_from_sqs(message_body: str) -> Optional[dict]:
+    """The parser as it shipped before the batch decoder, kept as the baseline."""
+    try:
+        body_json = json.loads(message_body)
+        event_source = body_json.get("event_source", "unknown-service")
+        payload = body_json.get("payload", {})
+        linkedin_id = payload.get("linkedin_identifier", "N/A")
+        message = ""
+        if "preparation-requested" in event_source:
+            source = payload.get("metadata", {}).get("source", "N/A")
+            message = f"Prep requested for {linkedin_id} via {source}"
+        elif "completed" in event_source:
+            job_id = payload.get("job_id", "N/A")
+            message = f"Analysis complete for {linkedin_id} (Job: {job_id})"
+        elif "events" in event_source:
+            job_id = payload.get("job_id", "N/A")
+            original_input = payload.get("original_input", "N/A")
+            message = f"Event for {original_input} (Job: {job_id})"
+        else:
+            message = f"Received event from {event_source}"
+        timestamp_str = body_json.get("timestamp", datetime.utcnow().isoformat() + "Z")
+        dt_object = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+        return {
+            "timestamp": dt_object.strftime("%H:%M:%S"),
+            "service": event_source,
+            "status": "OK",
+            "message": message,
+            "avatar": "/icon_gray_simple.png",
+        }
+    except (json.JSONDecodeError, KeyError):
+        return None
+
+
+def make_message(i: int, rng: random.Random) -> dict:
+    ts = datetime.fromtimestamp(1_760_000_000 + i * 0.37, timezone.utc)
+    body = {
+        "event_source": rng.choice(EVENT_SOURCES),
+        "timestamp": ts.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "payload": {
+            "job_id": f"{rng.getrandbits(64):016x}",
+            "linkedin_identifier": f"person-{rng.randrange(100_000)}",
+            "original_input": f"https://www.linkedin.com/in/person-{rng.randrange(100_000)}/",
+            "metadata": {"source": rng.choice(["chrome-extension", "api", "batch"])},
+            "profile": {"headline": "Engineer " * 8, "skills": ["python", "aws", "sqs"] * 5},
+        },
+    }
+    return {
+        "MessageId": str(i),
+        "ReceiptHandle": f"rh-{i}",
+        "Body": json.dumps(body),
+        "Attributes": {"SentTimestamp": str(int(ts.timestamp() * 1000))},
+    }
+
+
+def best_rate(count: int, repeat: int, fn: Callable[[], object]) -> float:
+    """Messages per second of the fastest of `repeat` runs (the least disturbed one)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def run(batches: int, repeat: int) -> dict[str, float]:
+    rng = random.Random(7)
+    responses = [[make_message(b * 10 + i, rng) for i in range(10)] for b in range(batches)]
+    count = batches * 10
+
+    legacy = best_rate(
+        count,
+        repeat,
+        lambda: [legacy_create_event_from_sqs(m["Body"]) for ms in responses for m in ms],
+    )
+    batch = best_rate(count, repeat, lambda: [decode_messages(ms, "bench") for ms in responses])
+    result = {
+        "legacy_msgs_per_sec": legacy,
+        "batch_msgs_per_sec": batch,
+        "speedup": batch / legacy,
+        "legacy_us_per_msg": 1e6 / legacy,
+        "batch_us_per_msg": 1e6 / batch,
+    }
+    if msgspec is not None:
+        # The JSON parse alone: everything else in batch_us_per_msg is the
+        # Python work of turning decoded bodies into events and records.
+        joined = ["[" + ",".join(m["Body"] for m in ms) + "]" for ms in responses]
+        parse = best_rate(count, repeat, lambda: [_batch_decoder.decode(j) for j in joined])
+        result["parse_us_per_msg"] = 1e6 / parse
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batches", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the best counts")
+    parser.add_argument(
+        "--min-speedup",
+        type=float,
+        default=MIN_SPEEDUP,
+        help="exit non-zero below this speedup over the legacy parser",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    result = run(args.batches, args.repeat)
+    print(json.dumps(result, indent=2))
+    if result["speedup"] < args.min_speedup:
+        print(f"Speedup {result['speedup']:.2f}x is below {args.min_speedup}x", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Micro-benchmark: EventIndex.search over a full index.
+
+    python -m benchmarks.bench_search [--events N] [--max-ms X]
+
+Indexes `--events` synthetic records shaped like the pipeline's and times
+each query in QUERIES, the slowest of which must stay under --max-ms.
+Several queries match nothing although every term is common on its own;
+those are the ones that have to walk the postings rather than stop at the
+first `limit` hits.
+"""
+
+from typing import Callable
+import argparse
+import json
+import random
+import sys
+import time
+
+from app.services.events import EventFields, EventRecord
+from app.services.search import EventIndex, parse_query
+from benchmarks.bench_decoding import EVENT_SOURCES
+
+# Search results shown by the dashboard.
+LIMIT = 50
+# The target for one query against a full index.
+MAX_MS = 10.0
+# Sources each stage sees, so some filter pairs never co-occur.
+STAGE_SOURCES = [
+    ("web", "api"),
+    ("api", "batch"),
+    ("batch", "chrome-extension"),
+    ("chrome-extension", "batch"),
+]
+QUERIES = [
+    # Common terms, plenty of hits.
+    "eggi",
+    "mapping job",
+    "service:eggi:mapping-job:completed",
+    # Every term is common, no event has all of them.
+    "events api",
+    "eggi completed web",
+    "service:eggi:mapping-job:completed source:web",
+    "service:eggi:llm-inference:events source:batch preparation",
+    # Rare terms.
+    "person-4242",
+    "job:0000000000000000",
+]
+
+
+def make_record(i: int, rng: random.Random) -> EventRecord:
+    stage = rng.randrange(len(EVENT_SOURCES))
+    service = EVENT_SOURCES[stage]
+    source = rng.choice(STAGE_SOURCES[stage])
+    person = f"person-{rng.randrange(100_000)}"
+    event = {
+        "timestamp": "12:00:00",
+        "service": service,
+        "status": "OK",
+        "message": f"Event {i}",
+        "avatar": "",
+    }
+    fields = EventFields(
+        person, f"{rng.getrandbits(64):016x}", f"https://www.linkedin.com/in/{person}/", source
+    )
+    return EventRecord(1_760_000_000 + i, "bench", event, fields)  # type: ignore[arg-type]
+
+
+def best_ms(repeat: int, fn: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(events: int, repeat: int) -> dict[str, float]:
+    rng = random.Random(7)
+    index = EventIndex()
+    for seq in range(events):
+        index.add(seq, make_record(seq, rng))
+    result = {}
+    for query in QUERIES:
+        terms, filters = parse_query(query)
+        result[query] = best_ms(repeat, lambda: index.search(terms, filters, LIMIT))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query; the best counts")
+    parser.add_argument(
+        "--max-ms", type=float, default=MAX_MS, help="exit non-zero if a query is slower"
+    )
+    args = parser.parse_args()
+    result = run(args.events, args.repeat)
+    print(json.dumps({query: round(ms, 3) for query, ms in result.items()}, indent=2))
+    slowest = max(result, key=result.__getitem__)
+    if result[slowest] > args.max_ms:
+        print(f"{slowest!r} took {result[slowest]:.1f} ms (> {args.max_ms} ms)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""In-process stand-in for an aioboto3 SQS client, for benchmarks and soak runs.
+
+Messages arrive on every queue at a steady `rate` per second and behave
+like SQS messages: a receive hides them for the visibility timeout and bumps
+their receive count, `change_message_visibility_batch` and
+`delete_message_batch` act on the latest receipt handle only, and a message
+received more than `max_receive_count` times moves to the queue's
+dead-letter queue (`redrive`). Pipeline queues also have a simulated
+consumer that deletes every message once it has been visible for
+`consumer_lag` seconds; messages a dashboard holds invisible wait for it.
+Tap queues (`tap_suffix`) and dead-letter queues have no consumer.
+
+Reported depths drift on their own clock, independently of the traffic,
+so attribute staleness can be measured. Every call sleeps `latency`
+(+/- `jitter`) seconds.
+
+    pool = get_sqs_pool()
+    pool.session_factory = lambda: FakeSession(FakeSQSClient(rate=50))
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import time
+
+from botocore.exceptions import ClientError
+
+from benchmarks.bench_decoding import EVENT_SOURCES
+
+ENDPOINT = "https://sqs.local.invalid/000000000000"
+
+
+class _Message:
+    __slots__ = ("id", "sent_at", "body", "receives", "visible_at", "receipt")
+
+    def __init__(self, message_id: str, sent_at: float, body: str, visible_at: float):
+        self.id = message_id
+        self.sent_at = sent_at  # wall-clock
+        self.body = body
+        self.receives = 0
+        self.visible_at = visible_at  # monotonic
+        self.receipt = ""
+
+
+class _Queue:
+    __slots__ = (
+        "name",
+        "produces",
+        "consumed",
+        "dead_letter",
+        "started",
+        "started_wall",
+        "produced",
+        "fresh",
+        "held",
+        "heap",
+        "depth",
+        "in_flight",
+        "changed_at",
+        "next_change",
+    )
+
+    def __init__(self, name: str, now: float):
+        self.name = name
+        self.produces = True
+        self.consumed = True
+        self.dead_letter: Optional[str] = None
+        self.started = now
+        self.started_wall = time.time()
+        # Messages [fresh, produced) have arrived and were never received; they
+        # exist only as indices until a receive hands them out.
+        self.produced = 0
+        self.fresh = 0
+        # Received, sent or dead-lettered messages, by MessageId.
+        self.held: dict[str, _Message] = {}
+        # (visible_at, MessageId) of held messages; stale entries are skipped.
+        self.heap: list[tuple[float, str]] = []
+        self.depth = 0
+        self.in_flight = 0
+        self.changed_at = now
+        self.next_change = now
+
+
+class FakeSQSClient:
+    def __init__(
+        self,
+        rate: float = 20.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        depth_change_interval: float = 5.0,
+        body_bytes: int = 600,
+        seed: Optional[int] = None,
+        visibility_timeout: int = 30,
+        consumer_lag: Optional[float] = 1.0,
+        max_receive_count: int = 5,
+        redrive: Optional[dict[str, str]] = None,
+        tap_suffix: str = "-dashboard-tap",
+        delete_failure_rate: float = 0.0,
+        send_failure_rate: float = 0.0,
+        missing_queues: tuple[str, ...] = (),
+    ):
+        self.rate = rate
+        self.latency = latency
+        self.jitter = jitter
+        self.depth_change_interval = depth_change_interval
+        self.visibility_timeout = visibility_timeout
+        self.consumer_lag = consumer_lag
+        self.max_receive_count = max_receive_count
+        self.redrive = redrive or {}
+        self.tap_suffix = tap_suffix
+        self.delete_failure_rate = delete_failure_rate
+        # Rejected sends fail as a FIFO queue rejects a message without a
+        # MessageGroupId: a sender fault, on every retry.
+        self.send_failure_rate = send_failure_rate
+        # Names get_queue_url reports as nonexistent, e.g. tap queues not set up.
+        self.missing_queues = set(missing_queues)
+        self.calls: dict[str, int] = {}
+        # Message-level counters, for reports.
+        self.stats: dict[str, int] = dict.fromkeys(
+            (
+                "received",
+                "redelivered",
+                "deleted",
+                "consumed",
+                "consumer_delayed",
+                "dead_lettered",
+                "sent",
+            ),
+            0,
+        )
+        self._queues: dict[str, _Queue] = {}
+        self._rng = random.Random(seed)
+        self._sent_ids = itertools.count()
+        self._padding = "x" * max(body_bytes - 300, 0)
+
+    async def __aenter__(self) -> "FakeSQSClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        pass
+
+    async def _call(self, operation: str) -> None:
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(max(delay, 0.0))
+
+    def _queue(self, queue_url: str) -> _Queue:
+        name = queue_url.rsplit("/", 1)[-1]
+        queue = self._queues.get(name)
+        if queue is None:
+            queue = self._queues[name] = _Queue(name, time.monotonic())
+            is_dlq = name in self.redrive.values()
+            queue.produces = not is_dlq
+            queue.consumed = not is_dlq and not name.endswith(self.tap_suffix)
+            queue.dead_letter = self.redrive.get(name)
+        return queue
+
+    def depth(self, queue_name: str) -> tuple[int, float]:
+        """Current simulated depth of `queue_name` and the monotonic time it last changed."""
+        queue = self._queue(queue_name)
+        now = time.monotonic()
+        if now >= queue.next_change:
+            queue.depth = max(0, queue.depth + self._rng.randint(-20, 25))
+            queue.in_flight = self._rng.randint(0, 10)
+            queue.changed_at = now
+            queue.next_change = now + self._rng.expovariate(1 / self.depth_change_interval)
+        return queue.depth, queue.changed_at
+
+    def _advance(self, queue: _Queue, now: float) -> None:
+        if queue.produces and self.rate > 0:
+            queue.produced = max(queue.produced, int((now - queue.started) * self.rate))
+        if not queue.consumed or self.consumer_lag is None:
+            return
+        cutoff = now - self.consumer_lag
+        if self.rate > 0:
+            due = min(int((cutoff - queue.started) * self.rate), queue.produced)
+            if due > queue.fresh:
+                self.stats["consumed"] += due - queue.fresh
+                queue.fresh = due
+        while queue.heap and queue.heap[0][0] <= cutoff:
+            visible_at, message_id = heapq.heappop(queue.heap)
+            message = queue.held.get(message_id)
+            if message is not None and message.visible_at == visible_at:
+                del queue.held[message_id]
+                self.stats["consumed"] += 1
+                if message.receives:
+                    # It was hidden by a receive when the consumer first came for it.
+                    self.stats["consumer_delayed"] += 1
+
+    def _next_due(self, queue: _Queue) -> float:
+        """Monotonic time something may next become receivable on `queue`."""
+        due = float("inf")
+        if queue.produces and self.rate > 0:
+            due = queue.started + (queue.produced + 1) / self.rate
+        if queue.heap:
+            due = min(due, queue.heap[0][0])
+        return due
+
+    def _take(self, queue: _Queue, limit: int, now: float, timeout: float) -> list[dict]:
+        taken: list[_Message] = []
+        while len(taken) < limit and queue.heap and queue.heap[0][0] <= now:
+            visible_at, message_id = heapq.heappop(queue.heap)
+            message = queue.held.get(message_id)
+            if message is not None and message.visible_at == visible_at:
+                taken.append(message)
+        while len(taken) < limit and queue.fresh < queue.produced:
+            message = self._message(queue, queue.fresh)
+            queue.fresh += 1
+            queue.held[message.id] = message
+            taken.append(message)
+        received = []
+        for message in taken:
+            if queue.dead_letter is not None and message.receives >= self.max_receive_count:
+                del queue.held[message.id]
+                self._dead_letter(message, queue.dead_letter, now)
+                continue
+            message.receives += 1
+            message.visible_at = now + timeout
+            message.receipt = f"{message.id}/{message.receives}"
+            heapq.heappush(queue.heap, (message.visible_at, message.id))
+            self.stats["received"] += 1
+            if message.receives > 1:
+                self.stats["redelivered"] += 1
+            received.append(
+                {
+                    "MessageId": message.id,
+                    "ReceiptHandle": message.receipt,
+                    "Body": message.body,
+                    "Attributes": {
+                        "SentTimestamp": str(int(message.sent_at * 1000)),
+                        "ApproximateReceiveCount": str(message.receives),
+                    },
+                }
+            )
+        return received
+
+    def _dead_letter(self, message: _Message, dlq_name: str, now: float) -> None:
+        dlq = self._queue(dlq_name)
+        message.receives = 0
+        message.visible_at = now
+        dlq.held[message.id] = message
+        heapq.heappush(dlq.heap, (now, message.id))
+        self.stats["dead_lettered"] += 1
+
+    def _message(self, queue: _Queue, index: int) -> _Message:
+        sent_at = queue.started_wall + index / self.rate
+        body = {
+            "event_source": self._rng.choice(EVENT_SOURCES),
+            "timestamp": datetime.fromtimestamp(sent_at, timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "payload": {
+                "job_id": f"job-{index // 4}",
+                "linkedin_identifier": f"person-{index // 4}",
+                "original_input": f"https://www.linkedin.com/in/person-{index // 4}/",
+                "metadata": {"source": "soak"},
+                "padding": self._padding,
+            },
+        }
+        message_id = f"{queue.name}-{index}"
+        return _Message(message_id, sent_at, json.dumps(body), queue.started + index / self.rate)
+
+    def _held(self, queue: _Queue, receipt_handle: str) -> Optional[_Message]:
+        """The message `receipt_handle` was issued for, if it is still the latest handle."""
+        message = queue.held.get(receipt_handle.rsplit("/", 1)[0])
+        if message is None or message.receipt != receipt_handle:
+            return None
+        return message
+
+    async def get_queue_url(self, QueueName: str) -> dict:
+        await self._call("get_queue_url")
+        if QueueName in self.missing_queues:
+            raise ClientError(
+                {"Error": {"Code": "AWS.SimpleQueueService.NonExistentQueue"}}, "GetQueueUrl"
+            )
+        return {"QueueUrl": f"{ENDPOINT}/{QueueName}"}
+
+    async def list_queues(self, QueueNamePrefix: str = "", **kwargs: Any) -> dict:
+        await self._call("list_queues")
+        return {"QueueUrls": []}
+
+    async def get_queue_attributes(self, QueueUrl: str, AttributeNames: list[str]) -> dict:
+        await self._call("get_queue_attributes")
+        depth, _ = self.depth(QueueUrl)
+        queue = self._queue(QueueUrl)
+        return {
+            "Attributes": {
+                "ApproximateNumberOfMessages": str(depth),
+                "ApproximateNumberOfMessagesNotVisible": str(queue.in_flight),
+                "ApproximateNumberOfMessagesDelayed": "0",
+            }
+        }
+
+    async def receive_message(
+        self,
+        QueueUrl: str,
+        MaxNumberOfMessages: int = 1,
+        WaitTimeSeconds: int = 0,
+        VisibilityTimeout: Optional[int] = None,
+        **kwargs: Any,
+    ) -> dict:
+        await self._call("receive_message")
+        queue = self._queue(QueueUrl)
+        timeout = self.visibility_timeout if VisibilityTimeout is None else VisibilityTimeout
+        deadline = time.monotonic() + WaitTimeSeconds
+        while True:
+            now = time.monotonic()
+            self._advance(queue, now)
+            messages = self._take(queue, MaxNumberOfMessages, now, timeout)
+            if messages or now >= deadline:
+                return {"Messages": messages} if messages else {}
+            # Long poll: sleep until something is due (or the wait ends).
+            await asyncio.sleep(max(min(self._next_due(queue), deadline) - now, 0.001))
+
+    async def delete_message_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        await self._call("delete_message_batch")
+        queue = self._queue(QueueUrl)
+        successful, failed = [], []
+        for entry in Entries:
+            if self._rng.random() < self.delete_failure_rate:
+                failed.append(
+                    {"Id": entry["Id"], "Code": "InternalError", "SenderFault": False}
+                )
+                continue
+            # As in SQS, a stale handle "succeeds" without deleting anything.
+            message = self._held(queue, entry["ReceiptHandle"])
+            if message is not None:
+                del queue.held[message.id]
+                self.stats["deleted"] += 1
+            successful.append({"Id": entry["Id"]})
+        return {"Successful": successful, "Failed": failed}
+
+    async def change_message_visibility_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        await self._call("change_message_visibility_batch")
+        queue = self._queue(QueueUrl)
+        now = time.monotonic()
+        successful, failed = [], []
+        for entry in Entries:
+            message = self._held(queue, entry["ReceiptHandle"])
+            if message is None:
+                failed.append(
+                    {"Id": entry["Id"], "Code": "ReceiptHandleIsInvalid", "SenderFault": True}
+                )
+            elif message.visible_at <= now:
+                failed.append({"Id": entry["Id"], "Code": "MessageNotInflight", "SenderFault": True})
+            else:
+                message.visible_at = now + entry["VisibilityTimeout"]
+                heapq.heappush(queue.heap, (message.visible_at, message.id))
+                successful.append({"Id": entry["Id"]})
+        return {"Successful": successful, "Failed": failed}
+
+    async def send_message_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        await self._call("send_message_batch")
+        queue = self._queue(QueueUrl)
+        now = time.monotonic()
+        successful, failed = [], []
+        for entry in Entries:
+            if self._rng.random() < self.send_failure_rate:
+                failed.append({"Id": entry["Id"], "Code": "MissingParameter", "SenderFault": True})
+                continue
+            message = _Message(
+                f"{queue.name}-sent-{next(self._sent_ids)}",
+                time.time(),
+                entry["MessageBody"],
+                now + entry.get("DelaySeconds", 0),
+            )
+            queue.held[message.id] = message
+            heapq.heappush(queue.heap, (message.visible_at, message.id))
+            self.stats["sent"] += 1
+            successful.append({"Id": entry["Id"], "MessageId": message.id})
+        return {"Successful": successful, "Failed": failed}
+
+
+class FakeSession:
+    """Stands in for aioboto3.Session: `client("sqs", ...)` returns the shared fake."""
+
+    def __init__(self, client: FakeSQSClient):
+        self._client = client
+
+    def client(self, service_name: str, **kwargs: Any) -> FakeSQSClient:
+        return self._client
@@ -0,0 +1,69 @@
+"""Replay a recording through the hub headless and report ingest throughput.
+
+Recordings come from a dashboard (or soak run) started with EGGI_RECORD_DIR.
+The replay goes through the same path as live traffic: decode, merge, stats,
+search index and depth samples.
+
+    python -m benchmarks.replay recordings/prod-20261016-101500.jsonl.gz --speed max
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+# Replays must not write into (or backfill from) the real event archive.
+os.environ.setdefault("EGGI_ARCHIVE_PATH", "")
+os.environ.setdefault("EGGI_COORDINATION", "local")
+
+from app.services.hub import get_hub  # noqa: E402
+from app.services.recording import Recording, parse_speed, set_replay  # noqa: E402
+from app.services.supervisor import supervisor  # noqa: E402
+
+# The hub has caught up once its total stops moving for this long.
+SETTLE = 0.5
+
+
+async def replay(recording: Recording) -> dict:
+    set_replay(recording)
+    hub = get_hub(recording.env)
+    started = time.monotonic()
+    async with hub.subscribe():
+        # The replay task is started together with the leadership.
+        while hub.role != "leader":
+            await asyncio.sleep(0.01)
+        while supervisor.running(hub.poll_prefix + "replay"):
+            await asyncio.sleep(0.05)
+        total = -1
+        while total != hub.service_stats.total:
+            total = hub.service_stats.total
+            await asyncio.sleep(SETTLE)
+        elapsed = time.monotonic() - started - SETTLE
+    return {
+        "recording": recording.path,
+        "env": recording.env,
+        "speed": recording.speed or "max",
+        "elapsed_s": round(elapsed, 2),
+        "msgs": total,
+        "msgs_per_sec": round(total / max(elapsed, 1e-9), 1),
+        "stats": hub.service_stats.counts("1h", time.time()),
+        "events_dropped": hub.backpressure.dropped,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("recording")
+    parser.add_argument("--speed", default="max", help='"1", "10", ... or "max"')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    recording = Recording(args.recording, parse_speed(args.speed))
+    print(json.dumps(asyncio.run(replay(recording)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
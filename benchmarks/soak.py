@@ -0,0 +1,260 @@
+"""Soak / throughput run of the hub against the in-process SQS fake.
+
+Drives the real ingest path (streaming workers -> merge -> hub) and attribute
+loop through SQSClientPool.session_factory, with simulated sessions that size
+every push the way DashboardState._push_size does, and writes a JSON report.
+RSS climbs until the hub's ring buffer is full (see retained_events in the
+timeline); judge rss_slope_mb_per_hour on runs long enough to pass that point.
+
+    python -m benchmarks.soak --duration 7200 --rate 50 --latency 0.02 \\
+        --sessions 5 --output soak.json [--baseline previous.json]
+
+Streams use the configured mode; run with EGGI_STREAM_MODE=peek to measure
+what peeking costs the pipeline (redeliveries, dead-lettered messages and
+consumer delays under "sqs_messages").
+
+With --baseline the run exits non-zero when a headline metric regressed by
+more than --tolerance.
+"""
+
+from typing import Any, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import time
+
+# Soak runs must not write into (or backfill from) the real event archive.
+os.environ.setdefault("EGGI_ARCHIVE_PATH", "")
+os.environ.setdefault("EGGI_COORDINATION", "local")
+
+from app.services import queues  # noqa: E402
+from app.services.hub import QueueHub, get_hub  # noqa: E402
+from app.services.sqs_client import get_sqs_pool, sqs_lifespan  # noqa: E402
+from app.services.streaming import DEFAULT_STREAM_MODE  # noqa: E402
+from benchmarks.fake_sqs import FakeSession, FakeSQSClient  # noqa: E402
+
+# Rows a session keeps mounted, as DashboardState.DEFAULT_EVENT_WINDOW.
+SESSION_WINDOW = 40
+STALENESS_TICK = 0.1
+# Headline metrics compared against --baseline: name -> whether higher is better.
+HEADLINE = {
+    "msgs_per_sec": True,
+    "attribute_staleness_p95": False,
+    "push_bytes_per_sec": False,
+    "rss_slope_mb_per_hour": False,
+}
+
+
+class SimulatedSession:
+    """Follows the hub like DashboardState.follow_hub and counts what it would push."""
+
+    def __init__(self, hub: QueueHub):
+        self.hub = hub
+        self.pushes = 0
+        self.bytes = 0
+
+    async def run(self, stop: asyncio.Event) -> None:
+        version = -1
+        self.hub.watch()
+        try:
+            while not stop.is_set():
+                version = await self.hub.wait_for_update(version, timeout=1.0)
+                now = time.time()
+                pushed = {
+                    "events": [r.event for r in self.hub.events.newest(SESSION_WINDOW)],
+                    "queue_attributes": self.hub.queue_attributes,
+                    "queue_rates": self.hub.queue_rates(),
+                    "stats": self.hub.service_stats.counts("5m", now),
+                    "service_rows": self.hub.service_stats.top("5m", now, 8),
+                    "search_results": [],
+                }
+                self.bytes += len(json.dumps(pushed, separators=(",", ":")))
+                self.pushes += 1
+        finally:
+            self.hub.unwatch()
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:  # not Linux: peak RSS is the best available
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def slope_per_hour(points: list[tuple[float, float]]) -> float:
+    """Least-squares slope of (seconds, value) points, per hour."""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if var == 0:
+        return 0.0
+    cov = sum((t - mean_t) * (v - mean_v) for t, v in points)
+    return cov / var * 3600
+
+
+async def sample_staleness(
+    hub: QueueHub, fake: FakeSQSClient, stop: asyncio.Event, out: list[float]
+) -> None:
+    """How far behind the fake each queue's displayed depth is, sampled every tick."""
+    while not stop.is_set():
+        now = time.monotonic()
+        for name in hub.queue_names + hub.dlq_queue_names:
+            depth, changed_at = fake.depth(name)
+            shown = hub.queue_attributes.get(name, {}).get("ApproximateNumberOfMessages")
+            out.append(0.0 if shown == str(depth) else now - changed_at)
+        await asyncio.sleep(STALENESS_TICK)
+
+
+async def soak(args: argparse.Namespace) -> dict[str, Any]:
+    fake = FakeSQSClient(
+        rate=args.rate,
+        latency=args.latency,
+        jitter=args.jitter,
+        depth_change_interval=args.depth_change_interval,
+        body_bytes=args.body_bytes,
+        seed=args.seed,
+        consumer_lag=args.consumer_lag,
+        max_receive_count=args.max_receive_count,
+        redrive={
+            queues.env_queue_name(spec.name, args.env): queues.env_queue_name(spec.dlq, args.env)
+            for spec in queues.TOPOLOGY.queues
+            if spec.dlq
+        },
+    )
+    get_sqs_pool().session_factory = lambda: FakeSession(fake)
+    hub = get_hub(args.env)
+    stop = asyncio.Event()
+    staleness: list[float] = []
+    timeline: list[dict[str, float]] = []
+    sessions = [SimulatedSession(hub) for _ in range(args.sessions)]
+    async with sqs_lifespan(), hub.subscribe():
+        tasks = [asyncio.create_task(s.run(stop)) for s in sessions]
+        tasks.append(asyncio.create_task(sample_staleness(hub, fake, stop, staleness)))
+        started = time.monotonic()
+        warmup_end = started + args.warmup
+        measured_from: Optional[tuple[float, int, int]] = None
+        while (elapsed := time.monotonic() - started) < args.duration:
+            await asyncio.sleep(min(args.sample_interval, args.duration - elapsed))
+            now = time.monotonic()
+            push_bytes = sum(s.bytes for s in sessions)
+            if measured_from is None and now >= warmup_end:
+                measured_from = (now, hub.service_stats.total, push_bytes)
+                staleness.clear()
+            timeline.append(
+                {
+                    "t": round(now - started, 1),
+                    "rss_mb": round(rss_mb(), 2),
+                    "msgs_total": hub.service_stats.total,
+                    "retained_events": len(hub.events),
+                    "push_bytes_total": push_bytes,
+                }
+            )
+        stop.set()
+        await asyncio.gather(*tasks)
+    end = time.monotonic()
+    if measured_from is None:
+        measured_from = (started, 0, 0)
+    span = max(end - measured_from[0], 1e-9)
+    after_warmup = [p for p in timeline if p["t"] >= args.warmup] or timeline
+    streamed_queues = len(hub.queue_names)
+    return {
+        "config": {**vars(args), "python": platform.python_version()},
+        "summary": {
+            "duration_s": round(end - started, 1),
+            "offered_msgs_per_sec": args.rate * streamed_queues,
+            "msgs_per_sec": round((hub.service_stats.total - measured_from[1]) / span, 1),
+            "attribute_staleness_p50": round(percentile(staleness, 0.50), 3),
+            "attribute_staleness_p95": round(percentile(staleness, 0.95), 3),
+            "attribute_staleness_max": round(max(staleness, default=0.0), 3),
+            "pushes_per_session": round(sum(s.pushes for s in sessions) / max(len(sessions), 1)),
+            "push_bytes_per_sec": round(
+                (sum(s.bytes for s in sessions) - measured_from[2]) / span
+            ),
+            "rss_start_mb": after_warmup[0]["rss_mb"] if after_warmup else 0.0,
+            "rss_end_mb": after_warmup[-1]["rss_mb"] if after_warmup else 0.0,
+            "rss_slope_mb_per_hour": round(
+                slope_per_hour([(p["t"], p["rss_mb"]) for p in after_warmup]), 2
+            ),
+            "stream_mode": DEFAULT_STREAM_MODE,
+            "sqs_calls": dict(fake.calls),
+            "sqs_messages": dict(fake.stats),
+            "events_dropped": hub.backpressure.dropped,
+        },
+        "timeline": timeline,
+    }
+
+
+def regressions(summary: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    found = []
+    for name, higher_is_better in HEADLINE.items():
+        old, new = baseline.get(name), summary.get(name)
+        if old is None or new is None:
+            continue
+        # Absolute slack keeps near-zero baselines (e.g. flat RSS) from flagging noise.
+        slack = abs(old) * tolerance + (1.0 if name == "rss_slope_mb_per_hour" else 0.0)
+        if (new < old - slack) if higher_is_better else (new > old + slack):
+            found.append(f"{name}: {old} -> {new}")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run")
+    parser.add_argument("--warmup", type=float, default=10.0, help="seconds excluded from rates")
+    parser.add_argument("--sample-interval", type=float, default=5.0)
+    parser.add_argument("--env", default="prod")
+    parser.add_argument("--rate", type=float, default=20.0, help="messages/s per queue")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per SQS call")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--depth-change-interval", type=float, default=5.0)
+    parser.add_argument("--body-bytes", type=int, default=600)
+    parser.add_argument(
+        "--consumer-lag", type=float, default=1.0, help="seconds before the pipeline consumes"
+    )
+    parser.add_argument("--max-receive-count", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    report = asyncio.run(soak(args))
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["summary"]
+        report["regressions"] = regressions(report["summary"], baseline, args.tolerance)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(json.dumps(report["summary"], indent=2))
+    else:
+        print(text)
+    if report.get("regressions"):
+        print("Regressions:\n  " + "\n  ".join(report["regressions"]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
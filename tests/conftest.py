@@ -0,0 +1,6 @@
+import os
+
+# Tests must not write into (or backfill from) the real event archive, nor
+# wait on another worker's leases.
+os.environ.setdefault("EGGI_ARCHIVE_PATH", "")
+os.environ.setdefault("EGGI_COORDINATION", "local")
@@ -0,0 +1,137 @@
+import asyncio
+import functools
+import json
+
+import pytest
+
+from app.services import dlq
+from app.services.dlq import REDRIVE_SEND_ATTEMPTS, RedriveJob, signature
+from app.services.polling import Backoff
+from benchmarks.fake_sqs import ENDPOINT, FakeSQSClient
+
+DLQ = "orders-dlq"
+TARGET = "orders"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(dlq, "Backoff", functools.partial(Backoff, base=0.001))
+
+
+class QuickSQS(FakeSQSClient):
+    """The fake without long polls, optionally ignoring the receive's visibility
+    timeout so that whatever is not deleted comes straight back."""
+
+    def __init__(self, receive_visibility=None, **kwargs):
+        super().__init__(rate=0, consumer_lag=None, seed=1, **kwargs)
+        self.receive_visibility = receive_visibility
+        self.send_entries = 0
+
+    async def receive_message(self, QueueUrl, VisibilityTimeout=None, **kwargs):
+        kwargs["WaitTimeSeconds"] = 0
+        if self.receive_visibility is not None:
+            VisibilityTimeout = self.receive_visibility
+        return await super().receive_message(
+            QueueUrl, VisibilityTimeout=VisibilityTimeout, **kwargs
+        )
+
+    async def send_message_batch(self, QueueUrl, Entries):
+        self.send_entries += len(Entries)
+        return await super().send_message_batch(QueueUrl, Entries)
+
+
+def _body(i, event_source):
+    return json.dumps({"event_source": event_source, "payload": {"job_id": f"job-{i}"}})
+
+
+async def _seed(sqs, bodies):
+    for start in range(0, len(bodies), 10):
+        await sqs.send_message_batch(
+            QueueUrl=f"{ENDPOINT}/{DLQ}",
+            Entries=[
+                {"Id": str(i), "MessageBody": body}
+                for i, body in enumerate(bodies[start : start + 10])
+            ],
+        )
+    sqs.stats["sent"] = sqs.send_entries = 0
+
+
+async def _bodies(sqs, queue_name):
+    """Every visible body on `queue_name`, left hidden afterwards."""
+    bodies = []
+    while True:
+        resp = await FakeSQSClient.receive_message(
+            sqs, f"{ENDPOINT}/{queue_name}", MaxNumberOfMessages=10, VisibilityTimeout=300
+        )
+        if not resp.get("Messages"):
+            return sorted(bodies)
+        bodies.extend(m["Body"] for m in resp["Messages"])
+
+
+def test_failed_deletes_never_send_a_message_twice():
+    async def main():
+        # Undeleted messages come back at once, with most deletes failing.
+        sqs = QuickSQS(receive_visibility=0, delete_failure_rate=0.6)
+        bodies = [_body(i, "service:eggi:mapping-job") for i in range(40)]
+        await _seed(sqs, bodies)
+        job = RedriveJob(DLQ, TARGET)
+        await job.run(sqs, rate=10_000, workers=1)
+        return sqs, job, bodies
+
+    sqs, job, bodies = asyncio.run(main())
+    assert job.state == "done", job.error
+    assert (job.moved, job.failed) == (40, 0)
+    assert sqs.send_entries == sqs.stats["sent"] == 40
+    assert asyncio.run(_bodies(sqs, TARGET)) == sorted(bodies)
+    assert asyncio.run(_bodies(sqs, DLQ)) == []
+
+
+def test_rejected_sends_give_up_and_stay_in_the_dlq():
+    async def main():
+        sqs = QuickSQS()
+        bodies = [_body(i, "service:eggi:mapping-job") for i in range(40)]
+        await _seed(sqs, bodies)
+        sqs.send_failure_rate = 1.0
+        job = RedriveJob(DLQ, TARGET)
+        await job.run(sqs, rate=10_000, workers=4)
+        return sqs, job, bodies
+
+    sqs, job, bodies = asyncio.run(main())
+    assert job.state == "done"
+    assert (job.moved, job.failed) == (0, 40)
+    assert "40 messages could not be sent" in job.error
+    # Each message is tried REDRIVE_SEND_ATTEMPTS times, then left alone.
+    assert sqs.send_entries == 40 * REDRIVE_SEND_ATTEMPTS
+    # Released at the end of the run, not hidden for the hold timeout.
+    assert asyncio.run(_bodies(sqs, DLQ)) == sorted(bodies)
+
+
+def test_selected_groups_move_and_the_rest_is_released():
+    async def main():
+        sqs = QuickSQS()
+        selected = [_body(i, "service:eggi:mapping-job") for i in range(25)]
+        others = [_body(i, "service:eggi:llm-inference:events") for i in range(15)]
+        await _seed(sqs, selected + others)
+        key = signature({"Body": selected[0]}).key
+        job = RedriveJob(DLQ, TARGET, keys=frozenset({key}))
+        await job.run(sqs, rate=10_000, workers=2)
+        return sqs, job, selected, others
+
+    sqs, job, selected, others = asyncio.run(main())
+    assert job.state == "done", job.error
+    assert (job.moved, job.skipped, job.failed) == (25, 15, 0)
+    assert asyncio.run(_bodies(sqs, TARGET)) == sorted(selected)
+    assert asyncio.run(_bodies(sqs, DLQ)) == sorted(others)
+
+
+def test_limit_caps_what_is_moved():
+    async def main():
+        sqs = QuickSQS()
+        await _seed(sqs, [_body(i, "service:eggi:mapping-job") for i in range(40)])
+        job = RedriveJob(DLQ, TARGET, limit=13)
+        await job.run(sqs, rate=10_000, workers=4)
+        return sqs, job
+
+    sqs, job = asyncio.run(main())
+    assert job.moved == 13
+    assert len(asyncio.run(_bodies(sqs, TARGET))) == 13
@@ -0,0 +1,75 @@
+import pytest
+
+from app.services import hub as hub_module
+from app.services import queues
+from app.services.hub import QueueHub
+from app.services.models import empty_attributes
+from app.services.streaming import StreamConfig
+
+MIRROR = StreamConfig(mode="mirror")
+PEEK = StreamConfig(mode="peek")
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    monkeypatch.setattr(hub_module, "get_replay", lambda: None)
+    return QueueHub("prod")
+
+
+def _queue(index):
+    return queues.env_queue_name(queues.QUEUE_BASE_NAMES[index], "prod")
+
+
+def _sample(*queue_names):
+    return {name: empty_attributes() for name in queue_names}
+
+
+def test_queues_streamed_in_full_report_their_arrivals(hub):
+    a, b, c = _queue(0), _queue(1), _queue(2)
+    hub._streaming = {a: MIRROR, b: PEEK}
+    hub.arrivals.update({a: 7, b: 3, c: 5})
+    # Peek mode only samples `b`, and `c` is not streamed at all.
+    assert hub._observed(_sample(a, b, c)) == {a: 7}
+
+
+def test_a_loss_rules_out_the_next_sample_only(hub):
+    a = _queue(0)
+    hub._streaming = {a: MIRROR}
+    hub.arrivals[a] = 10
+    assert hub._observed(_sample(a)) == {a: 10}
+    hub._engine.lost[a] = 2
+    hub.arrivals[a] = 15
+    assert hub._observed(_sample(a)) == {}
+    hub.arrivals[a] = 20
+    assert hub._observed(_sample(a)) == {a: 20}
+
+
+def test_each_queue_keeps_its_own_loss_baseline(hub):
+    a, b = _queue(0), _queue(1)
+    hub._streaming = {a: MIRROR, b: MIRROR}
+    assert hub._observed(_sample(a, b)) == {a: 0, b: 0}
+    # `b` loses records while only `a` is sampled...
+    hub._engine.lost[b] = 1
+    assert hub._observed(_sample(a)) == {a: 0}
+    # ...which still counts against `b`'s own next sample.
+    assert hub._observed(_sample(b)) == {}
+    assert hub._observed(_sample(a, b)) == {a: 0, b: 0}
+
+
+def test_replays_are_never_trusted(hub, monkeypatch):
+    a = _queue(0)
+    hub._streaming = {a: MIRROR}
+    monkeypatch.setattr(hub_module, "get_replay", lambda: object())
+    assert hub._observed(_sample(a)) == {}
+
+
+def test_observed_arrivals_drive_the_arrival_rate(hub):
+    a, b = _queue(0), _queue(1)
+    hub._streaming = {a: MIRROR}
+    for step in range(5):
+        hub.arrivals[a] = hub.arrivals[b] = 60 * step
+        now = 1000.0 + 60 * step
+        hub._apply_sample(now, _sample(a, b), hub._observed(_sample(a, b)))
+    # `a`'s arrivals come from the stream; `b`'s depth never moves, so it has none.
+    assert hub.rates.estimate(a).arrival == pytest.approx(1.0)
+    assert not hub.rates.estimate(b).arrival
@@ -0,0 +1,62 @@
+import random
+import re
+
+import pytest
+
+from app.services.search import EventIndex, parse_query, record_values
+from benchmarks.bench_search import QUERIES, make_record
+
+
+def _matches(record, terms, filters):
+    values = dict(record_values(record))
+    if any(values.get(field) != value for field, value in filters.items()):
+        return False
+    tokens = set(re.findall(r"[a-z0-9]+", " ".join(values.values()).lower()))
+    return all(set(re.findall(r"[a-z0-9]+", term.lower())) <= tokens for term in terms)
+
+
+def _brute_force(records, terms, filters, limit):
+    """Newest-first sequences of the retained records matching the query."""
+    if not terms and not filters:
+        return []
+    newest_first = sorted(records, reverse=True)
+    return [seq for seq in newest_first if _matches(records[seq], terms, filters)][:limit]
+
+
+@pytest.fixture(scope="module")
+def indexed():
+    rng = random.Random(3)
+    index = EventIndex()
+    records = {}
+    for seq in range(6000):
+        records[seq] = make_record(seq, rng)
+        index.add(seq, records[seq])
+    # Evict the oldest third, in order, as the ring buffer does.
+    for seq in range(2000):
+        index.evict(seq, records.pop(seq))
+    return index, records
+
+
+@pytest.mark.parametrize("limit", [1, 50, 5000])
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_brute_force(indexed, query, limit):
+    index, records = indexed
+    terms, filters = parse_query(query)
+    assert index.search(terms, filters, limit) == _brute_force(records, terms, filters, limit)
+
+
+@pytest.mark.parametrize(
+    "query", ["events api", "service:eggi:mapping-job:completed source:web"]
+)
+def test_common_terms_never_seen_together_match_nothing(indexed, query):
+    index, _ = indexed
+    for part in query.split():
+        assert index.search(*parse_query(part), 50)
+    assert index.search(*parse_query(query), 50) == []
+
+
+def test_unknown_terms_match_nothing(indexed):
+    index, _ = indexed
+    assert index.search(["no-such-token"], {}, 50) == []
+    assert index.search([], {"source": "nowhere"}, 50) == []
+    assert index.search([], {}, 50) == []